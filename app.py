@@ -1,34 +1,115 @@
-import pandas as pd
+import importlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+# Static narrative sections: cheap to import, rendered first
 from sections.intro import render as intro_render
-from sections.overview import render as overview_render
 from sections.conclusion import render as conclusion_render
-from sections.distribution import render as distribution_render
-from sections.diversity import render as diversity_render
-from sections.location import render as location_render
-from sections.growth_stage import render as growth_stage_render
-from sections.data_quality import render as dq_render
 
-from utils.io import load_data
-from utils.prep import clean_trees
-from utils.viz import map_points
+from utils.filters import facet_catalogs
+from utils.results import ResultCache, filter_state, compute_view, likely_next_states
+from utils.build import latest_version, dataset_version, load_artifacts
+from utils.lazy import lazy_section
+from utils import perf
+# Data-driven sections (and Plotly behind them) are imported on first render,
+# see section(); cleaning and rule modules only when no build is available.
+
+
+def section(name: str):
+    """render() of sections.<name>, imported the first time it is needed."""
+    return importlib.import_module(f"sections.{name}").render
 
 # --- Page config ---
 st.set_page_config(page_title="🌳 Paris Trees Explorer", layout="wide")
 
 # --- Load & clean ---
-@st.cache_data(show_spinner=False)
-def get_data():
-    df_raw = load_data("data/data.csv")  # ';' sep handled in utils/io.py
-    df = clean_trees(df_raw).copy()
-    return df
+DATA_PATH = os.environ.get("TREES_DATA", "data/data.csv")  # overridable for load tests
+ARTIFACTS_DIR = os.environ.get("TREES_ARTIFACTS", "artifacts")  # written by `python -m utils.build`
+
+
+def get_data(path=DATA_PATH, artifacts=ARTIFACTS_DIR):
+    # Prebuilt artifacts for this dataset version: no cleaning at startup (numeric columns memory-mapped)
+    version = dataset_version(path) if os.path.exists(path) else None
+    built = latest_version(artifacts)
+    if built is not None and (version is None or version == built.name):
+        return load_artifacts(built)
+
+    from utils.io import load_data
+    from utils.prep import clean_trees, add_derived_columns
+    from utils.profile import build_profile
+    from utils.quality import evaluate_rules
+    from utils.sketch import build_sketches
+    from utils.spatial import add_contiguity_columns
+    from utils.canopy import canopy_coverage
+    from utils.streets import build_street_index
+    from utils.districts import load_boundaries, add_district_numbers
+
+    df_raw = load_data(path)  # ';' sep handled in utils/io.py
+    boundaries = load_boundaries()  # arrondissement polygons, None unless TREES_BOUNDARIES is set
+    df, clean_report = clean_trees(df_raw, with_report=True, boundaries=boundaries)
+    df = add_derived_columns(df.copy())
+    df, district_report = add_district_numbers(df, boundaries)  # from coordinates when boundaries exist
+    df = add_contiguity_columns(df)  # same-species neighbours, whole dataset
+    # Column statistics and data-quality bitsets are computed here,
+    # once per dataset, and cached with it
+    return {
+        "df": df,
+        "profile": build_profile(df),
+        "quality": evaluate_rules(df),
+        "clean_report": clean_report,
+        "district_report": district_report,
+        "catalogs": facet_catalogs(df),
+        "sketches": build_sketches(df),
+        "canopy": canopy_coverage(df),
+        "streets": build_street_index(df),
+        "version": version,
+    }
+
 
-df = get_data()
+# cache_resource: started once per server process, in a background thread, and
+# shared read-only by every session (cache_data would unpickle a private copy
+# per session and read the memory maps into RAM)
+@st.cache_resource(show_spinner=False)
+def data_loading():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-loader")
+    future = executor.submit(get_data)
+    executor.shutdown(wait=False)  # the thread exits once the load is done
+    return future
 
-# --- Header ---
+
+@st.cache_resource(show_spinner=False)
+def result_cache(version: str):
+    # one cache per dataset version (hashed contents): views of other data are never served
+    return ResultCache(max_entries=16, max_mb=256)
+
+
+perf.start_run()
+loading = data_loading()
+
+# --- Header (static: painted before the data is ready) ---
 intro_render()
 st.divider()
 
+# --- Wait for the dataset, with the narrative readable meanwhile ---
+pending = st.empty()
+with perf.step("data access"):
+    try:
+        if not loading.done():
+            with pending.container():
+                with st.spinner("🌱 Loading the tree inventory… the map, charts and insights appear as soon as it is ready."):
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    conclusion_render()
+                    loading.result()
+            pending.empty()
+        data = loading.result()
+    except Exception:
+        data_loading.clear()  # next rerun retries the load
+        raise
+df = data["df"]
+results = result_cache(data["version"])
+results.cancel_prefetch()  # this rerun goes before any speculative work
+
 # --- Validate required columns ---
 required_for_map = {"lat", "lon"}
 missing = [c for c in required_for_map if c not in df.columns]
@@ -36,24 +117,11 @@ if missing:
     st.error(f"Missing required columns for the map: {missing}.")
     st.stop()
 
-# --- Normalize arrondissement number (create 'arr_num') ---
+# --- Arrondissement number ('arr_num', from coordinates or label, derived in get_data) ---
 if "district" not in df.columns:
     st.error("The column 'district' is missing from the dataset.")
     st.stop()
 
-df["arr_num"] = (
-    df["district"].astype(str)
-      .str.extract(r"(\d{1,2})", expand=False)
-      .astype("Int64")
-)
-
-# --- Normalize boolean 'is_remarkable' from 'remarkable' (OUI/NON only) ---
-df["is_remarkable"] = (
-    df.get("remarkable", "NON")
-      .astype(str).str.strip().str.upper()
-      .eq("OUI")
-)
-
 # ======================
 # SIDEBAR — SEARCH FIRST
 # ======================
@@ -125,18 +193,7 @@ search_mode = st.sidebar.radio(
 search_col = "en_name" if search_mode == "Common name" else "genus_species"
 
 # Auto-suggest list
-if search_col not in df.columns:
-    search_options = []
-else:
-    search_options = (
-        df[search_col]
-        .dropna()
-        .astype(str)
-        .str.strip()
-        .drop_duplicates()
-        .sort_values()
-        .tolist()
-    )
+search_options = data["catalogs"].get(search_col, [])
 
 picked_values = st.sidebar.multiselect(
     "Pick one or more values",
@@ -145,6 +202,28 @@ picked_values = st.sidebar.multiselect(
     placeholder="Type to search...",
 )
 
+# Street lookup: one street's profile, sliced from the street index (utils/streets.py)
+picked_street = None
+if data.get("streets") is not None:
+    street_query = st.sidebar.text_input(
+        "🛣️ Find a street",
+        placeholder="e.g. Avenue Foch, Bd Saint-Michel…",
+        help="Trees recorded at an address (street, square, park or cemetery), whatever the filters below.",
+    )
+    if street_query:
+        from utils.streets import search_streets
+
+        matches = search_streets(data["streets"], street_query)
+        if matches:
+            street_trees = data["streets"]["streets"]["trees"]
+            picked_street = st.sidebar.selectbox(
+                "Street",
+                options=matches,
+                format_func=lambda s: f"{s.title()} ({street_trees[s]} trees)",
+            )
+        else:
+            st.sidebar.caption("No street matches this search.")
+
 st.sidebar.markdown("---")
 
 # ======================
@@ -167,7 +246,7 @@ only_remarkable = st.sidebar.checkbox(
 )
 
 # Districts
-arr_options = sorted(df["arr_num"].dropna().unique().astype(int).tolist())
+arr_options = data["catalogs"].get("arr_num", [])
 if not arr_options:
     st.warning("No valid arrondissement values were found in the data.")
     st.stop()
@@ -181,9 +260,7 @@ selected_arrs = st.sidebar.multiselect(
 
 # Ownership filter
 if "ownership" in df.columns:
-    owner_options = (
-        df["ownership"].dropna().astype(str).str.strip().drop_duplicates().sort_values().tolist()
-    )
+    owner_options = data["catalogs"]["ownership"]
     selected_owners = st.sidebar.multiselect(
         "Ownership type",
         options=owner_options,
@@ -196,9 +273,7 @@ else:
 
 # Growth stage filter
 if "growth_stage" in df.columns:
-    stage_options = (
-        df["growth_stage"].dropna().astype(str).str.strip().drop_duplicates().sort_values().tolist()
-    )
+    stage_options = data["catalogs"]["growth_stage"]
     selected_stages = st.sidebar.multiselect(
         "Growth stage",
         options=stage_options,
@@ -218,31 +293,17 @@ if len(selected_arrs) == 0:
     st.info("Select at least one district in the sidebar to display the map.")
     st.stop()
 
-df_filtered = (
-    df[df["arr_num"].isin(selected_arrs)]
-      .dropna(subset=["lat", "lon"])
+# One "view" per sidebar state (filtered rows, map sample, section aggregates),
+# cached and prefetched for the likely next states (utils/results.py)
+state = filter_state(
+    selected_arrs, only_remarkable, selected_owners, selected_stages,
+    search_col, picked_values, max_points,
 )
-
-if only_remarkable:
-    df_filtered = df_filtered[df_filtered["is_remarkable"]]
-
-# Filter by ownership
-if "ownership" in df_filtered.columns and selected_owners:
-    df_filtered = df_filtered[
-        df_filtered["ownership"].astype(str).str.strip().isin(selected_owners)
-    ]
-
-# Filter by growth stage
-if "growth_stage" in df_filtered.columns and selected_stages:
-    df_filtered = df_filtered[
-        df_filtered["growth_stage"].astype(str).str.strip().isin(selected_stages)
-    ]
-
-# Apply search filter if any values picked
-if picked_values and search_col in df_filtered.columns:
-    df_filtered = df_filtered[
-        df_filtered[search_col].astype(str).str.strip().isin(picked_values)
-    ]
+with perf.step("view"):
+    view, view_hit = results.get_or_compute(state, lambda: compute_view(df, state))
+df_filtered = view["df_filtered"]
+perf.note("view", "cache hit" if view_hit else f"computed in {perf.fmt_ms(view['seconds'])}")
+perf.note("result cache", results.stats)
 
 # ======================
 # MAP SECTION
@@ -250,46 +311,88 @@ if picked_values and search_col in df_filtered.columns:
 st.subheader("🌳 Map of Paris Trees (Filtered)")
 st.caption("Use the sidebar to search and filter the dataset.")
 
-needed_cols = [
-    "lat", "lon",
-    "district", "arr_num",
-    "french_name", "en_name",
-    "genus_species",
-    "height_m", "circumference_cm",
-    "ownership", "location_type",
-    "growth_stage", "remarkable", "is_remarkable",
-]
-cols_present = [c for c in needed_cols if c in df_filtered.columns]
-
 if df_filtered.empty:
     st.info("No data to display with the current settings.")
 else:
-    sample_n = int(min(max_points, df_filtered.shape[0]))
-    geo_view = df_filtered[cols_present].sample(sample_n, random_state=42)
     # --- Metrics section ---
-    overview_render(df_filtered)
-    map_points(geo_view)
+    with perf.step("overview_render"):
+        section("overview")(df_filtered, kpi=view["key_figures"])
+    with perf.step("map_points"):
+        from utils.viz import map_points
+        map_points(view["map_frame"], prepared=True)
+
+if picked_street is not None:
+    st.divider()
+    with perf.step("street_render"):
+        section("street")(df, data["streets"], picked_street)
+
+with perf.step("distribution_render"):
+    section("distribution")(df_filtered, arr_counts=view["district_counts"], canopy=data.get("canopy"))
+st.divider()
 
-distribution_render(df_filtered)
+with perf.step("diversity_render"):
+    section("diversity")(df_filtered, label_mode="Common name", species=view["species"], indices=view["indices"],
+                         view_key=(data["version"], state))
 st.divider()
+with perf.step("similarity_render"):
+    section("similarity")(df_filtered, similarity=view["similarity"])
 
-diversity_render(df_filtered, label_mode="Common name")
 st.divider()
-location_render(df_filtered)
+with perf.step("contiguity_render"):
+    section("contiguity")(df_filtered, contiguity=view["contiguity"])
 
 st.divider()
-growth_stage_render(df_filtered)
+with perf.step("location_render"):
+    section("location")(df_filtered, dom_counts=view["ownership_counts"])
 
 st.divider()
-st.markdown("<br>", unsafe_allow_html=True)
-conclusion_render()
+with perf.step("size_structure_render"):
+    section("size_structure")(data.get("sketches"), state)
 
-with st.expander("Data Quality", expanded=False):
-    dq_render(df_filtered)
+st.divider()
+with perf.step("growth_stage_render"):
+    section("growth_stage")(df_filtered, all_counts=view["stage_counts"])
+
+st.divider()
+st.markdown("<br>", unsafe_allow_html=True)
+with perf.step("conclusion_render"):
+    conclusion_render()
 
+# ======================
+# ON-DEMAND BLOCKS
+# ======================
+# Closed by default: their content (duplicate scans, rule checks, previews)
+# is only computed once the user opens them.
+lazy_section(
+    "Data Quality", "sections.data_quality:render", df_filtered, data["quality"],
+    key="data_quality",
+    help="Missing values, duplicates and validation checks on the filtered selection.",
+)
 
 # Optional preview
-with st.expander("Preview dataset", expanded=False):
-    st.dataframe(df.head())
-with st.expander("Quick stats", expanded=False):
-    st.write(df.describe(include="all"))
\ No newline at end of file
+lazy_section("Preview dataset", lambda d: st.dataframe(d.head()), df, key="preview")
+lazy_section(
+    "Quick stats", "utils.profile:render_profile", data["profile"],
+    key="quick_stats",
+)
+lazy_section(
+    "Canopy map", "sections.distribution:render_canopy_map", data.get("canopy"),
+    key="canopy_map",
+    help="Estimated canopy cover per 250 m cell, for all trees in the dataset.",
+)
+lazy_section(
+    "Cleaning report", "sections.data_quality:render_cleaning_report", data["clean_report"],
+    key="cleaning_report",
+    help="Time, rows and memory of each clean_trees stage for the loaded dataset.",
+)
+lazy_section(
+    "District assignment", "sections.data_quality:render_district_report", data.get("district_report"),
+    key="district_report",
+    help="Districts from tree coordinates (opt-in: TREES_BOUNDARIES) vs from the 'district' label, per source label.",
+)
+
+# Idle time until the next click: compute the likely next views in the background
+results.prefetch(df, likely_next_states(state, view, arr_options))
+
+# Developer overlay: ?perf=1 or TREES_PERF=1
+perf.render_overlay()
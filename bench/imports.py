@@ -0,0 +1,124 @@
+"""
+Startup profile: what app.py pays in imports before it can paint anything.
+
+    python -m bench.imports                  # import cost of app.py's top-level imports, by package
+    python -m bench.imports --top 25         # also the 25 most expensive modules
+    python -m bench.imports --first-paint    # + cold time to the first element / full page (fresh process)
+
+Imports are measured in a fresh interpreter with `python -X importtime`
+(the same cost a new container pays on its first request). The module list is
+read from app.py itself (its top-level import statements), so the profile
+follows the code.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def app_imports(path=APP) -> str:
+    """app.py's top-level import statements, as source code."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(n) for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+
+def import_profile(code: str) -> list:
+    """[(module, self_us, cumulative_us)] for `code` run in a fresh interpreter with -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP.parent, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def by_package(rows) -> list:
+    """Self time summed per top-level package, most expensive first."""
+    totals = defaultdict(int)
+    for name, self_us, _ in rows:
+        totals[name.strip().split(".")[0]] += self_us
+    return sorted(totals.items(), key=lambda kv: -kv[1])
+
+
+# Fresh process: time from interpreter start to the first delta the script sends
+# (what the browser can paint) and to the end of the first run.
+_FIRST_PAINT = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+first = []
+_enqueue = ForwardMsgQueue.enqueue
+def enqueue(self, msg):
+    if not first and msg.WhichOneof("type") == "delta":
+        first.append(time.perf_counter() - t0)
+    return _enqueue(self, msg)
+ForwardMsgQueue.enqueue = enqueue
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run()
+print(json.dumps({"first_paint_s": first[0] if first else None, "full_run_s": time.perf_counter() - t0,
+                  "exceptions": len(at.exception)}))
+"""
+
+
+def first_paint(path=APP) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_PAINT, str(path)],
+        cwd=APP.parent, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--top", type=int, default=0, help="also list the N most expensive modules (cumulative)")
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement (best kept)")
+    ap.add_argument("--first-paint", action="store_true", help="also time a cold first run of the app")
+    ap.add_argument("--out", default=None, help="also write the results to this JSON file")
+    args = ap.parse_args(argv)
+
+    code = app_imports()
+    runs = [import_profile(code) for _ in range(args.repeat)]
+    rows = min(runs, key=lambda r: sum(s for _, s, _ in r))
+    total_us = sum(s for _, s, _ in rows)
+
+    print(f"app.py top-level imports: {total_us / 1000:.0f} ms (best of {args.repeat})\n")
+    packages = by_package(rows)
+    for pkg, us in packages[:15]:
+        print(f"  {pkg:<24} {us / 1000:>8.1f} ms  {100 * us / total_us:>5.1f}%")
+
+    if args.top:
+        print(f"\nTop {args.top} modules (cumulative):")
+        for name, _, cum in sorted(rows, key=lambda r: -r[2])[:args.top]:
+            print(f"  {name:<48} {cum / 1000:>8.1f} ms")
+
+    report = {"imports_ms": round(total_us / 1000, 1), "by_package_ms": {p: round(us / 1000, 1) for p, us in packages}}
+    if args.first_paint:
+        fp = min((first_paint() for _ in range(args.repeat)), key=lambda r: r["full_run_s"])
+        report.update(fp)
+        print(
+            f"\nCold start (fresh process): first element after {fp['first_paint_s']:.2f} s, "
+            f"full first run {fp['full_run_s']:.2f} s"
+        )
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
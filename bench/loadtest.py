@@ -0,0 +1,253 @@
+"""
+Concurrent-session load test of app.py.
+
+    python -m bench.loadtest                                 # 1, 2, 4 and 8 sessions
+    python -m bench.loadtest --sessions 4 16 --steps 20 --think 0.5
+    python -m bench.loadtest --data data/synthetic.csv --max-p99 3 --max-mem-per-session 50
+
+Every simulated user is a headless Streamlit session (streamlit.testing AppTest)
+running the real script in its own thread, all in this one process, the way a
+Streamlit server runs its sessions (shared st.cache_data, shared GIL).
+Each session opens the app, then plays a random but seeded sequence of
+sidebar interactions; every rerun is timed.
+
+Reported per concurrency level: reruns/s, p50/p95/p99 rerun latency, the
+process RSS growth per session and the peak RSS (transient allocations of
+concurrent reruns included). RSS is process-wide and allocators keep some
+freed memory, so memory figures are approximate: compare levels, not single runs. With budgets (--max-p99, ...) the run exits 1
+as soon as one level exceeds them.
+"""
+import argparse
+import ctypes
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from utils.perf import rss_bytes
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+
+
+# ======================
+# USER ACTIONS
+# ======================
+# Each action changes one sidebar widget (found by label) on a session that
+# has already run once, then reruns the script.
+def _widget(at, kind: str, label: str):
+    for w in getattr(at.sidebar, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"No sidebar {kind} labelled {label!r}")
+
+
+def switch_search_mode(at, rng):
+    radio = _widget(at, "radio", "Search by")
+    other = [o for o in radio.options if o != radio.value]
+    radio.set_value(rng.choice(other)).run()
+
+
+def pick_species(at, rng):
+    picker = _widget(at, "multiselect", "Pick one or more values")
+    k = rng.choice([0, 1, 1, 2, 3])  # sometimes clears the search
+    picker.set_value(rng.sample(picker.options, min(k, len(picker.options)))).run()
+
+
+def toggle_remarkable(at, rng):
+    box = _widget(at, "checkbox", "Show only remarkable trees")
+    box.set_value(not box.value).run()
+
+
+def change_districts(at, rng):
+    districts = _widget(at, "multiselect", "Districts")
+    # AppTest lists the formatted labels ('12e'); set_value() takes the values
+    arrs = [int(label.rstrip("e")) for label in districts.options]
+    if rng.random() < 0.3:
+        chosen = arrs  # back to all of Paris
+    else:
+        chosen = rng.sample(arrs, rng.randint(1, 4))
+    districts.set_value(chosen).run()
+
+
+def change_sample_size(at, rng):
+    _widget(at, "slider", "Number of points to display (sample size)").set_value(rng.choice([5000, 10000, 20000])).run()
+
+
+# (action, weight): districts and species dominate real sessions
+ACTIONS = [
+    (switch_search_mode, 1),
+    (pick_species, 3),
+    (toggle_remarkable, 2),
+    (change_districts, 4),
+    (change_sample_size, 1),
+]
+
+
+# ======================
+# SESSIONS
+# ======================
+def run_session(seed: int, steps: int, think: float, timeout: float, out: list, errors: list, keep: list = None):
+    """
+    One user: open the app, then `steps` random interactions. Appends (action, seconds)
+    to out; the session itself is appended to keep, so it stays alive until measured.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    actions, weights = zip(*ACTIONS)
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+    if keep is not None:
+        keep.append(at)
+    try:
+        t0 = time.perf_counter()
+        at.run()
+        out.append(("open", time.perf_counter() - t0))
+        for _ in range(steps):
+            if think:
+                time.sleep(rng.expovariate(1 / think))
+            action = rng.choices(actions, weights)[0]
+            t0 = time.perf_counter()
+            action(at, rng)
+            out.append((action.__name__, time.perf_counter() - t0))
+            if at.exception:
+                errors.append(f"{action.__name__}: {at.exception[0].value}")
+                return
+    except Exception as e:  # keep the other sessions running
+        errors.append(f"{type(e).__name__}: {e}")
+
+
+def _release_free_memory():
+    """Collect garbage and hand freed heap pages back to the OS (glibc), so RSS reflects live memory."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def run_level(n_sessions: int, steps: int, think: float, timeout: float, seed: int) -> dict:
+    """Run n_sessions users concurrently; return throughput, latency percentiles and memory."""
+    timings = [[] for _ in range(n_sessions)]
+    errors, sessions = [], []
+    peak = [rss_bytes() or 0]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.2):
+            peak[0] = max(peak[0], rss_bytes() or 0)
+
+    _release_free_memory()
+    rss_before = rss_bytes() or 0
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+
+    threads = [
+        threading.Thread(target=run_session, args=(seed + i, steps, think, timeout, timings[i], errors, sessions))
+        for i in range(n_sessions)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    done.set()
+    sampler.join()
+    # sessions are still alive here, as they would be on a server
+    _release_free_memory()
+    retained = (rss_bytes() or 0) - rss_before
+    del sessions
+
+    lat = np.array([s for session in timings for _, s in session])
+    return {
+        "sessions": n_sessions,
+        "reruns": int(lat.size),
+        "wall_s": round(wall, 2),
+        "reruns_per_s": round(lat.size / wall, 2) if wall else 0.0,
+        "p50_s": round(float(np.percentile(lat, 50)), 3) if lat.size else None,
+        "p95_s": round(float(np.percentile(lat, 95)), 3) if lat.size else None,
+        "p99_s": round(float(np.percentile(lat, 99)), 3) if lat.size else None,
+        "mean_open_s": round(statistics.mean(s for session in timings for a, s in session if a == "open"), 3)
+        if any(session for session in timings) else None,
+        "mem_per_session_mb": round(max(retained, 0) / 2**20 / n_sessions, 1),
+        "peak_rss_mb": round(peak[0] / 2**20, 1),
+        "errors": errors,
+    }
+
+
+def over_budget(r: dict, args) -> list:
+    """Budgets exceeded by one concurrency level (empty list = within budget)."""
+    failed = []
+    if r["errors"]:
+        failed.append(f"{len(r['errors'])} session error(s)")
+    for key, limit in (("p95_s", args.max_p95), ("p99_s", args.max_p99)):
+        if limit is not None and r[key] is not None and r[key] > limit:
+            failed.append(f"{key[:3]} {r[key]:.2f}s > {limit:.2f}s")
+    if args.max_mem_per_session is not None and r["mem_per_session_mb"] > args.max_mem_per_session:
+        failed.append(f"memory/session {r['mem_per_session_mb']:.0f} MB > {args.max_mem_per_session:.0f} MB")
+    if args.min_throughput is not None and r["reruns_per_s"] < args.min_throughput:
+        failed.append(f"throughput {r['reruns_per_s']:.2f}/s < {args.min_throughput:.2f}/s")
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--data", default=None, help="dataset loaded by the app (default: data/data.csv)")
+    ap.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS, help="concurrency levels to run")
+    ap.add_argument("--steps", type=int, default=10, help="interactions per session after opening the app")
+    ap.add_argument("--think", type=float, default=0.0, help="mean think time between interactions (s)")
+    ap.add_argument("--timeout", type=float, default=300.0, help="per-rerun timeout (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-p95", type=float, default=None, help="budget: p95 rerun latency (s)")
+    ap.add_argument("--max-p99", type=float, default=None, help="budget: p99 rerun latency (s)")
+    ap.add_argument("--max-mem-per-session", type=float, default=None, help="budget: RSS growth per session (MB)")
+    ap.add_argument("--min-throughput", type=float, default=None, help="budget: reruns per second")
+    ap.add_argument("--out", default=None, help="also write the results to this JSON file")
+    args = ap.parse_args(argv)
+
+    # streamlit resets its loggers' levels on every run: mute warnings at the source
+    # (one deprecation line per rerun and session otherwise)
+    logging.disable(logging.WARNING)
+
+    if args.data:
+        os.environ["TREES_DATA"] = args.data
+    os.chdir(APP.parent)  # the app resolves data/ relative to the repo
+
+    # Warm-up: load + clean once, so every level shares the same st.cache_data entry
+    t0 = time.perf_counter()
+    warm = []
+    run_session(args.seed - 1, 0, 0.0, args.timeout, warm, [])
+    print(f"warm-up (load + clean, cached): {time.perf_counter() - t0:.1f} s, RSS {(rss_bytes() or 0) / 2**20:.0f} MB")
+
+    print(f"\n{'sessions':>8} {'reruns':>7} {'reruns/s':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'MB/session':>11} {'peak MB':>8}  budget")
+    results, status = [], 0
+    for n in args.sessions:
+        r = run_level(n, args.steps, args.think, args.timeout, args.seed)
+        r["over_budget"] = over_budget(r, args)
+        results.append(r)
+        print(
+            f"{n:>8} {r['reruns']:>7} {r['reruns_per_s']:>9.2f} {r['p50_s'] or 0:>7.2f} "
+            f"{r['p95_s'] or 0:>7.2f} {r['p99_s'] or 0:>7.2f} {r['mem_per_session_mb']:>11.1f} {r['peak_rss_mb']:>8.0f}  "
+            + ("; ".join(r["over_budget"]) or "ok")
+        )
+        for e in r["errors"][:3]:
+            print(f"         ! {e}")
+        if r["over_budget"]:
+            status = 1
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"args": vars(args), "levels": results}, indent=2) + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Micro-benchmarks for the load / clean / filter / aggregate hot paths.
+
+    python -m bench.run                                  # 150k, 1M and 5M rows
+    python -m bench.run --sizes 150000 --repeat 5
+    python -m bench.run --save-baseline                  # write bench/baseline.json
+    python -m bench.run --compare --tolerance 0.25       # exit 1 on regressions
+
+Each case is timed `repeat` times (median and min reported), then run once more
+under tracemalloc for its peak memory. Raw data at each size comes from the
+synthetic generator (utils/synth.py, fixed seed), or from tiling a real export
+with --source (tree IDs are shifted so they stay unique).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from utils.io import load_data
+from utils.synth import generate_trees
+from utils.prep import CLEAN_STAGES, add_derived_columns
+from utils.filters import apply_filters
+from utils.viz import map_frame
+from sections.overview import key_figures
+from sections.distribution import district_counts
+from sections.diversity import species_labels, species_counts
+from sections.location import ownership_counts
+from sections.growth_stage import stage_counts
+from sections.data_quality import missingness
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_SIZES = [150_000, 1_000_000, 5_000_000]
+
+
+# ======================
+# DATA
+# ======================
+def raw_csv(source, n_rows: int, workdir: Path, seed: int = 0) -> Path:
+    """
+    ';'-separated raw CSV with exactly n_rows: synthetic by default
+    (utils.synth), or built by repeating the rows of a real export.
+    """
+    out = workdir / (f"raw_{n_rows}_seed{seed}.csv" if source is None else f"raw_{n_rows}_{Path(source).stem}.csv")
+    if out.exists():
+        return out
+    if source is None:
+        generate_trees(n_rows=n_rows, seed=seed).to_csv(out, sep=";", index=False)
+        return out
+
+    src = load_data(source)
+    reps = -(-n_rows // len(src))
+    parts = []
+    for k in range(reps):
+        part = src.copy()
+        if "IDBASE" in part.columns:
+            part["IDBASE"] = pd.to_numeric(part["IDBASE"], errors="coerce") + k * 10_000_000
+        parts.append(part)
+    pd.concat(parts, ignore_index=True).head(n_rows).to_csv(out, sep=";", index=False)
+    return out
+
+
+# ======================
+# CASES
+# ======================
+def build_cases(csv_path: Path, sample_n: int = 10_000):
+    """
+    (name, setup) pairs; setup() returns the zero-argument callable to time.
+    Inputs are prepared outside the timed call so every case measures one step.
+    """
+    raw = load_data(str(csv_path))
+    cases = [("io.load_data", lambda: (lambda: load_data(str(csv_path))))]
+
+    # clean_trees, stage by stage: each stage gets the previous stage's output
+    stage_input = raw.copy()
+    for name, stage, _ in CLEAN_STAGES:
+        frozen = stage_input
+        cases.append((f"prep.{name}", lambda f=frozen, s=stage: (lambda: s(f.copy()))))
+        stage_input = stage(stage_input.copy())
+
+    cleaned = stage_input
+    cases.append(("prep.add_derived_columns", lambda: (lambda: add_derived_columns(cleaned.copy()))))
+    df = add_derived_columns(cleaned.copy())
+
+    # app.py filter block: default sidebar state, then a narrow selection
+    arrs = sorted(df["arr_num"].dropna().unique().astype(int).tolist())
+    owners = df["ownership"].dropna().astype(str).str.strip().drop_duplicates().tolist()
+    stages = df["growth_stage"].dropna().astype(str).str.strip().drop_duplicates().tolist()
+    top_species = df["en_name"].value_counts().index[:3].tolist()
+    cases.append(("filters.default", lambda: (lambda: apply_filters(
+        df, arrs, selected_owners=owners, selected_stages=stages, search_col="en_name"))))
+    cases.append(("filters.narrow", lambda: (lambda: apply_filters(
+        df, arrs[:3], selected_owners=owners[:2], selected_stages=stages,
+        search_col="en_name", picked_values=top_species))))
+
+    # section aggregations, on the default selection
+    sel = apply_filters(df, arrs, selected_owners=owners, selected_stages=stages, search_col="en_name")
+    cases += [
+        ("sections.overview", lambda: (lambda: key_figures(sel))),
+        ("sections.distribution", lambda: (lambda: district_counts(sel))),
+        ("sections.diversity", lambda: (lambda: species_counts(species_labels(sel)[2]))),
+        ("sections.location", lambda: (lambda: ownership_counts(sel))),
+        ("sections.growth_stage", lambda: (lambda: stage_counts(sel))),
+        ("sections.data_quality", lambda: (lambda: missingness(sel))),
+    ]
+
+    # map_points preparation: sample + map_frame
+    n = int(min(sample_n, len(sel)))
+    cases.append(("viz.map_points_prep", lambda: (lambda: map_frame(sel.sample(n, random_state=42)))))
+    return cases
+
+
+def measure(fn, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": round(statistics.median(times), 5),
+        "min_s": round(min(times), 5),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+# ======================
+# BASELINE
+# ======================
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Cases whose median got slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for size, cases in results.items():
+        for name, r in cases.items():
+            ref = baseline.get("results", {}).get(size, {}).get(name)
+            if not ref:
+                continue
+            ratio = r["median_s"] / max(ref["median_s"], 1e-9)
+            r["vs_baseline"] = round(ratio, 2)
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--source", default=None, help="real raw export to tile instead of synthetic data")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", default=None, help="run only cases whose name contains this text")
+    ap.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "paris_trees_bench"))
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (0.25 = +25%%)")
+    ap.add_argument("--out", default=None, help="also write the results to this JSON file")
+    args = ap.parse_args(argv)
+
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for n_rows in args.sizes:
+        print(f"\n=== {n_rows:,} rows ===")
+        csv_path = raw_csv(args.source, n_rows, workdir, seed=args.seed)
+        results[str(n_rows)] = {}
+        for name, setup in build_cases(csv_path):
+            if args.only and args.only not in name:
+                continue
+            r = measure(setup(), args.repeat)
+            results[str(n_rows)][name] = r
+            print(f"{name:<28} median {r['median_s'] * 1000:>10.1f} ms   min {r['min_s'] * 1000:>10.1f} ms   peak {r['peak_mb']:>9.1f} MB")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "data": args.source or f"synthetic (seed {args.seed})",
+        },
+        "results": results,
+    }
+
+    status = 0
+    if args.compare:
+        if not BASELINE.exists():
+            print(f"\nNo baseline at {BASELINE}; run with --save-baseline first.")
+            status = 1
+        else:
+            regressions = compare(results, json.loads(BASELINE.read_text()), args.tolerance)
+            print()
+            for size, name, ratio in regressions:
+                print(f"REGRESSION {name} @ {int(size):,} rows: {ratio:.2f}x baseline")
+            if regressions:
+                status = 1
+            else:
+                print(f"No regression beyond +{args.tolerance:.0%}.")
+
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
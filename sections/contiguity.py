@@ -0,0 +1,114 @@
+# sections/contiguity.py
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.viz import show_chart
+from utils.spatial import CLUSTER_SHARE
+from sections.distribution import ordinal
+
+
+def contiguity_by(df_f: pd.DataFrame, by: str) -> pd.DataFrame:
+    """
+    Same-species neighbourhoods aggregated by `by`: trees, mean share of same-species
+    neighbours, share of trees in a same-species cluster, median distance to another species.
+    """
+    g = df_f.dropna(subset=["same_species_share"])
+    g = g.assign(_clustered=g["same_species_share"].ge(CLUSTER_SHARE))
+    out = (
+        g.groupby(by, observed=True)
+        .agg(
+            trees=("same_species_share", "size"),
+            same_share=("same_species_share", "mean"),
+            clustered=("_clustered", "mean"),
+            nearest_other_m=("nearest_other_m", "median"),
+        )
+        .sort_values(["clustered", "trees"], ascending=False)
+    )
+    return out
+
+
+def contiguity_tables(df_f: pd.DataFrame):
+    """(per district, per species) contiguity_by() of the selection."""
+    return contiguity_by(df_f, "arr_num"), contiguity_by(df_f, "genus_species")
+
+
+def contiguity_figure(by_arr: pd.DataFrame):
+    """Share of trees in same-species clusters per district (None if empty)."""
+    if by_arr.empty:
+        return None
+    t = by_arr.rename_axis("arr").reset_index()
+    t["arr_label"] = t["arr"].astype(int).apply(ordinal)
+    t["pct"] = t["clustered"] * 100
+    t = t.sort_values("pct", ascending=True)
+    fig = px.bar(
+        t,
+        x="pct",
+        y="arr_label",
+        orientation="h",
+        title="Trees in a Same-Species Cluster, by District (%)",
+        labels={"pct": "% of trees", "arr_label": "District"},
+        text=t["pct"].round(1),
+        hover_data={"trees": True, "nearest_other_m": ":.1f"},
+    )
+    fig.update_traces(textposition="outside", cliponaxis=False)
+    fig.update_layout(margin=dict(l=90, r=40, t=50, b=40), height=520, showlegend=False)
+    return fig
+
+
+def contiguity_insight(by_species: pd.DataFrame, min_trees: int = 50, min_share: float = 0.05):
+    """Markdown insight on the species most planted in contiguous blocks (None if none reaches min_share)."""
+    common = by_species[by_species["trees"] >= min_trees]
+    if common.empty or common["clustered"].iloc[0] < min_share:
+        return None
+    top = common.iloc[0]
+    return (
+        f"**Insight:** **{top['clustered'] * 100:.0f}%** of **{common.index[0]}** trees stand in same-species "
+        f"clusters (at least {CLUSTER_SHARE:.0%} of their 8 nearest neighbours are the same species), "
+        f"the nearest other species being a median **{top['nearest_other_m']:.0f} m** away. "
+        "A single pest or disease could spread tree to tree along such rows."
+    )
+
+
+def render(df_filtered: pd.DataFrame, contiguity: tuple = None):
+    """
+    Monoculture-risk section (contiguity: precomputed contiguity_tables()):
+    - share of trees in same-species clusters per district
+    - most clustered species table + insight
+    Neighbourhoods are computed once per dataset (utils.spatial.add_contiguity_columns).
+    """
+    st.subheader("🦠 Monoculture Risk: Same-Species Neighbours")
+    st.markdown("**A row of 200 plane trees is far more exposed to canker than 200 trees scattered among other species.**")
+
+    if df_filtered is None or df_filtered.empty:
+        st.info("No data available after filtering.")
+        return
+    if "same_species_share" not in df_filtered.columns:
+        st.info("Neighbourhood metrics are not available for this dataset.")
+        return
+
+    by_arr, by_species = contiguity if contiguity is not None else contiguity_tables(df_filtered)
+
+    fig = contiguity_figure(by_arr)
+    if fig is not None:
+        show_chart(fig, "contiguity")
+
+    insight = contiguity_insight(by_species)
+    if insight is not None:
+        st.markdown(insight)
+
+    table = by_species[by_species["trees"] >= 20].head(15).reset_index()
+    if not table.empty:
+        st.markdown("**Most clustered species** (20 trees or more in the selection)")
+        st.dataframe(
+            table.assign(
+                same_share=(table["same_share"] * 100).round(1),
+                clustered=(table["clustered"] * 100).round(1),
+            ).rename(columns={
+                "genus_species": "Species", "trees": "Trees",
+                "same_share": "Same-species neighbours (%)", "clustered": "In a cluster (%)",
+                "nearest_other_m": "Median distance to another species (m)",
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+    st.caption("Clustered trees are shown in orange on the map. Neighbours are searched among all trees, whatever the filters.")
@@ -1,12 +1,43 @@
 # sections/data_quality.py
+import time
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
+from utils.quality import evaluate_rules, selection_bits, rule_failures, rule_mask
+from utils.spatial import near_duplicates, duplicate_clusters
 
 
-def render(df_filtered: pd.DataFrame):
-    """Data Quality & Ethics: missingness, duplicates, and validation checks."""
+KEY_COLS = [
+    "lat", "lon", "arr_num",
+    "en_name", "french_name", "genus_species",
+    "height_m", "circumference_cm",
+    "ownership", "growth_stage",
+    "is_remarkable",
+]
+
+
+def missingness(df: pd.DataFrame):
+    """Missing share (%) per key column, highest first; None if no key column is present."""
+    present = [c for c in KEY_COLS if c in df.columns]
+    if not present:
+        return None
+    return (
+        df[present]
+        .isna()
+        .mean()
+        .mul(100)
+        .round(1)
+        .reset_index()
+        .rename(columns={"index": "column", 0: "missing_pct"})
+        .sort_values("missing_pct", ascending=False)
+    )
+
+
+def render(df_filtered: pd.DataFrame, quality: dict = None):
+    """
+    Data Quality & Ethics: missingness, duplicates, and validation checks.
+    `quality` is the precomputed rule bitset from utils.quality.evaluate_rules
+    (evaluated on the filtered rows if not given).
+    """
     st.subheader("🧪 Data Quality & Ethics")
     st.markdown(
         "- Document sampling and known caveats (Open Data portal).\n"
@@ -25,29 +56,11 @@ def render(df_filtered: pd.DataFrame):
     # 1) Missingness (key columns)
     # -----------------------------
     st.subheader("🔎 Missingness (key fields)")
-    key_cols = [
-        "lat", "lon", "arr_num",
-        "en_name", "french_name", "genus_species",
-        "height_m", "circumference_cm",
-        "ownership", "growth_stage",
-        "is_remarkable",
-    ]
-    present = [c for c in key_cols if c in df.columns]
+    miss = missingness(df)
 
-    if not present:
+    if miss is None:
         st.warning("⚠️ None of the expected key columns are present in the dataset.")
     else:
-        miss = (
-            df[present]
-            .isna()
-            .mean()
-            .mul(100)
-            .round(1)
-            .reset_index()
-            .rename(columns={"index": "column", 0: "missing_pct"})
-            .sort_values("missing_pct", ascending=False)
-        )
-
         if miss["missing_pct"].sum() == 0:
             st.success("✅ No missing values detected in key fields — data looks complete!")
         else:
@@ -79,67 +92,25 @@ def render(df_filtered: pd.DataFrame):
     else:
         st.info("No duplicate candidates found with the current heuristic.")
 
+    _near_duplicates_panel(df)
+
     # -----------------------------
     # 3) Validation checks
     # -----------------------------
     st.subheader("✅ Validation Checks")
 
-    checks = []
-
-    # Geography: Paris bounding box (approx)
-    if {"lat", "lon"}.issubset(df.columns):
-        invalid_lat = ~df["lat"].between(48.80, 48.92) & df["lat"].notna()
-        invalid_lon = ~df["lon"].between(2.23, 2.48) & df["lon"].notna()
-        checks.append(("Latitude in Paris [48.80–48.92]", invalid_lat))
-        checks.append(("Longitude in Paris [2.23–2.48]", invalid_lon))
-
-    # Arrondissement 1..20
-    if "arr_num" in df.columns:
-        inv_arr = df["arr_num"].notna() & ~df["arr_num"].between(1, 20)
-        checks.append(("District number in [1–20]", inv_arr))
-
-    # Physical bounds
-    if "height_m" in df.columns:
-        inv_h = df["height_m"].notna() & ~df["height_m"].between(0, 60)  # 0–60 m plausible
-        checks.append(("Height (m) in [0–60]", inv_h))
-    if "circumference_cm" in df.columns:
-        inv_c = df["circumference_cm"].notna() & ~df["circumference_cm"].between(0, 2000)  # 0–2000 cm
-        checks.append(("Circumference (cm) in [0–2000]", inv_c))
-
-    # Allowed categories
-    if "growth_stage" in df.columns:
-        allowed_stage = {"Young", "Adult", "Mature", "Unknown"}
-        inv_stage = df["growth_stage"].notna() & ~df["growth_stage"].astype(str).isin(allowed_stage)
-        checks.append((f"Growth stage ∈ {sorted(allowed_stage)}", inv_stage))
-
-    if "ownership" in df.columns:
-        # derive allowed from current, but flag obvious blanks
-        inv_owner = df["ownership"].astype(str).str.strip().eq("") | df["ownership"].isna()
-        checks.append(("Ownership not empty", inv_owner))
-
-    # Build summary table
-    rows = []
-    for name, mask in checks:
-        fails = int(mask.sum())
-        pct = round(100 * fails / len(df), 2) if len(df) else 0.0
-        rows.append({"rule": name, "failures": fails, "share_%": pct})
-    q = pd.DataFrame(rows).sort_values("share_%", ascending=False)
-
-    st.dataframe(q, use_container_width=True)
+    # Rules are evaluated once per dataset (utils/quality.py); here we only
+    # pick the selection's rows in the violation bitset and popcount them.
+    if quality is None:
+        quality = evaluate_rules(df)
+    bits = selection_bits(quality, df.index)
+    q = rule_failures(quality, bits).sort_values("share_%", ascending=False)
+
+    st.dataframe(q, use_container_width=True, hide_index=True)
 
     # Optional: inspect failing rows for a chosen rule
     if not q.empty:
-        st.markdown("**Inspect failing rows (optional)**")
-        rule_sel = st.selectbox("Pick a rule to preview failing rows", q["rule"].tolist())
-        mask_sel = None
-        for name, mask in checks:
-            if name == rule_sel:
-                mask_sel = mask
-                break
-        if mask_sel is not None and mask_sel.any():
-            st.dataframe(df.loc[mask_sel].head(200))
-        else:
-            st.info("No failing rows for this rule.")
+        _failing_rows_preview(df, quality, bits, q["rule"].tolist())
 
     st.subheader("🧩 Data Quality Notes")
 
@@ -170,7 +141,11 @@ def render(df_filtered: pd.DataFrame):
                 
 
     The initial dataset contained **214,837 trees**, but some of them were **outside of Paris** — for example, in the *Parc de Sceaux* or surrounding suburbs.  
-    After filtering for trees within the city limits, only **150,570 trees** remained.
+    After filtering for trees within the city limits, only **150,570 trees** remained.  
+    This filter is now part of the cleaning pipeline (*boundary* stage): trees outside Paris are flagged by default
+    (check *Inside Paris* in the validation checks above, with a preview of the flagged rows),
+    and dropped with `TREES_BOUNDARY_MODE=drop` (only with the official boundaries, `TREES_BOUNDARIES`: the bundled
+    outline is approximate, so it only flags trees more than 300 m beyond it); the cleaning report lists them per district label.
 
     Yet, according to [official figures from Paris.fr](https://www.paris.fr/pages/dix-ans-de-plantations-a-paris-213-000-arbres-pour-une-ville-plus-resiliente-31389#:~:text=La%20capitale%20compte%20d%C3%A9sormais%20plus,rues%20et%20jardins%20intra%2Dmuros.),  
     Paris reportedly has **over 500,000 trees** today.  
@@ -202,3 +177,118 @@ def render(df_filtered: pd.DataFrame):
     though it could slightly underestimate the number of younger trees in the city.
     """, unsafe_allow_html=True)
 
+
+
+def render_cleaning_report(report: pd.DataFrame):
+    """Per-stage report of clean_trees (see utils.prep.clean_trees(with_report=True))."""
+    st.subheader("🧹 Cleaning Pipeline")
+    if report is None or report.empty:
+        st.info("No cleaning report available.")
+        return
+
+    total = report["seconds"].sum()
+    slowest = report.loc[report["seconds"].idxmax()]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Total cleaning time", f"{total:.2f} s")
+    c2.metric("Slowest stage", slowest["stage"], f"{100 * slowest['seconds'] / total:.0f}% of total" if total else None,
+              delta_color="off")
+    c3.metric("Rows kept", f"{int(report['rows_out'].iloc[-1]):,}".replace(",", " "),
+              f"{int(report['rows_out'].iloc[-1] - report['rows_in'].iloc[0]):,}".replace(",", " "))
+
+    st.dataframe(
+        report.drop(columns="notes").style.bar(subset=["seconds"], color="#e8b923"),
+        use_container_width=True,
+        hide_index=True,
+    )
+    for _, row in report[report["notes"].ne("")].iterrows():
+        with st.expander(f"Messages — {row['stage']}"):
+            st.text(row["notes"].replace(" | ", "\n"))
+
+
+def render_district_report(report: pd.DataFrame):
+    """Geometric vs label-based district per source label (see utils.districts.add_district_numbers)."""
+    st.subheader("🗺️ District Assignment")
+    if report is None or report.empty:
+        st.info(
+            "Coordinate-based assignment is off (no boundaries are bundled): districts are read from the "
+            "'district' label, so trees labelled with a wood or a suburb have no district. "
+            "To place trees by their coordinates, download *arrondissements.geojson* from opendata.paris.fr "
+            "and set `TREES_BOUNDARIES` to its path."
+        )
+        return
+
+    total = int(report["trees"].sum())
+    inside = int(report["same"].sum() + report["other"].sum())
+    gained = int(report.loc[report["label_arr"].eq(""), ["same", "other"]].sum().sum())
+    moved = int(report.loc[report["label_arr"].ne(""), "other"].sum())
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Trees inside a district", f"{inside:,}".replace(",", " "), f"{100 * inside / total:.1f}%" if total else None,
+              delta_color="off")
+    c2.metric("Placed despite their label", f"{gained:,}".replace(",", " "),
+              help="Labelled with a wood, a suburb or nothing, but standing inside an arrondissement.")
+    c3.metric("Moved to another district", f"{moved:,}".replace(",", " "),
+              help="The label names one arrondissement, the coordinates fall in another.")
+
+    st.dataframe(
+        report.rename(columns={
+            "district": "Label", "trees": "Trees", "label_arr": "Label district", "same": "Same district",
+            "other": "Other district", "outside": "Outside Paris", "no_coords": "No coordinates",
+            "moved_to": "Mostly moved to",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+@st.fragment
+def _failing_rows_preview(df: pd.DataFrame, quality: dict, bits, rules: list):
+    """
+    Rule picker + failing-row preview, rerun on its own.
+    Picking another rule only reruns this fragment: it reuses the filtered
+    frame and the bitset it was called with instead of rerunning the whole app.
+    """
+    st.markdown("**Inspect failing rows (optional)**")
+    rule_sel = st.selectbox("Pick a rule to preview failing rows", rules)
+    mask_sel = rule_mask(quality, bits, rule_sel)
+    if mask_sel.any():
+        st.dataframe(df.loc[mask_sel].head(200))
+    else:
+        st.info("No failing rows for this rule.")
+
+
+@st.fragment
+def _near_duplicates_panel(df: pd.DataFrame):
+    """
+    Same tree entered twice a few metres apart: exact matching misses it.
+    Pairs of same-genus trees within a chosen distance, grouped into clusters.
+    """
+    st.markdown("**Near duplicates (same genus, a few metres apart)**")
+    radius = st.slider(
+        "Maximum distance (m)", min_value=0.5, max_value=5.0, value=1.0, step=0.5,
+        help="Two trees of the same genus closer than this are reported as a possible double entry.",
+    )
+
+    t0 = time.perf_counter()
+    pairs = near_duplicates(df, radius_m=radius, match_col="genus")
+    clusters = duplicate_clusters(pairs)
+    elapsed = time.perf_counter() - t0
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Close pairs", f"{len(pairs):,}".replace(",", " "))
+    c2.metric("Clusters", f"{clusters.nunique():,}".replace(",", " "))
+    c3.metric("Trees involved", f"{len(clusters):,}".replace(",", " "))
+    st.caption(f"KD-tree search over {len(df):,} trees in {elapsed * 1000:.0f} ms.".replace(",", " "))
+
+    if pairs.empty:
+        st.info("No near-duplicate candidates at this distance.")
+        return
+
+    cols = [c for c in ["genus_species", "en_name", "district", "lat", "lon", "height_m", "circumference_cm"] if c in df.columns]
+    members = df.loc[clusters.index, cols].assign(cluster=clusters.to_numpy())
+    summary = (
+        members.groupby("cluster")
+        .agg(trees=("cluster", "size"), **{c: (c, "first") for c in cols if c not in ("lat", "lon")},
+             lat=("lat", "mean"), lon=("lon", "mean"))
+        .sort_values("trees", ascending=False)
+    )
+    st.dataframe(summary.head(200), use_container_width=True)
@@ -2,18 +2,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.viz import show_chart
+from utils.bootstrap import share_intervals, ci_text
 
 
-def render(df_filtered: pd.DataFrame):
-    """Show distribution of trees by district (arrondissement) with auto insights."""
-    st.subheader("Tree Distribution by District")
-    st.markdown("**Outer districts host the majority of Paris’s trees, revealing clear environmental inequalities.**")
+def ordinal(n):
+    """Format district labels like '12th', '19th', etc."""
+    return f"{n}{'th' if 10 <= n % 100 <= 20 else {1:'st',2:'nd',3:'rd'}.get(n % 10, 'th')}"
 
-    if "arr_num" not in df_filtered.columns or df_filtered["arr_num"].dropna().empty:
-        st.info("No district data available after filtering.")
-        return
 
-    # --- Data aggregation ---
+def district_counts(df_filtered: pd.DataFrame) -> pd.DataFrame:
+    """Trees per district ('arr', 'tree_count', 'arr_label'), largest first."""
     arr_counts = (
         df_filtered.dropna(subset=["arr_num"])
         .assign(arr=lambda d: d["arr_num"].astype("Int64"))
@@ -22,14 +21,31 @@ def render(df_filtered: pd.DataFrame):
         .rename(columns={"size": "tree_count"})
         .sort_values("tree_count", ascending=False)
     )
+    arr_counts["arr_label"] = arr_counts["arr"].apply(ordinal)
+    return arr_counts
 
-    # --- Format district labels like '12th', '19th', etc. ---
-    def ordinal(n):
-        return f"{n}{'th' if 10 <= n % 100 <= 20 else {1:'st',2:'nd',3:'rd'}.get(n % 10, 'th')}"
 
-    arr_counts["arr_label"] = arr_counts["arr"].apply(ordinal)
+# --- Helper functions for insight formatting ---
+def _fmt_n(n):
+    try:
+        return f"{int(n):,}".replace(",", " ")
+    except Exception:
+        return "0"
 
-    # --- Bar chart ---
+
+def _pct(x):
+    try:
+        return f"{x * 100:.1f}%"
+    except Exception:
+        return "0%"
+
+
+def _safe_div(num, den):
+    return (float(num) / float(den)) if (den not in (0, None) and pd.notna(den)) else 0.0
+
+
+def district_figure(arr_counts: pd.DataFrame):
+    """Horizontal bar chart of district_counts()."""
     fig_arr = px.bar(
         arr_counts,
         x="tree_count",
@@ -49,69 +65,184 @@ def render(df_filtered: pd.DataFrame):
         showlegend=False,
         yaxis=dict(categoryorder="array", categoryarray=arr_counts["arr_label"][::-1]),
     )
+    return fig_arr
 
-    st.plotly_chart(fig_arr, use_container_width=True)
-
-    # --- Helper functions for insight formatting ---
-    def _fmt_n(n):
-        try:
-            return f"{int(n):,}".replace(",", " ")
-        except Exception:
-            return "0"
-
-    def _pct(x):
-        try:
-            return f"{x * 100:.1f}%"
-        except Exception:
-            return "0%"
-
-    def _safe_div(num, den):
-        return (float(num) / float(den)) if (den not in (0, None) and pd.notna(den)) else 0.0
 
-    # --- Dynamic textual insight ---
+def district_insight(arr_counts: pd.DataFrame):
+    """Markdown insight on how trees spread over districts (None if there is nothing to say)."""
     if arr_counts.empty:
-        st.info("No district data available after filtering.")
-        return
+        return None
 
     total = int(pd.to_numeric(arr_counts["tree_count"], errors="coerce").fillna(0).sum())
     n_arr = len(arr_counts)
 
     if total == 0:
-        st.info("No trees available in the current selection (total = 0).")
-        return
+        return None
 
     if n_arr == 1:
         only = arr_counts.iloc[0]
         lbl = only["arr_label"]
         share = _safe_div(only["tree_count"], total)
-        st.markdown(
+        return (
             f"**Insight:** Only district **{lbl}** appears in the current selection, "
             f"with **{_fmt_n(only['tree_count'])} trees** ({_pct(share)})."
         )
-    else:
-        arr_counts = arr_counts.sort_values("tree_count", ascending=False)
-        top = arr_counts.iloc[0]
-        bot = arr_counts.iloc[-1]
-
-        k = min(3, n_arr)
-        topk_share = _safe_div(arr_counts.head(k)["tree_count"].sum(), total)
-        top_share = _safe_div(top["tree_count"], total)
-        bot_share = _safe_div(bot["tree_count"], total)
-
-        median = float(pd.to_numeric(arr_counts["tree_count"], errors="coerce").median())
-        gap_vs_median = _safe_div(top["tree_count"] - median, median) if n_arr >= 3 and median > 0 else None
-
-        insight = (
-            f"**Insight:** District **{top['arr_label']}** leads with "
-            f"**{_fmt_n(top['tree_count'])} trees** ({_pct(top_share)} of the selection). "
-            f"The **top {k} districts** hold **{_pct(topk_share)}** of all trees, "
-            f"while **{bot['arr_label']}** accounts for only **{_pct(bot_share)}**."
+
+    arr_counts = arr_counts.sort_values("tree_count", ascending=False)
+    top = arr_counts.iloc[0]
+    bot = arr_counts.iloc[-1]
+
+    k = min(3, n_arr)
+    topk_share = _safe_div(arr_counts.head(k)["tree_count"].sum(), total)
+    top_share = _safe_div(top["tree_count"], total)
+    bot_share = _safe_div(bot["tree_count"], total)
+
+    # bootstrap intervals of the three quoted shares (shown only when wide)
+    ci_top, ci_topk, ci_bot = (
+        ci_text(iv) for iv in share_intervals(
+            pd.to_numeric(arr_counts["tree_count"], errors="coerce").fillna(0).to_numpy(),
+            [0, list(range(k)), n_arr - 1],
         )
+    )
+
+    median = float(pd.to_numeric(arr_counts["tree_count"], errors="coerce").median())
+    gap_vs_median = _safe_div(top["tree_count"] - median, median) if n_arr >= 3 and median > 0 else None
 
-        if gap_vs_median is not None:
-            if gap_vs_median >= 0.5:
-                insight += f" The top district stands **well above the median** (+{gap_vs_median*100:.0f}%)."
-            elif gap_vs_median >= 0.2:
-                insight += f" The leader is **clearly above the median** (+{gap_vs_median*100:.0f}%)."
+    insight = (
+        f"**Insight:** District **{top['arr_label']}** leads with "
+        f"**{_fmt_n(top['tree_count'])} trees** ({_pct(top_share)}{ci_top} of the selection). "
+        f"The **top {k} districts** hold **{_pct(topk_share)}**{ci_topk} of all trees, "
+        f"while **{bot['arr_label']}** accounts for only **{_pct(bot_share)}**{ci_bot}."
+    )
 
-        st.markdown(insight)
+    if gap_vs_median is not None:
+        if gap_vs_median >= 0.5:
+            insight += f" The top district stands **well above the median** (+{gap_vs_median*100:.0f}%)."
+        elif gap_vs_median >= 0.2:
+            insight += f" The leader is **clearly above the median** (+{gap_vs_median*100:.0f}%)."
+    return insight
+
+
+def canopy_figure(districts: pd.DataFrame):
+    """Canopy cover (% of district area) per district, highest first."""
+    t = districts.assign(
+        arr_label=districts["arr_num"].apply(ordinal),
+        pct=(districts["coverage"] * 100).round(1),
+    ).sort_values("pct", ascending=False)
+    fig = px.bar(
+        t,
+        x="pct",
+        y="arr_label",
+        orientation="h",
+        title="Estimated Canopy Cover by District (% of district area)",
+        labels={"pct": "Canopy cover (%)", "arr_label": "District"},
+        text="pct",
+        hover_data={"covered_ha": ":.1f", "area_ha": True, "trees": True},
+    )
+    fig.update_traces(textposition="outside", cliponaxis=False)
+    fig.update_layout(
+        margin=dict(l=90, r=30, t=50, b=40),
+        height=520,
+        showlegend=False,
+        yaxis=dict(categoryorder="array", categoryarray=t["arr_label"][::-1]),
+    )
+    return fig
+
+
+def canopy_insight(districts: pd.DataFrame):
+    """Markdown insight contrasting canopy cover with tree counts (None if fewer than 2 districts)."""
+    if len(districts) < 2:
+        return None
+    t = districts.sort_values("coverage", ascending=False)
+    top, bot = t.iloc[0], t.iloc[-1]
+    total = _safe_div(t["covered_ha"].sum(), t["area_ha"].sum())
+    most_trees = t.loc[t["trees"].idxmax()]
+    text = (
+        f"**Insight:** Tree crowns cover an estimated **{_pct(total)}** of the selected districts, "
+        f"from **{_pct(top['coverage'])}** in the **{ordinal(int(top['arr_num']))}** "
+        f"to **{_pct(bot['coverage'])}** in the **{ordinal(int(bot['arr_num']))}**."
+    )
+    if most_trees["arr_num"] != top["arr_num"]:
+        text += (
+            f" The **{ordinal(int(most_trees['arr_num']))}** has the most trees, "
+            "but not the most shade: size matters as much as numbers."
+        )
+    return text
+
+
+def render_canopy_map(canopy: dict):
+    """Choropleth of the canopy cover per grid cell (on-demand block)."""
+    from utils.spatial import cell_geojson
+
+    if canopy is None or canopy["cells"].empty:
+        st.info("Canopy estimates are not available for this dataset.")
+        return
+    cells = canopy["cells"][canopy["cells"]["covered_m2"] > 0].reset_index(drop=True)
+    cells = cells.assign(cell=cells.index, pct=(cells["coverage"] * 100).round(1))
+    fig = px.choropleth_mapbox(
+        cells,
+        geojson=cell_geojson(cells["ix"], cells["iy"], canopy["cell_m"]),
+        locations="cell",
+        color="pct",
+        color_continuous_scale="Greens",
+        range_color=(0, float(cells["pct"].quantile(0.98)) or 1.0),
+        hover_data={"cell": False, "pct": True, "covered_m2": ":,.0f", "trees": True},
+        labels={"pct": "Canopy cover (%)", "covered_m2": "Crown area (m²)", "trees": "Trees"},
+        center={"lat": 48.8566, "lon": 2.3522},
+        zoom=10.8,
+        opacity=0.75,
+        height=560,
+    )
+    fig.update_traces(marker_line_width=0)
+    fig.update_layout(mapbox_style="carto-darkmatter", margin=dict(l=0, r=0, t=0, b=0))
+    show_chart(fig, "canopy_map")
+    n_estimated = f"{canopy['n_estimated']:,}".replace(",", " ")
+    n_trees = f"{canopy['n_trees']:,}".replace(",", " ")
+    st.caption(
+        f"{canopy['cell_m']:.0f} m cells, crowns rasterized at {canopy['res_m']:g} m; "
+        f"{n_estimated} of {n_trees} crowns estimated from height or genus."
+    )
+
+
+def render(df_filtered: pd.DataFrame, arr_counts: pd.DataFrame = None, canopy: dict = None):
+    """
+    Show distribution of trees by district (arrondissement) with auto insights.
+    arr_counts: precomputed district_counts(df_filtered), if available.
+    canopy: canopy_coverage() of the dataset (utils/canopy.py): cover of the selected districts.
+    """
+    st.subheader("Tree Distribution by District")
+    st.markdown("**Outer districts host the majority of Paris’s trees, revealing clear environmental inequalities.**")
+
+    if "arr_num" not in df_filtered.columns or df_filtered["arr_num"].dropna().empty:
+        st.info("No district data available after filtering.")
+        return
+
+    if arr_counts is None:
+        arr_counts = district_counts(df_filtered)
+
+    # --- Bar chart ---
+    show_chart(district_figure(arr_counts), "distribution")
+
+    # --- Dynamic textual insight ---
+    if arr_counts.empty:
+        st.info("No district data available after filtering.")
+        return
+
+    insight = district_insight(arr_counts)
+    if insight is None:
+        st.info("No trees available in the current selection (total = 0).")
+        return
+    st.markdown(insight)
+
+    # --- Canopy cover: shade, not just tree counts ---
+    if canopy is not None:
+        districts = canopy["districts"][canopy["districts"]["arr_num"].isin(arr_counts["arr"])]
+        if not districts.empty:
+            show_chart(canopy_figure(districts), "canopy")
+            canopy_text = canopy_insight(districts)
+            if canopy_text is not None:
+                st.markdown(canopy_text)
+            st.caption(
+                "Crown sizes estimated from trunk circumference (per-genus allometry), all trees of each district, "
+                "overlaps counted once. Areas of the 12th and 16th exclude the Bois de Vincennes and Boulogne."
+            )
@@ -2,20 +2,275 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.viz import show_chart
 from utils.prep import pick_common_name_col  # helper: choose en_name else french_name
+from utils.bootstrap import share_intervals, ci_text
+from utils.biodiversity import diversity_metrics, sparse_metrics, RULE_10_20_30
+from utils.similarity import abundance_matrix
+from utils.spatial import grid_cells, cell_geojson
 
+# A cell is a near-monoculture when one species holds this share of its trees
+MONOCULTURE_SHARE = 0.8
 
-def render(df_filtered: pd.DataFrame, label_mode: str = "Common name"):
+
+def species_labels(df_filtered: pd.DataFrame, label_mode: str = "Common name"):
+    """
+    Non-empty species labels of the selection for the chosen label_mode.
+    Returns (label_col, title_label, series); label_col is None if the column is missing.
+    """
+    if label_mode == "Scientific name":
+        label_col = "genus_species" if "genus_species" in df_filtered.columns else None
+        title_label = "Scientific name"
+    else:
+        # Common-name mode, aligned with overview: prefer en_name then french_name
+        label_col = pick_common_name_col(df_filtered)
+        title_label = "Common name"
+
+    if label_col is None:
+        return None, title_label, pd.Series(dtype="object")
+
+    series = (
+        df_filtered[label_col]
+        .astype(str).str.strip()
+        .replace({"": pd.NA})
+        .dropna()
+    )
+    return label_col, title_label, series
+
+
+def species_counts(series: pd.Series) -> pd.Series:
+    """Trees per species label, most frequent first."""
+    return series.value_counts()
+
+
+def top_species_figure(counts: pd.Series, label_col: str, title_label: str, n_rows: int):
+    """Top-20 bar chart with the average-per-species reference line (None if no species)."""
+    top_species = (
+        counts.head(20)
+        .rename_axis(label_col)
+        .rename("count")
+        .reset_index()
+    )
+    if top_species.empty:
+        return None
+
+    # n_unique & reference line computed on the non-empty series
+    n_unique = counts.size
+    ref = (n_rows / n_unique) if n_unique else 0
+
+    fig = px.bar(
+        top_species,
+        x="count",
+        y=label_col,
+        orientation="h",
+        title=f"Top 20 — {title_label}",
+        labels={"count": "Number of Trees", label_col: title_label},
+        text="count",
+    )
+
+    # Reference line (average per species across the selection)
+    if ref > 0:
+        fig.add_vline(
+            x=ref,
+            line_dash="dash",
+            line_color="#FFFFFF",
+            annotation_text="Average threshold across all species",
+            annotation_position="top right",
+            annotation_font_color="#FFFFFF",
+            annotation_textangle=0,
+            annotation_xshift=40,
+            annotation_yshift=10,
+        )
+
+    # Value labels & layout tweaks
+    fig.update_traces(
+        textposition="inside",
+        insidetextanchor="start",
+        textfont_color="black",
+        textfont_size=12,
+        cliponaxis=False,
+    )
+    xmax = float(max(top_species["count"].max(), ref)) * 1.05 if len(top_species) else 1.0
+    fig.update_xaxes(range=[0, xmax], title=None, showgrid=False)
+    fig.update_layout(
+        yaxis_side="left",
+        margin=dict(l=100, r=40, t=50, b=40),
+        bargap=0.15,
+        height=420,
+        showlegend=False,
+    )
+    return fig
+
+
+def diversity_insight(counts: pd.Series):
+    """Markdown insight about concentration / diversity (None if no species)."""
+    if counts.empty:
+        return None
+
+    shares = counts / counts.sum()
+    n_species = shares.size
+    top5_share = shares.head(5).sum() * 100 if n_species else 0
+    lead_species = shares.index[0] if n_species else ""
+    lead_share = shares.iloc[0] * 100 if n_species else 0
+    ci_lead, ci_top5 = (ci_text(iv) for iv in share_intervals(counts.to_numpy(), [0, list(range(min(5, n_species)))]))
+
+    if n_species <= 3:
+        return (
+            f"**Insight:** Few species are present in the current selection ({n_species}). "
+            f"**{lead_species}** dominates with **{lead_share:.1f}%**{ci_lead} of trees. "
+            "Limited diversity weakens local resilience."
+        )
+    if n_species <= 10:
+        return (
+            f"**Insight:** The tree population is concentrated: **{lead_species}** is most frequent "
+            f"({lead_share:.1f}%{ci_lead}), and the top 5 species account for **{top5_share:.1f}%**{ci_top5} of the total. "
+            "This dependence reduces resilience to diseases and climate stress."
+        )
+    return (
+        f"**Insight:** Despite good diversity ({n_species} species identified), a few species still dominate, "
+        f"led by **{lead_species}** ({lead_share:.1f}%{ci_lead} of trees). "
+        "Balancing density and diversity remains key to long-term urban resilience."
+    )
+
+
+def biodiversity_tables(df_filtered: pd.DataFrame):
+    """(overall, per_district) diversity_metrics() of the selection."""
+    by_arr = diversity_metrics(df_filtered, by="arr_num") if "arr_num" in df_filtered.columns else None
+    return diversity_metrics(df_filtered), by_arr
+
+
+def render_indices(overall: pd.DataFrame, by_arr: pd.DataFrame = None):
+    """Diversity indices, the 10-20-30 rule check and the per-district table."""
+    m = overall.iloc[0]
+    if not m["n_trees"]:
+        return
+
+    st.subheader("Diversity Indices")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("🌿 Species Richness", int(m["richness"]), help="Distinct scientific names (genus + species).")
+    c2.metric("📈 Shannon H′", f"{m['shannon']:.2f}", help="Entropy of species shares (natural log): higher = more diverse.")
+    c3.metric("🎲 Simpson 1−D", f"{m['simpson']:.3f}", help="Probability that two random trees belong to different species.")
+    c4.metric(
+        "⚖️ Pielou Evenness", "N/A" if pd.isna(m["pielou"]) else f"{m['pielou']:.2f}",
+        help="Shannon H′ / ln(richness): 1 = all species equally abundant.",
+    )
+
+    # 10-20-30 rule: largest species / genus / family shares vs. their caps
+    lines = []
+    for level, cap in RULE_10_20_30.items():
+        if f"top_{level}" not in m or m[f"top_{level}"] is None:
+            continue
+        ok = "✅" if m[f"rule_{level}"] else "❌"
+        lines.append(
+            f"{ok} {level.capitalize()} ≤ {cap:.0%}: largest is **{m[f'top_{level}']}** ({m[f'top_{level}_share'] * 100:.1f}%)"
+        )
+    if lines:
+        st.markdown("**10-20-30 rule** (no species above 10%, genus above 20%, family above 30% of trees)  \n" + "  \n".join(lines))
+
+    if by_arr is not None and len(by_arr) > 1:
+        with st.expander("Diversity by district"):
+            table = by_arr.reset_index().rename(columns={"arr_num": "district"})
+            st.dataframe(
+                table[["district", "n_trees", "richness", "shannon", "simpson", "pielou",
+                       "top_species", "top_species_share", "rule_10_20_30"]].round(3),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+
+def grid_diversity(df_filtered: pd.DataFrame, cell_m: float = 250.0, min_trees: int = 5):
+    """
+    Species richness and Shannon index per square grid cell of the selection:
+    (cells DataFrame, GeoJSON of the cells). Cells with fewer than min_trees
+    trees are left out (an index over 2 trees says little).
+    """
+    codes, ix, iy = grid_cells(df_filtered["lat"].to_numpy(), df_filtered["lon"].to_numpy(), cell_m)
+    X, _, _ = abundance_matrix(df_filtered, codes)
+    m = sparse_metrics(X)
+    cells = pd.DataFrame({
+        "ix": ix[:X.shape[0]], "iy": iy[:X.shape[0]],
+        "n_trees": m["n"], "richness": m["richness"],
+        "shannon": m["shannon"].round(3), "top_share": m["top_share"],
+    })
+    cells = cells[cells["n_trees"] >= min_trees].reset_index(drop=True)
+    cells["cell"] = cells.index
+    return cells, cell_geojson(cells["ix"], cells["iy"], cell_m)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_grid_diversity(view_key, cell_m: float, _df: pd.DataFrame):
+    # keyed on the selection (dataset version, FilterState) and cell size, not on the rows
+    return grid_diversity(_df.dropna(subset=["lat", "lon"]), cell_m)
+
+
+def diversity_map_figure(cells: pd.DataFrame, geojson: dict, metric: str):
+    """Choropleth of grid_diversity() on the dark basemap of the tree map."""
+    color = {"Shannon index": "shannon", "Species richness": "richness"}[metric]
+    fig = px.choropleth_mapbox(
+        cells,
+        geojson=geojson,
+        locations="cell",
+        color=color,
+        color_continuous_scale="Viridis",
+        range_color=(0, float(cells[color].quantile(0.98)) or 1.0),
+        hover_data={"cell": False, "n_trees": True, "richness": True, "shannon": ":.2f", "top_share": ":.0%"},
+        labels={"shannon": "Shannon H′", "richness": "Species", "n_trees": "Trees", "top_share": "Largest species"},
+        center={"lat": 48.8566, "lon": 2.3522},
+        zoom=10.8,
+        opacity=0.7,
+        height=560,
+    )
+    fig.update_traces(marker_line_width=0)
+    fig.update_layout(mapbox_style="carto-darkmatter", margin=dict(l=0, r=0, t=0, b=0))
+    return fig
+
+
+@st.fragment
+def _diversity_map(df_filtered: pd.DataFrame, view_key=None):
+    """
+    Grid-cell diversity layer; the metric and cell size rerun only this block.
+    The cells are cached per view_key and cell size, so switching the metric
+    or going back to a cell size does not recompute them.
+    """
+    st.subheader("Where Diversity Thins Out")
+    c1, c2 = st.columns(2)
+    metric = c1.radio("Map", ["Shannon index", "Species richness"], horizontal=True)
+    cell_m = c2.select_slider("Cell size (m)", options=[100, 250, 500], value=250)
+
+    if view_key is None:
+        cells, geojson = grid_diversity(df_filtered.dropna(subset=["lat", "lon"]), cell_m)
+    else:
+        cells, geojson = _cached_grid_diversity(view_key, cell_m, df_filtered)
+    if cells.empty:
+        st.info("Not enough trees per cell to map diversity for this selection.")
+        return
+    show_chart(diversity_map_figure(cells, geojson, metric), "diversity_map")
+
+    mono = cells["top_share"] >= MONOCULTURE_SHARE
+    st.markdown(
+        f"**Insight:** **{int(mono.sum())}** of {len(cells)} cells ({mono.mean() * 100:.1f}%) are near-monocultures, "
+        f"with one species making up at least {MONOCULTURE_SHARE:.0%} of their trees."
+    )
+    st.caption(f"{cell_m} m cells with at least 5 trees; Shannon index on scientific names.")
+
+
+def render(df_filtered: pd.DataFrame, label_mode: str = "Common name", species: tuple = None,
+           indices: tuple = None, view_key=None):
     """
     Diversity section:
     - Title + context
     - Top-20 species bar chart (with average reference line)
     - Dynamic insight text about concentration/diversity
+    - Diversity indices (richness, Shannon, Simpson, Pielou) + 10-20-30 rule, per district
+    - Grid-cell diversity map (Shannon / richness) + near-monoculture insight
     - Closing narrative block
 
     label_mode:
         - "Common name"      -> uses 'en_name' (fallback to 'french_name')
         - "Scientific name"  -> uses 'genus_species'
+    species: precomputed (label_col, title_label, species_counts()) for label_mode
+    indices: precomputed biodiversity_tables()
+    view_key: hashable key of the selection (dataset version, FilterState), caches the diversity map
     """
     st.subheader("🌿 Diversity in Disguise")
     st.markdown("**A city rich in trees, yet poor in variety — a handful of species dominate Paris’s urban canopy, leaving it fragile against heat and disease.**")
@@ -25,127 +280,43 @@ def render(df_filtered: pd.DataFrame, label_mode: str = "Common name"):
         return
 
     # ---- Choose the display column based on label_mode ----
-    if label_mode == "Scientific name":
-        if "genus_species" not in df_filtered.columns:
-            st.info("Scientific name column ('genus_species') is missing.")
-            return
-        label_col = "genus_species"
-        title_label = "Scientific name"
-        series = (
-            df_filtered[label_col]
-            .astype(str).str.strip()
-            .replace({"": pd.NA})
-            .dropna()
-        )
+    if species is not None:
+        label_col, title_label, counts = species
     else:
-        # Common-name mode, aligned with overview: prefer en_name then french_name
-        label_col = pick_common_name_col(df_filtered)
-        if label_col is None:
+        label_col, title_label, series = species_labels(df_filtered, label_mode)
+    if label_col is None:
+        if label_mode == "Scientific name":
+            st.info("Scientific name column ('genus_species') is missing.")
+        else:
             st.info("No common name column found ('en_name' or 'french_name').")
-            return
-        title_label = "Common name"
-        series = (
-            df_filtered[label_col]
-            .astype(str).str.strip()
-            .replace({"": pd.NA})
-            .dropna()
-        )
+        return
 
-    # ---- Top species (Top 20) ----
-    top_species = (
-        series.to_frame(name=label_col)
-        .groupby(label_col).size()
-        .sort_values(ascending=False)
-        .head(20)
-        .rename("count")
-        .reset_index()
-    )
+    # ---- Counts per species (shared by the chart and the insight) ----
+    if species is None:
+        counts = species_counts(series)
 
+    # ---- Top species (Top 20) ----
     st.subheader("Dominant Species in the Selected Area")
-    if top_species.empty:
+    fig = top_species_figure(counts, label_col, title_label, len(df_filtered))
+    if fig is None:
         st.info("No species available for the current selection.")
     else:
-        # n_unique & reference line computed on the non-empty series
-        n_unique = series.nunique()
-        ref = (len(df_filtered) / n_unique) if n_unique else 0
-
-        fig = px.bar(
-            top_species,
-            x="count",
-            y=label_col,
-            orientation="h",
-            title=f"Top 20 — {title_label}",
-            labels={"count": "Number of Trees", label_col: title_label},
-            text="count",
-        )
-
-        # Reference line (average per species across the selection)
-        if ref > 0:
-            fig.add_vline(
-                x=ref,
-                line_dash="dash",
-                line_color="#FFFFFF",
-                annotation_text="Average threshold across all species",
-                annotation_position="top right",
-                annotation_font_color="#FFFFFF",
-                annotation_textangle=0,
-                annotation_xshift=40,
-                annotation_yshift=10,
-            )
-
-        # Value labels & layout tweaks
-        fig.update_traces(
-            textposition="inside",
-            insidetextanchor="start",
-            textfont_color="black",
-            textfont_size=12,
-            cliponaxis=False,
-        )
-        xmax = float(max(top_species["count"].max(), ref)) * 1.05 if len(top_species) else 1.0
-        fig.update_xaxes(range=[0, xmax], title=None, showgrid=False)
-        fig.update_layout(
-            yaxis_side="left",
-            margin=dict(l=100, r=40, t=50, b=40),
-            bargap=0.15,
-            height=420,
-            showlegend=False,
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Optional: quick headline about the leading species (not displayed, but kept if needed)
-        # lead = top_species.iloc[0]
-        # share = (series.eq(lead[label_col]).mean() * 100) if len(series) else 0
+        show_chart(fig, "diversity")
 
     # ---- Dynamic insight about concentration / diversity ----
-    if not series.empty:
-        species_counts = series.value_counts(normalize=True)
-        n_species = species_counts.size
-        top5_share = species_counts.head(5).sum() * 100 if n_species else 0
-        lead_species = species_counts.index[0] if n_species else ""
-        lead_share = species_counts.iloc[0] * 100 if n_species else 0
-
-        if n_species <= 3:
-            st.markdown(
-                f"**Insight:** Few species are present in the current selection ({n_species}). "
-                f"**{lead_species}** dominates with **{lead_share:.1f}%** of trees. "
-                "Limited diversity weakens local resilience."
-            )
-        elif n_species <= 10:
-            st.markdown(
-                f"**Insight:** The tree population is concentrated: **{lead_species}** is most frequent "
-                f"({lead_share:.1f}%), and the top 5 species account for **{top5_share:.1f}%** of the total. "
-                "This dependence reduces resilience to diseases and climate stress."
-            )
-        else:
-            st.markdown(
-                f"**Insight:** Despite good diversity ({n_species} species identified), a few species still dominate, "
-                f"led by **{lead_species}** ({lead_share:.1f}% of trees). "
-                "Balancing density and diversity remains key to long-term urban resilience."
-            )
+    insight = diversity_insight(counts)
+    if insight is not None:
+        st.markdown(insight)
     else:
         st.info("No data available to generate a diversity insight.")
 
+    # ---- Diversity indices + 10-20-30 rule ----
+    render_indices(*(indices if indices is not None else biodiversity_tables(df_filtered)))
+
+    # ---- Diversity per grid cell ----
+    if {"lat", "lon"} <= set(df_filtered.columns):
+        _diversity_map(df_filtered, view_key)
+
     # ---- Closing narrative ----
     st.markdown(
         """
@@ -2,34 +2,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.viz import show_chart
+from utils.bootstrap import share_intervals, ci_text
 
 
-def render(df_filtered: pd.DataFrame):
-    """Distribution by growth stage + insight, adapté à 'growth_stage'."""
-    st.subheader("🧭 How old is Paris’s urban forest?")
-    st.markdown(
-        """
-        <div style="text-align: justify; font-size: 1.05rem; line-height: 1.6; max-width: 1200px;">
-        Most of Paris’s trees are at an adult stage — a sign of a well-established canopy, yet a reminder that renewal must soon take root.
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    st.subheader("Distribution by Growth Stage (Filtered)")
-
-    if df_filtered is None or df_filtered.empty:
-        st.info("No data available after filtering.")
-        return
-
-    if "growth_stage" not in df_filtered.columns:
-        st.info("No growth stage information available in the dataset.")
-        return
-
-    df_f = df_filtered.copy()
-
-    # Comptages par stade (on masque 'Unknown' dans le graphe)
-    st_counts = (
+def stage_counts(df_f: pd.DataFrame) -> pd.DataFrame:
+    """Trees per growth stage ('stage', 'count'), most frequent first, 'Unknown' included."""
+    return (
         df_f["growth_stage"]
         .fillna("Unknown")
         .astype(str)
@@ -39,19 +18,22 @@ def render(df_filtered: pd.DataFrame):
         .reset_index(name="count")
     )
 
+
+STAGE_ORDER = ["Young tree", "Adult", "Mature"]
+
+
+def stage_figure(all_counts: pd.DataFrame):
+    """Bar chart of the known growth stages, in life order (None if only 'Unknown')."""
     # Supprimer Unknown pour la visualisation
-    st_counts = st_counts[st_counts["stage"].str.lower() != "unknown"]
+    st_counts = all_counts[all_counts["stage"].str.lower() != "unknown"].copy()
 
     # Ordre fixe
-    order = ["Young tree", "Adult", "Mature"]
-    st_counts["stage"] = pd.Categorical(st_counts["stage"], categories=order, ordered=True)
+    st_counts["stage"] = pd.Categorical(st_counts["stage"], categories=STAGE_ORDER, ordered=True)
     st_counts = st_counts.sort_values("stage")
 
     if st_counts.empty:
-        st.info("No growth stage distribution to display.")
-        return
+        return None
 
-    # Graphique
     fig_st = px.bar(
         st_counts,
         x="count",
@@ -65,25 +47,62 @@ def render(df_filtered: pd.DataFrame):
     xmax = float(st_counts["count"].max()) * 1.05
     fig_st.update_xaxes(range=[0, xmax], showgrid=False)
     fig_st.update_layout(margin=dict(l=90, r=40, t=50, b=40), height=380, showlegend=False)
+    return fig_st
 
-    st.plotly_chart(fig_st, use_container_width=True)
 
-    # Insight dynamique (sur toutes les valeurs, Unknown compris si présent)
-    shares = (
-        df_f["growth_stage"]
-        .fillna("Unknown")
-        .astype(str)
-        .str.strip()
-        .value_counts(normalize=True) * 100
+def stage_insight(all_counts: pd.DataFrame):
+    """Markdown insight on the most common growth stage (None if empty)."""
+    shares = all_counts.set_index("stage")["count"]
+    shares = shares / shares.sum() * 100
+    if shares.empty:
+        return None
+    top_stage = shares.index[0]
+    share = shares.iloc[0]
+    ci = ci_text(share_intervals(all_counts["count"].to_numpy(), [0])[0])
+    return (
+        f"**Insight:** The urban forest is mostly composed of **{top_stage.lower()} trees** "
+        f"({share:.1f}%{ci} of the filtered selection), reflecting a balance between stability "
+        "and the need for renewal."
     )
-    if not shares.empty:
-        top_stage = shares.index[0]
-        share = shares.iloc[0]
-        st.markdown(
-            f"**Insight:** The urban forest is mostly composed of **{top_stage.lower()} trees** "
-            f"({share:.1f}% of the filtered selection), reflecting a balance between stability "
-            "and the need for renewal."
-        )
+
+
+def render(df_filtered: pd.DataFrame, all_counts: pd.DataFrame = None):
+    """Distribution by growth stage + insight, adapté à 'growth_stage' (all_counts: stage_counts() précalculé)."""
+    st.subheader("🧭 How old is Paris’s urban forest?")
+    st.markdown(
+        """
+        <div style="text-align: justify; font-size: 1.05rem; line-height: 1.6; max-width: 1200px;">
+        Most of Paris’s trees are at an adult stage — a sign of a well-established canopy, yet a reminder that renewal must soon take root.
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.subheader("Distribution by Growth Stage (Filtered)")
+
+    if df_filtered is None or df_filtered.empty:
+        st.info("No data available after filtering.")
+        return
+
+    if "growth_stage" not in df_filtered.columns:
+        st.info("No growth stage information available in the dataset.")
+        return
+
+    # Comptages par stade, Unknown compris (masqué dans le graphe)
+    if all_counts is None:
+        all_counts = stage_counts(df_filtered)
+
+    fig_st = stage_figure(all_counts)
+    if fig_st is None:
+        st.info("No growth stage distribution to display.")
+        return
+
+    show_chart(fig_st, "growth_stage")
+
+    # Insight dynamique (sur toutes les valeurs, Unknown compris si présent)
+    insight = stage_insight(all_counts)
+    if insight is not None:
+        st.markdown(insight)
     else:
         st.info("No data available for growth stage.")
 
@@ -2,30 +2,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.viz import show_chart
+from utils.bootstrap import share_intervals, ci_text
 
 
-def render(df_filtered: pd.DataFrame):
-    """Show where trees are planted (ownership / land manager) with a benchmark line and insight."""
-    st.subheader("🌳 Where Are Paris’s Trees Planted?")
-    st.markdown(
-        "From streets to parks and cemeteries, the city’s trees mirror how land is managed — "
-        "and who gets to live under its canopy."
-    )
-
-    st.subheader("Distribution by Tree Location Type (Filtered)")
-
-    if df_filtered is None or df_filtered.empty:
-        st.info("No data available after filtering.")
-        return
-
-    if "ownership" not in df_filtered.columns:
-        st.info("No ownership information available in the current dataset.")
-        return
-
-    df_f = df_filtered
-
-    # Counts per ownership type (ascending for a horizontal bar chart)
-    dom_counts = (
+def ownership_counts(df_f: pd.DataFrame) -> pd.DataFrame:
+    """Trees per ownership type ('Ownership type', 'count'), ascending."""
+    return (
         df_f["ownership"].fillna("Unknown")
         .astype(str)
         .str.strip()
@@ -35,12 +18,11 @@ def render(df_filtered: pd.DataFrame):
         .sort_values("count", ascending=True)
     )
 
-    if dom_counts.empty:
-        st.info("No ownership distribution to display.")
-        return
 
+def ownership_figure(dom_counts: pd.DataFrame, n_rows: int):
+    """Bar chart of ownership_counts() with the 'evenly shared' reference line."""
     # Reference: average count if distribution were even across categories
-    ref_dom = len(df_f) / dom_counts.shape[0] if dom_counts.shape[0] else 0
+    ref_dom = n_rows / dom_counts.shape[0] if dom_counts.shape[0] else 0
 
     # Bar chart with a vertical reference line
     fig_dom = px.bar(
@@ -79,20 +61,63 @@ def render(df_filtered: pd.DataFrame):
         height=420,
         showlegend=False,
     )
+    return fig_dom
+
+
+def ownership_insight(dom_counts: pd.DataFrame):
+    """Markdown insight on the leading ownership category (None if empty)."""
+    counts = dom_counts.set_index("Ownership type")["count"].sort_values(ascending=False, kind="stable")
+    shares = counts / counts.sum() * 100
+    if shares.empty:
+        return None
+    top_dom = shares.index[0]
+    share = shares.iloc[0]
+    ci = ci_text(share_intervals(counts.to_numpy(), [0])[0])
+    return (
+        f"**Insight:** Most visible trees are managed under **{top_dom.lower()}** "
+        f"({share:.1f}%{ci} of the current selection). "
+        "This concentration suggests management driven by major public domains, "
+        "while other areas may be comparatively less green."
+    )
 
-    st.plotly_chart(fig_dom, use_container_width=True)
+
+def render(df_filtered: pd.DataFrame, dom_counts: pd.DataFrame = None):
+    """
+    Show where trees are planted (ownership / land manager) with a benchmark line and insight.
+    dom_counts: precomputed ownership_counts(df_filtered), if available.
+    """
+    st.subheader("🌳 Where Are Paris’s Trees Planted?")
+    st.markdown(
+        "From streets to parks and cemeteries, the city’s trees mirror how land is managed — "
+        "and who gets to live under its canopy."
+    )
+
+    st.subheader("Distribution by Tree Location Type (Filtered)")
+
+    if df_filtered is None or df_filtered.empty:
+        st.info("No data available after filtering.")
+        return
+
+    if "ownership" not in df_filtered.columns:
+        st.info("No ownership information available in the current dataset.")
+        return
+
+    df_f = df_filtered
+
+    # Counts per ownership type (ascending for a horizontal bar chart)
+    if dom_counts is None:
+        dom_counts = ownership_counts(df_f)
+
+    if dom_counts.empty:
+        st.info("No ownership distribution to display.")
+        return
+
+    show_chart(ownership_figure(dom_counts, len(df_f)), "location")
 
     # Dynamic insight (share of the leading ownership category)
-    shares = df_f["ownership"].fillna("Unknown").astype(str).str.strip().value_counts(normalize=True) * 100
-    if not shares.empty:
-        top_dom = shares.index[0]
-        share = shares.iloc[0]
-        st.markdown(
-            f"**Insight:** Most visible trees are managed under **{top_dom.lower()}** "
-            f"({share:.1f}% of the current selection). "
-            "This concentration suggests management driven by major public domains, "
-            "while other areas may be comparatively less green."
-        )
+    insight = ownership_insight(dom_counts)
+    if insight is not None:
+        st.markdown(insight)
     else:
         st.info("No ownership data to generate an insight.")
 
@@ -4,25 +4,12 @@ import pandas as pd
 from utils.prep import pick_common_name_col  # si tu l'as mis dans prep.py
 
 
-def render(df_filtered: pd.DataFrame):
-    """Display key summary metrics based on the filtered dataset."""
-    st.markdown("### Key Figures")
-
-    if df_filtered is None or df_filtered.empty:
-        st.info("No data available to display metrics.")
-        return
-    
-    # KPI row
-    c1, c2, c3, c4 = st.columns(4)
-    df_f = df_filtered  # alias for clarity
-
-    # 🌳 Total number of displayed trees
-    c1.metric("🌳 Total Trees", format(len(df_f), ",d").replace(",", " "))
-
+def key_figures(df_f: pd.DataFrame) -> dict:
+    """Total trees, species count, % remarkable and dominant growth stage of a selection."""
     # 🌿 Unique species count (choose french_name or en_name if exists)
     species_col = pick_common_name_col(df_f)
     if species_col is None:
-        c2.metric("🌿 Species Diversity", "N/A")
+        n_species = None
     else:
         n_species = (
             df_f[species_col]
@@ -31,7 +18,6 @@ def render(df_filtered: pd.DataFrame):
             .dropna()
             .nunique()
         )
-        c2.metric("🌿 Species Diversity", n_species)
 
     # 🌟 Percentage of remarkable trees
     if "is_remarkable" in df_f.columns:
@@ -44,7 +30,6 @@ def render(df_filtered: pd.DataFrame):
             .eq("OUI")
             .mean() * 100
         )
-    c3.metric("🌟 Remarkable Trees", f"{pct_rem:.1f}%")
 
     # 🕰️ Dominant growth stage (most frequent)
     if "growth_stage" in df_f.columns and not df_f["growth_stage"].dropna().empty:
@@ -59,4 +44,36 @@ def render(df_filtered: pd.DataFrame):
     else:
         dominant_stage = "Unknown"
 
-    c4.metric("🕰️ Dominant Growth Stage", dominant_stage)
+    return {
+        "total": len(df_f),
+        "n_species": n_species,
+        "pct_remarkable": pct_rem,
+        "dominant_stage": dominant_stage,
+    }
+
+
+def render(df_filtered: pd.DataFrame, kpi: dict = None):
+    """Display key summary metrics based on the filtered dataset (kpi: precomputed key_figures())."""
+    st.markdown("### Key Figures")
+
+    if df_filtered is None or df_filtered.empty:
+        st.info("No data available to display metrics.")
+        return
+    
+    if kpi is None:
+        kpi = key_figures(df_filtered)
+
+    # KPI row
+    c1, c2, c3, c4 = st.columns(4)
+
+    # 🌳 Total number of displayed trees
+    c1.metric("🌳 Total Trees", format(kpi["total"], ",d").replace(",", " "))
+
+    # 🌿 Unique species count (choose french_name or en_name if exists)
+    c2.metric("🌿 Species Diversity", "N/A" if kpi["n_species"] is None else kpi["n_species"])
+
+    # 🌟 Percentage of remarkable trees
+    c3.metric("🌟 Remarkable Trees", f"{kpi['pct_remarkable']:.1f}%")
+
+    # 🕰️ Dominant growth stage (most frequent)
+    c4.metric("🕰️ Dominant Growth Stage", kpi["dominant_stage"])
@@ -0,0 +1,120 @@
+# sections/similarity.py
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from utils.viz import show_chart
+from utils.similarity import abundance_matrix, cluster_order, most_similar, METRICS
+from sections.distribution import ordinal
+
+
+def district_similarity(df_filtered: pd.DataFrame):
+    """
+    District x species abundance matrix of the selection and its pairwise
+    dissimilarities: {'labels', 'n_trees', 'richness', 'Bray-Curtis', 'Jaccard'} (None if < 2 districts).
+    """
+    if "arr_num" not in df_filtered.columns:
+        return None
+    X, labels, _ = abundance_matrix(df_filtered, "arr_num")
+    if X.shape[0] < 2:
+        return None
+    out = {
+        "labels": [ordinal(int(a)) for a in labels],
+        "n_trees": np.asarray(X.sum(axis=1)).ravel(),
+        "richness": np.diff(X.indptr),
+    }
+    for name, metric in METRICS.items():
+        out[name] = metric(X)
+    return out
+
+
+def similarity_heatmap(D: np.ndarray, labels, metric: str):
+    """Dissimilarity heatmap, rows and columns in dendrogram order."""
+    order = cluster_order(D)
+    ordered = [labels[i] for i in order]
+    fig = px.imshow(
+        D[np.ix_(order, order)],
+        x=ordered,
+        y=ordered,
+        color_continuous_scale="Greens_r",
+        zmin=0,
+        zmax=float(np.nanmax(D)) if np.isfinite(D).any() else 1,
+        labels={"color": f"{metric} dissimilarity"},
+        title=f"{metric} Dissimilarity Between Districts (clustered)",
+    )
+    fig.update_layout(margin=dict(l=60, r=30, t=50, b=40), height=560)
+    return fig
+
+
+def similarity_insight(D: np.ndarray, labels, metric: str):
+    """Markdown insight: the most alike pair and the most distinctive district."""
+    pairs = most_similar(D, labels, k=1).sort_values("dissimilarity", kind="stable")
+    if pairs.empty or not np.isfinite(pairs["dissimilarity"].iloc[0]):
+        return None
+    best = pairs.iloc[0]
+    with np.errstate(invalid="ignore"):
+        mean_d = np.nanmean(np.where(np.eye(len(D), dtype=bool), np.nan, D), axis=1)
+    odd = labels[int(np.nanargmax(mean_d))]
+    return (
+        f"**Insight:** **{best['unit']}** and **{best['match']}** have the most alike tree populations "
+        f"({metric} {best['dissimilarity']:.2f}), while **{odd}** stands apart from the others "
+        f"(mean {metric} {np.nanmax(mean_d):.2f})."
+    )
+
+
+@st.fragment
+def _similarity_panel(sim: dict):
+    """Metric switch, clustered heatmap and 'most similar districts' table, rerun on their own."""
+    metric = st.radio(
+        "Compare districts by",
+        list(METRICS),
+        horizontal=True,
+        help="Bray-Curtis weighs how many trees of each species; Jaccard only which species are present.",
+    )
+    D, labels = sim[metric], sim["labels"]
+
+    show_chart(similarity_heatmap(D, labels, metric), "similarity")
+    insight = similarity_insight(D, labels, metric)
+    if insight is not None:
+        st.markdown(insight)
+
+    st.markdown("**Most similar districts**")
+    picked = st.selectbox("District", labels)
+    i = labels.index(picked)
+    nearest = most_similar(D, labels, k=3)
+    nearest = nearest[nearest["unit"] == picked]
+    st.dataframe(
+        pd.DataFrame({
+            "District": nearest["match"].to_numpy(),
+            f"{metric} dissimilarity": nearest["dissimilarity"].round(3).to_numpy(),
+            "Trees": [int(sim["n_trees"][labels.index(m)]) for m in nearest["match"]],
+            "Species": [int(sim["richness"][labels.index(m)]) for m in nearest["match"]],
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+    n_trees = f"{int(sim['n_trees'][i]):,}".replace(",", " ")
+    st.caption(f"{picked}: {n_trees} trees, {int(sim['richness'][i])} species.")
+
+
+def render(df_filtered: pd.DataFrame, similarity: dict = None):
+    """
+    District similarity section (similarity: precomputed district_similarity()):
+    - clustered dissimilarity heatmap (Bray-Curtis or Jaccard)
+    - most alike / most distinctive districts insight
+    - 'most similar districts' panel
+    """
+    st.subheader("🧬 Which Districts Share the Same Trees?")
+    st.markdown("**Some arrondissements are near-twins in what they plant; others grow a forest of their own.**")
+
+    if df_filtered is None or df_filtered.empty:
+        st.info("No data available after filtering.")
+        return
+
+    if similarity is None:
+        similarity = district_similarity(df_filtered)
+    if similarity is None:
+        st.info("Select at least two districts to compare their tree populations.")
+        return
+
+    _similarity_panel(similarity)
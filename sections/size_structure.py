@@ -0,0 +1,142 @@
+# sections/size_structure.py
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from utils.viz import show_chart
+from utils.sketch import select_cells, merged_counts, quantiles, RELATIVE_ACCURACY
+from sections.distribution import ordinal
+from sections.growth_stage import STAGE_ORDER
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def size_summary(sketches: dict, state) -> dict:
+    """
+    Height / circumference quantiles of a selection, merged from the cell sketches:
+    overall p10/p50/p90 per column, and per growth stage / per district tables.
+    """
+    mask = select_cells(sketches, state)
+    out = {"n_cells": int(mask.sum())}
+    for col in sketches["columns"]:
+        out[col] = dict(zip(QUANTILES, quantiles(merged_counts(sketches, col, mask), QUANTILES)[0]))
+        for by in ("growth_stage", "arr_num"):
+            counts, groups = merged_counts(sketches, col, mask, by=by)
+            table = pd.DataFrame(quantiles(counts, QUANTILES), index=groups, columns=["p10", "p50", "p90"])
+            table["n"] = counts.sum(axis=1).astype(int)
+            out[(col, by)] = table[table["n"] > 0]
+    return out
+
+
+def stage_size_figure(table: pd.DataFrame, label: str):
+    """Median per growth stage with p10–p90 whiskers (None if no known stage)."""
+    t = table.reindex([s for s in STAGE_ORDER if s in table.index]).dropna(subset=["p50"])
+    if t.empty:
+        return None
+    t = t.rename_axis("stage").reset_index()
+    fig = px.bar(
+        t,
+        x="stage",
+        y="p50",
+        error_y=t["p90"] - t["p50"],
+        error_y_minus=t["p50"] - t["p10"],
+        title=f"Median {label} by Growth Stage (whiskers: 10th–90th percentile)",
+        labels={"p50": f"Median {label}", "stage": ""},
+        text=t["p50"].round(0),
+    )
+    fig.update_traces(textposition="inside", insidetextanchor="start", textfont_color="black")
+    fig.update_layout(margin=dict(l=60, r=30, t=50, b=40), height=380, showlegend=False)
+    return fig
+
+
+def district_height_figure(table: pd.DataFrame):
+    """Median and 90th-percentile height per district (None if fewer than two districts)."""
+    t = table.dropna(subset=["p50"])
+    if len(t) < 2:
+        return None
+    t = t.rename_axis("arr").reset_index()
+    t["arr_label"] = t["arr"].astype(int).apply(ordinal)
+    long = t.melt(id_vars="arr_label", value_vars=["p50", "p90"], var_name="stat", value_name="height")
+    long["stat"] = long["stat"].map({"p50": "Median", "p90": "Tallest 10%"})
+    fig = px.bar(
+        long,
+        x="arr_label",
+        y="height",
+        color="stat",
+        barmode="group",
+        title="Tree Height by District",
+        labels={"arr_label": "District", "height": "Height (m)", "stat": ""},
+    )
+    fig.update_layout(margin=dict(l=60, r=30, t=50, b=40), height=420, legend=dict(orientation="h", y=1.02, x=1, xanchor="right", yanchor="bottom"))
+    return fig
+
+
+def size_insight(summary: dict):
+    """Markdown insight on the height / trunk size of the selection (None if nothing measured)."""
+    h = summary.get("height_m", {})
+    c = summary.get("circumference_cm", {})
+    if not h or np.isnan(h[0.5]):
+        return None
+    text = (
+        f"**Insight:** Half of the measured trees in the selection are taller than **{h[0.5]:.0f} m**, "
+        f"and the tallest 10% exceed **{h[0.9]:.0f} m**."
+    )
+    if c and not np.isnan(c[0.5]):
+        text += (
+            f" The median trunk measures **{c[0.5]:.0f} cm** around "
+            f"(about {c[0.5] / np.pi:.0f} cm across): "
+        )
+        text += (
+            "a young canopy that will need decades to provide full shade."
+            if c[0.5] < 60 else
+            "a mature canopy, whose renewal needs planning before the largest trees decline."
+        )
+    return text
+
+
+def render(sketches: dict, state):
+    """
+    Size & age structure section: height and circumference quantiles of the
+    current selection, answered from the precomputed per-cell sketches
+    (utils/sketch.py) rather than by sorting the filtered rows.
+    """
+    st.subheader("📏 Size & Age Structure")
+    st.markdown("**Height and trunk girth are the best clues to a tree’s shade — and its age.**")
+
+    if sketches is None:
+        st.info("Size sketches are not available for this dataset.")
+        return
+
+    summary = size_summary(sketches, state)
+    h = summary.get("height_m", {})
+    c = summary.get("circumference_cm", {})
+    if not h or np.isnan(h[0.5]):
+        st.info("No measured heights in the current selection.")
+        return
+
+    def fmt(v, unit):
+        return "N/A" if v is None or np.isnan(v) else f"{v:.0f} {unit}"
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("📐 Median Height", fmt(h[0.5], "m"))
+    c2.metric("🌲 Tallest 10% from", fmt(h[0.9], "m"))
+    c3.metric("🪵 Median Circumference", fmt(c.get(0.5), "cm"))
+    c4.metric("🌳 Largest 10% from", fmt(c.get(0.9), "cm"))
+
+    if ("circumference_cm", "growth_stage") in summary:
+        fig = stage_size_figure(summary[("circumference_cm", "growth_stage")], "Circumference (cm)")
+        if fig is not None:
+            show_chart(fig, "size_by_stage")
+
+    fig = district_height_figure(summary[("height_m", "arr_num")])
+    if fig is not None:
+        show_chart(fig, "height_by_district")
+
+    insight = size_insight(summary)
+    if insight is not None:
+        st.markdown(insight)
+
+    st.caption(
+        f"Quantiles within ±{RELATIVE_ACCURACY:.0%}, merged from per-cell sketches; "
+        "unmeasured (0) and out-of-range values are left out."
+    )
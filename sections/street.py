@@ -0,0 +1,104 @@
+# sections/street.py
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.viz import show_chart, map_points
+from utils.streets import street_rows
+from utils.results import MAP_COLS
+from sections.growth_stage import STAGE_ORDER
+
+
+def street_species(trees: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
+    """Most planted species of a street: 'species', 'trees', 'pct'."""
+    col = "en_name" if "en_name" in trees.columns else "genus_species"
+    counts = trees[col].dropna().astype(str).value_counts().head(top_n)
+    return pd.DataFrame({
+        "species": counts.index,
+        "trees": counts.to_numpy(),
+        "pct": (counts.to_numpy() / max(len(trees), 1) * 100).round(1),
+    })
+
+
+def street_insight(name: str, profile: pd.Series, city: pd.DataFrame):
+    """Markdown insight comparing a street's species mix with the other streets."""
+    if pd.isna(profile.get("top_share")):
+        return None
+    comparable = city[city["trees"] >= 20]
+    text = (
+        f"**Insight:** **{profile['top_species']}** makes up **{profile['top_share'] * 100:.0f}%** "
+        f"of the {int(profile['trees'])} trees of **{name.title()}**"
+    )
+    if len(comparable) > 1 and profile["trees"] >= 20:
+        rank = (comparable["shannon"] > profile["shannon"]).sum() + 1
+        text += (
+            f", and its species mix ranks **{rank} of {len(comparable)}** streets "
+            "with 20 trees or more (Shannon index)"
+        )
+    text += "."
+    if profile["top_share"] >= 0.8 and profile["trees"] >= 10:
+        text += " A near-monoculture: one pest could strip the whole street."
+    return text
+
+
+def render(df: pd.DataFrame, streets: dict, street: str):
+    """
+    Street profile of one street (sidebar 'Street' search), over the whole
+    dataset: key figures, species mix, age structure and the street's trees
+    on the map. streets: build_street_index() of the dataset (utils/streets.py).
+    """
+    st.subheader(f"🛣️ {street.title()}")
+    st.markdown("**Alignment trees are planted, and replaced, street by street.**")
+
+    rows = street_rows(streets, street)
+    if rows.size == 0:
+        st.info("No trees recorded at this address.")
+        return
+    profile = streets["streets"].loc[street]
+    trees = df.iloc[rows]
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("🌳 Trees", f"{len(trees):,}".replace(",", " "))
+    c2.metric("🌿 Species", int(profile["species"]))
+    c3.metric("📈 Shannon H′", "N/A" if pd.isna(profile["shannon"]) else f"{profile['shannon']:.2f}")
+    c4.metric("🗺️ Districts", profile.get("districts") or "N/A")
+
+    left, right = st.columns(2)
+    with left:
+        top = street_species(trees)
+        if not top.empty:
+            fig = px.bar(
+                top.iloc[::-1],
+                x="trees",
+                y="species",
+                orientation="h",
+                title="Species on this street",
+                labels={"trees": "Trees", "species": ""},
+                text="pct",
+            )
+            fig.update_traces(texttemplate="%{text}%", textposition="outside", cliponaxis=False)
+            fig.update_layout(margin=dict(l=10, r=30, t=50, b=40), height=380, showlegend=False)
+            show_chart(fig, "street_species")
+    with right:
+        stages = [s for s in STAGE_ORDER if s in profile.index and pd.notna(profile[s])]
+        if stages:
+            ages = pd.DataFrame({"stage": stages, "pct": [profile[s] * 100 for s in stages]})
+            fig = px.bar(
+                ages,
+                x="stage",
+                y="pct",
+                title="Age structure",
+                labels={"stage": "", "pct": "% of staged trees"},
+                text=ages["pct"].round(0),
+            )
+            fig.update_layout(margin=dict(l=10, r=10, t=50, b=40), height=380, showlegend=False)
+            show_chart(fig, "street_stages")
+
+    insight = street_insight(street, profile, streets["streets"])
+    if insight is not None:
+        st.markdown(insight)
+
+    geo = trees[[c for c in MAP_COLS if c in trees.columns]].dropna(subset=["lat", "lon"])
+    if "arr_num" in geo.columns:  # woods and suburbs have no district number
+        geo["arr_num"] = geo["arr_num"].astype(object).where(geo["arr_num"].notna(), "")
+    map_points(geo, zoom=14, height=420)
+    st.caption("All trees recorded at this address, whatever the sidebar filters.")
@@ -0,0 +1,74 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.biodiversity import metrics_from_counts, sparse_metrics, diversity_metrics
+
+
+def brute_metrics(row):
+    """n, richness, Shannon H' (ln), Gini-Simpson and Pielou of one count vector, term by term."""
+    n = sum(row)
+    if n == 0:
+        return n, 0, math.nan, math.nan, math.nan
+    shares = [c / n for c in row if c > 0]
+    shannon = -sum(p * math.log(p) for p in shares)
+    simpson = 1 - sum(p * p for p in shares)
+    pielou = shannon / math.log(len(shares)) if len(shares) > 1 else math.nan
+    return n, len(shares), shannon, simpson, pielou
+
+
+COUNTS = np.array([
+    [10, 0, 5, 5, 0],
+    [0, 0, 0, 0, 0],
+    [1, 1, 1, 1, 1],
+    [0, 7, 0, 0, 0],
+    [100, 1, 0, 2, 0],
+])
+
+
+def test_dense_metrics_match_brute_force():
+    got = metrics_from_counts(COUNTS)
+    for i, row in enumerate(COUNTS):
+        n, richness, shannon, simpson, pielou = brute_metrics(row)
+        assert got["n"][i] == n and got["richness"][i] == richness
+        np.testing.assert_allclose([got["shannon"][i], got["simpson"][i], got["pielou"][i]],
+                                   [shannon, simpson, pielou], equal_nan=True)
+    np.testing.assert_allclose(got["shannon"][2], math.log(5))  # even: H' = ln(S), J = 1
+    np.testing.assert_allclose(got["pielou"][2], 1.0)
+
+
+def test_sparse_metrics_match_dense():
+    rng = np.random.default_rng(0)
+    dense = rng.poisson(1.5, (50, 40)) * (rng.random((50, 40)) < 0.2)
+    dense[:5] = COUNTS.repeat(8, axis=1)[:, :40]
+    got = sparse_metrics(sparse.csr_matrix(dense))
+    want = metrics_from_counts(dense)
+    for key in ("n", "richness", "shannon", "simpson"):
+        np.testing.assert_allclose(got[key], want[key], equal_nan=True)
+    with np.errstate(invalid="ignore"):
+        top = dense.max(axis=1) / dense.sum(axis=1)
+    np.testing.assert_allclose(got["top_share"], np.where(dense.sum(axis=1) > 0, top, np.nan), equal_nan=True)
+
+
+def test_diversity_metrics_per_group():
+    df = pd.DataFrame({
+        "genus_species": ["Platanus acerifolia"] * 6 + ["Tilia cordata"] * 3 + ["Acer platanoides", None],
+        "genus": ["Platanus"] * 6 + ["Tilia"] * 3 + ["Acer", "Non spécifié"],
+        "arr_num": [1, 1, 1, 1, 2, 2, 1, 2, 2, 2, 2],
+    })
+    by = diversity_metrics(df, by="arr_num")
+    for arr, group in df.groupby("arr_num"):
+        counts = list(Counter(group["genus_species"].dropna()).values())
+        n, richness, shannon, simpson, pielou = brute_metrics(counts)
+        row = by.loc[arr]
+        assert row["n_trees"] == len(group) and row["richness"] == richness
+        np.testing.assert_allclose([row["shannon"], row["simpson"], row["pielou"]], [shannon, simpson, pielou])
+
+    overall = diversity_metrics(df).iloc[0]
+    assert overall["top_species"] == "Platanus acerifolia"
+    np.testing.assert_allclose(overall["top_species_share"], 6 / 10)  # share of the identified trees
+    # 6 of 10 identified trees are Platanaceae: above every 10-20-30 cap
+    assert overall["top_family"] == "Platanaceae" and not overall["rule_10_20_30"]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from utils.bootstrap import replicate_shares, share_intervals, ci_text
+
+COUNTS = np.array([420, 260, 150, 90, 50, 30])
+
+
+def tree_bootstrap(counts, parts, n_replicates=4000, level=0.95, seed=1):
+    """Reference: resample the trees themselves with replacement, then take percentile intervals."""
+    rng = np.random.default_rng(seed)
+    trees = np.repeat(np.arange(len(counts)), counts)
+    sums = np.empty((n_replicates, len(parts)))
+    for r in range(n_replicates):
+        shares = np.bincount(rng.choice(trees, trees.size), minlength=len(counts)) / trees.size
+        sums[r] = [shares[np.atleast_1d(p)].sum() for p in parts]
+    alpha = (1 - level) / 2
+    return np.quantile(sums, [alpha, 1 - alpha], axis=0).T
+
+
+def test_intervals_match_tree_resampling():
+    parts = [0, 3, [0, 1, 2]]
+    got = share_intervals(COUNTS, parts, n_replicates=4000)
+    want = tree_bootstrap(COUNTS, parts)
+    np.testing.assert_allclose(got, want, atol=0.01)
+
+    observed = [COUNTS[np.atleast_1d(p)].sum() / COUNTS.sum() for p in parts]
+    assert np.all((got[:, 0] <= observed) & (observed <= got[:, 1]))
+
+
+def test_replicates_seeded_and_normalized():
+    a = replicate_shares(COUNTS, 500, seed=3)
+    np.testing.assert_array_equal(a, replicate_shares(COUNTS, 500, seed=3))
+    np.testing.assert_allclose(a.sum(axis=1), 1.0)
+    assert a.shape == (500, len(COUNTS))
+    np.testing.assert_array_equal(replicate_shares([0, 0], 10), np.zeros((10, 2)))
+
+
+def test_combined_share_is_sum_of_replicates():
+    reps = replicate_shares(COUNTS, seed=0)
+    got = share_intervals(COUNTS, [[1, 4]])
+    np.testing.assert_allclose(got[0], np.quantile(reps[:, 1] + reps[:, 4], [0.025, 0.975]))
+
+
+def test_ci_text():
+    assert ci_text((0.381, 0.465)) == " [95% CI 38.1–46.5%]"
+    assert ci_text((0.40, 0.41)) == ""
+    assert ci_text((np.nan, np.nan)) == ""
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.canopy import crown_pixels, canopy_coverage, crown_radius_m, _disc
+from utils.spatial import to_degrees, to_metres
+
+
+def brute_raster(xy, radius_m, res_m):
+    """{(px, py): tree owning the pixel}, drawing crowns one by one, smaller crowns first (as crown_pixels)."""
+    r_px = np.rint(radius_m / res_m).astype(int)
+    owner = {}
+    for i in np.argsort(r_px, kind="stable"):
+        px, py = np.floor(xy[i] / res_m).astype(int)
+        for dx, dy in _disc(r_px[i]):
+            owner.setdefault((px + dx, py + dy), i)
+    return owner
+
+
+def sample_trees(n=120, seed=0):
+    """Trees across a few 50 m cells, on both sides of the reference point, with overlapping crowns."""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-120, 120, (n, 2))
+    latlon = to_degrees(xy[:, 0], xy[:, 1])
+    return pd.DataFrame({
+        "lat": latlon[:, 0],
+        "lon": latlon[:, 1],
+        "circumference_cm": rng.uniform(20, 250, n),
+        "height_m": rng.uniform(4, 25, n),
+        "genus": rng.choice(["Platanus", "Tilia", "Pyrus"], n),
+        "arr_num": rng.choice([1, 2, 3, np.nan], n),
+    })
+
+
+def test_crown_pixels_cover_every_disc():
+    xy = np.array([[0.2, 0.7], [-3.5, 2.0], [10.0, -10.0]])
+    keys, tree = crown_pixels(xy, np.array([2.0, 3.0, 1.0]), chunk=7)
+    assert tree.dtype == np.int32 and len(keys) == len(tree)
+    for i, r in enumerate([2, 3, 1]):
+        assert (tree == i).sum() == len(_disc(r))
+
+
+def test_coverage_matches_dense_raster():
+    df = sample_trees()
+    res_m, cell_m = 1.0, 50.0
+    out = canopy_coverage(df, res_m=res_m, cell_m=cell_m)
+
+    xy = to_metres(df["lat"].to_numpy(), df["lon"].to_numpy())
+    radius, _ = crown_radius_m(df)
+    owner = brute_raster(xy, radius, res_m)
+    assert out["covered_ha"] == round(len(owner) * res_m ** 2 / 10_000, 2)
+
+    arr = df["arr_num"].to_numpy()
+    want = pd.Series([arr[i] for i in owner.values()]).value_counts()
+    got = out["districts"].set_index("arr_num")["covered_ha"]
+    for a in (1, 2, 3):
+        assert got[a] == round(want.get(float(a), 0) / 10_000, 2)
+
+    cells = pd.Series(
+        [(int((px + 0.5) * res_m // cell_m), int((py + 0.5) * res_m // cell_m)) for px, py in owner]
+    ).value_counts()
+    got = out["cells"].set_index(["ix", "iy"])["covered_m2"]
+    assert len(got) == len(cells)
+    for (ix, iy), n in cells.items():
+        assert got[(ix, iy)] == n * res_m ** 2
+    assert (out["cells"]["iy"] < 0).any()  # cells south-west of the reference point
+    assert out["cells"]["trees"].sum() == len(df)
+
+
+def test_cell_must_be_a_multiple_of_the_pixel():
+    with pytest.raises(ValueError):
+        canopy_coverage(sample_trees(5), res_m=2.0, cell_m=45.0)
+    assert canopy_coverage(sample_trees(0))["covered_ha"] == 0
@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.districts import _inside, in_polygon, assign_districts, load_boundaries, in_city, distance_to_ring_m
+from utils.prep import filter_intra_muros
+from utils.spatial import to_degrees
+
+
+# ======================
+# BRUTE-FORCE REFERENCE
+# ======================
+def brute_inside(x: float, y: float, rings: list) -> bool:
+    """Even-odd test of one point, every edge of every ring (same half-open [min, max) band)."""
+    inside = False
+    for ring in rings:
+        for k in range(len(ring)):
+            (xa, ya), (xb, yb) = ring[k], ring[(k + 1) % len(ring)]
+            if (ya > y) != (yb > y) and x < xa + (y - ya) * (xb - xa) / (yb - ya):
+                inside = not inside
+    return inside
+
+
+def brute_assign(lat, lon, parts: list) -> np.ndarray:
+    """Number of the first part (number, rings) containing each point, 0 if none or no coordinates."""
+    out = np.zeros(len(lat), dtype=np.int64)
+    for i, (y, x) in enumerate(zip(lat, lon)):
+        if np.isnan(x) or np.isnan(y):
+            continue
+        for n, rings in parts:
+            if brute_inside(x, y, rings):
+                out[i] = n
+                break
+    return out
+
+
+# ======================
+# FIXTURES
+# ======================
+# Concave "staircase" with horizontal edges and a square hole
+STAIRS = [
+    np.array([(0, 0), (6, 0), (6, 2), (4, 2), (4, 4), (2, 4), (2, 6), (0, 6)], dtype=np.float64),
+    np.array([(1, 1), (2, 1), (2, 2), (1, 2)], dtype=np.float64),
+]
+# Second part of the same district (MultiPolygon) and a neighbour sharing an edge with STAIRS
+ISLAND = [np.array([(8, 8), (10, 8), (9, 10)], dtype=np.float64)]
+NEIGHBOUR = [np.array([(6, 0), (8, 0), (8, 2), (6, 2)], dtype=np.float64)]
+
+
+def sample_points(seed=0):
+    """Random points, every vertex, points on horizontal edges and points far outside."""
+    rng = np.random.default_rng(seed)
+    vertices = np.vstack([r for rings in (STAIRS, ISLAND, NEIGHBOUR) for r in rings])
+    on_edges = np.array([(x, y) for y in (0, 1, 2, 4, 6, 8) for x in np.arange(-1, 11, 0.5)])
+    outside = np.array([(-5, -5), (20, 3), (3, 20), (-1, 7), (11, 9)])
+    random = rng.uniform(-1, 11, size=(500, 2))
+    grid = np.array([(x, y) for x in np.arange(-1, 11, 0.25) for y in np.arange(-1, 11, 0.25)])
+    pts = np.vstack([vertices, on_edges, outside, random, grid])
+    return pts[:, 1], pts[:, 0]  # lat, lon
+
+
+def geojson(tmp_path):
+    """Boundaries file: district 1 = STAIRS (with its hole) + ISLAND, district 2 = NEIGHBOUR."""
+    features = [
+        {"properties": {"c_ar": 1}, "geometry": {"type": "MultiPolygon", "coordinates": [
+            [r.tolist() for r in STAIRS], [r.tolist() for r in ISLAND],
+        ]}},
+        {"properties": {"c_arinsee": 75102}, "geometry": {"type": "Polygon", "coordinates": [r.tolist() for r in NEIGHBOUR]}},
+    ]
+    path = tmp_path / "arrondissements.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return path
+
+
+# ======================
+# TESTS
+# ======================
+def test_inside_matches_brute_force():
+    lat, lon = sample_points()
+    order = np.argsort(lat, kind="stable")
+    got = np.zeros(len(lat), dtype=bool)
+    got[order] = _inside(lon[order], lat[order], STAIRS)
+    want = np.array([brute_inside(x, y, STAIRS) for x, y in zip(lon, lat)])
+    np.testing.assert_array_equal(got, want)
+    np.testing.assert_array_equal(in_polygon(lat, lon, STAIRS), want)
+
+
+def test_hole_and_outside():
+    inside = in_polygon([0.5, 1.5, 5.0, 1.0, -1.0], [0.5, 1.5, 5.0, 5.0, 3.0], STAIRS)
+    np.testing.assert_array_equal(inside, [True, False, False, True, False])  # corner, hole, notch, arm, outside
+
+
+def test_load_boundaries_splits_multipolygons(tmp_path):
+    b = load_boundaries(geojson(tmp_path))
+    np.testing.assert_array_equal(b["arr"], [1, 1, 2])
+    assert [len(r) for r in b["rings"]] == [2, 1, 1]
+    np.testing.assert_array_equal(b["bbox"][0], [0, 0, 6, 6])
+    assert load_boundaries(None) is None  # TREES_BOUNDARIES unset
+    with pytest.raises(FileNotFoundError):
+        load_boundaries(tmp_path / "missing.geojson")
+
+
+def test_assign_districts_matches_brute_force(tmp_path):
+    b = load_boundaries(geojson(tmp_path))
+    lat, lon = sample_points(seed=1)
+    lat, lon = np.append(lat, [np.nan, 3.0]), np.append(lon, [3.0, np.nan])  # no coordinates
+    want = brute_assign(lat, lon, [(1, STAIRS), (1, ISLAND), (2, NEIGHBOUR)])
+    np.testing.assert_array_equal(assign_districts(lat, lon, b), want)
+    assert {0, 1, 2} <= set(want.tolist())
+
+
+def test_in_city_outline():
+    # Notre-Dame, Parc Floral (Bois de Vincennes), Mairie de Vincennes, La Défense, no coordinates
+    lat = [48.8530, 48.8380, 48.8474, 48.8920, np.nan]
+    lon = [2.3499, 2.4420, 2.4392, 2.2360, 2.3499]
+    np.testing.assert_array_equal(in_city(lat, lon), [True, True, False, False, False])
+    # Château de Vincennes: ~200 m beyond the approximate outline, within its tolerance
+    assert in_city([48.8427], [2.4358])[0]
+
+
+def test_distance_to_ring_matches_brute_force():
+    # 1 km square (lon/lat) around the reference point, points inside, outside and past the corners
+    ring = to_degrees(np.array([0, 1000, 1000, 0.0]), np.array([0, 0, 1000, 1000.0]))[:, ::-1]
+    xy = np.array([(500, 500), (500, -200), (1300, 500), (-300, -400), (100, 950)], dtype=float)
+    latlon = to_degrees(xy[:, 0], xy[:, 1])
+    got = distance_to_ring_m(latlon[:, 0], latlon[:, 1], ring)
+    np.testing.assert_allclose(got, [500, 200, 300, 500, 50], atol=0.01)
+
+
+def test_drop_needs_boundaries():
+    df = pd.DataFrame({"lat": [48.8530, 48.8920], "lon": [2.3499, 2.2360]})  # Notre-Dame, La Défense
+    with pytest.raises(ValueError):
+        filter_intra_muros(df.copy(), "drop")  # approximate outline only
+    assert filter_intra_muros(df.copy(), "flag")["in_paris"].tolist() == [True, False]
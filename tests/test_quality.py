@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import quality
+from utils.quality import evaluate_rules, selection_bits, rule_failures, rule_mask
+
+
+def random_rules(n_rules: int):
+    """n_rules registry entries failing random rows (flags stored in the column 'r<i>')."""
+    return [
+        {"name": f"rule {i}", "columns": [f"r{i}"], "check": (lambda df, c=f"r{i}": df[c])}
+        for i in range(n_rules)
+    ]
+
+
+def test_bitsets_and_popcounts_match_brute_force(monkeypatch):
+    # 64 rules: every bit of the uint64, including the high ones
+    rng = np.random.default_rng(0)
+    n_rows = 1000
+    flags = pd.DataFrame(rng.random((n_rows, 64)) < rng.random(64), columns=[f"r{i}" for i in range(64)])
+    flags.index = rng.permutation(np.arange(10, 10 + n_rows))
+    monkeypatch.setattr(quality, "RULES", random_rules(64))
+
+    q = evaluate_rules(flags)
+    assert q["rules"] == [f"rule {i}" for i in range(64)]
+    assert q["bits"].dtype == np.uint64
+
+    # selection: a subset of rows, in another order, plus an index unknown to the dataset
+    sel = pd.Index(list(flags.index[rng.choice(n_rows, 300, replace=False)]) + [-1])
+    bits = selection_bits(q, sel)
+    expected = flags.reindex(sel, fill_value=False)
+
+    table = rule_failures(q, bits)
+    np.testing.assert_array_equal(table["failures"], expected.sum().to_numpy())
+    np.testing.assert_allclose(table["share_%"], np.round(100 * expected.mean().to_numpy(), 2))
+    for i in (0, 31, 32, 63):
+        np.testing.assert_array_equal(rule_mask(q, bits, f"rule {i}"), expected[f"r{i}"].to_numpy())
+
+
+def test_empty_selection(monkeypatch):
+    monkeypatch.setattr(quality, "RULES", random_rules(3))
+    q = evaluate_rules(pd.DataFrame({"r0": [True], "r1": [False], "r2": [True]}))
+    table = rule_failures(q, selection_bits(q, pd.Index([])))
+    assert table["failures"].tolist() == [0, 0, 0]
+
+
+def test_rules_skipped_without_columns_and_capped(monkeypatch):
+    q = evaluate_rules(pd.DataFrame({"height_m": [10, 70, None], "lat": [48.85, 48.5, None]}))
+    assert q["rules"] == ["Latitude in Paris [48.80–48.92]", "Height (m) in [0–60]"]
+    np.testing.assert_array_equal(q["bits"].to_numpy(), [0, 3, 0])
+
+    monkeypatch.setattr(quality, "RULES", random_rules(65))
+    flags = pd.DataFrame({f"r{i}": [False] for i in range(65)})
+    with pytest.raises(ValueError):
+        evaluate_rules(flags)  # 65 rules do not fit in a uint64
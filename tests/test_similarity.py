@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.similarity import bray_curtis, jaccard, abundance_matrix
+
+
+def random_counts(seed=0, shape=(12, 30)):
+    """Sparse-ish count matrix with an empty row and two identical rows."""
+    rng = np.random.default_rng(seed)
+    dense = rng.poisson(2, shape) * (rng.random(shape) < 0.3)
+    dense[3] = 0
+    dense[7] = dense[5]
+    return dense
+
+
+def brute_bray_curtis(dense):
+    n = len(dense)
+    out = np.full((n, n), np.nan)
+    for i in range(n):
+        for j in range(n):
+            den = dense[i].sum() + dense[j].sum()
+            if den > 0:
+                out[i, j] = 1 - 2 * sum(min(a, b) for a, b in zip(dense[i], dense[j])) / den
+    return out
+
+
+def brute_jaccard(dense):
+    sets = [set(np.flatnonzero(row)) for row in dense]
+    n = len(sets)
+    out = np.full((n, n), np.nan)
+    for i in range(n):
+        for j in range(n):
+            union = sets[i] | sets[j]
+            if union:
+                out[i, j] = 1 - len(sets[i] & sets[j]) / len(union)
+    return out
+
+
+def test_bray_curtis_matches_brute_force():
+    dense = random_counts()
+    want = brute_bray_curtis(dense)
+    np.testing.assert_allclose(bray_curtis(sparse.csr_matrix(dense)), want)
+    np.testing.assert_allclose(bray_curtis(sparse.csr_matrix(dense), rows=[5, 3]), want[[5, 3]])
+    assert bray_curtis(sparse.csr_matrix(dense))[5, 7] == 0
+
+
+def test_jaccard_matches_brute_force():
+    dense = random_counts(seed=1)
+    want = brute_jaccard(dense)
+    np.testing.assert_allclose(jaccard(sparse.csr_matrix(dense)), want)
+    np.testing.assert_allclose(jaccard(sparse.csr_matrix(dense), rows=[0]), want[[0]])
+
+
+def test_abundance_matrix_counts_trees():
+    df = pd.DataFrame({
+        "genus_species": ["Platanus x", "Tilia y", "Platanus x", None, "Acer z", "Tilia y"],
+        "arr_num": [2, 1, 2, 1, 1, 3],
+    })
+    X, units, taxa = abundance_matrix(df, "arr_num")
+    dense = pd.DataFrame(X.toarray(), index=units, columns=taxa)
+    want = pd.crosstab(df["arr_num"], df["genus_species"]).reindex(index=units, columns=taxa, fill_value=0)
+    np.testing.assert_array_equal(dense.to_numpy(), want.to_numpy())
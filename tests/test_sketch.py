@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from utils.sketch import (
+    RELATIVE_ACCURACY, MIN_VALUE, N_BUCKETS, bucket_of, quantiles, build_sketches, merged_counts,
+    signed_buckets, signed_bucket_value,
+)
+
+QS = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def exact_quantiles(values, qs=QS):
+    """Lower quantiles (value of rank ceil(q * n)), the ones the sketch approximates."""
+    return np.quantile(values, qs, method="inverted_cdf")
+
+
+def test_quantile_error_bound():
+    rng = np.random.default_rng(0)
+    for values in (
+        rng.lognormal(2, 0.8, 50_000).clip(MIN_VALUE, 60),  # heights
+        rng.integers(5, 2000, 20_000).astype(float),          # circumferences
+        np.full(100, 12.0),
+    ):
+        counts = np.bincount(bucket_of(values), minlength=N_BUCKETS)
+        got = quantiles(counts, QS)[0]
+        want = exact_quantiles(values)
+        assert np.all(np.abs(got - want) <= RELATIVE_ACCURACY * want + 1e-12)
+
+
+def test_merge_is_adding_counts():
+    rng = np.random.default_rng(1)
+    n = 5000
+    df = pd.DataFrame({
+        "lat": np.full(n, 48.85), "lon": np.full(n, 2.35),
+        "arr_num": rng.integers(1, 21, n),
+        "growth_stage": rng.choice(["Young tree", "Adult", "Mature"], n),
+        "height_m": rng.lognormal(2, 0.7, n).round(),
+    })
+    sk = build_sketches(df)
+    everything = merged_counts(sk, "height_m", np.ones(len(sk["cells"]), dtype=bool))
+    kept = df["height_m"][(df["height_m"] > 0) & (df["height_m"] <= 60)]
+    np.testing.assert_array_equal(everything, np.bincount(bucket_of(kept), minlength=N_BUCKETS))
+
+    # per-group counts merge back into the total
+    by_arr, groups = merged_counts(sk, "height_m", np.ones(len(sk["cells"]), dtype=bool), by="arr_num")
+    assert len(groups) == 20
+    np.testing.assert_array_equal(by_arr.sum(axis=0), everything)
+    got = quantiles(by_arr, (0.5,))[:, 0]
+    want = [exact_quantiles(kept[df["arr_num"] == a], (0.5,))[0] for a in groups]
+    assert np.all(np.abs(got - want) <= RELATIVE_ACCURACY * np.asarray(want))
+
+
+def test_signed_buckets_error_bound_and_order():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([
+        rng.normal(48.85, 0.03, 1000), -rng.lognormal(5, 3, 1000), rng.lognormal(10, 4, 1000), [0.0],
+    ])
+    for accuracy in (RELATIVE_ACCURACY, 1e-4):
+        keys = signed_buckets(values, accuracy)
+        approx = signed_bucket_value(keys, accuracy)
+        assert np.all(np.abs(approx - values) <= accuracy * np.abs(values) * (1 + 1e-9))
+        order = np.argsort(values)
+        assert np.all(np.diff(keys[order]) >= 0)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from utils.spatial import species_neighbours
+
+
+def brute_neighbours(xy, codes, k):
+    """Share of same-code trees among the k nearest identified neighbours, distance to the nearest other code."""
+    n = len(xy)
+    share, other = np.full(n, np.nan), np.full(n, np.nan)
+    for i in range(n):
+        if codes[i] < 0:
+            continue
+        d = np.hypot(*(xy - xy[i]).T)
+        near = [j for j in np.argsort(d, kind="stable") if j != i][:k]
+        known = [j for j in near if codes[j] >= 0]
+        if known:
+            share[i] = np.mean([codes[j] == codes[i] for j in known])
+        others = [d[j] for j in range(n) if codes[j] >= 0 and codes[j] != codes[i]]
+        if others:
+            other[i] = min(others)
+    return share, other
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 200, (300, 2))
+    codes = rng.choice([-1, 0, 1, 2], 300, p=[0.1, 0.6, 0.2, 0.1])
+    share, other = species_neighbours(xy, codes, k=8)
+    want_share, want_other = brute_neighbours(xy, codes, 8)
+    np.testing.assert_allclose(share, want_share, equal_nan=True)
+    np.testing.assert_allclose(other, want_other, equal_nan=True)
+
+
+def test_unknown_neighbours_are_left_out():
+    xy = np.array([[0, 0], [1, 0], [2, 0], [3, 0]], dtype=float)
+    share, other = species_neighbours(xy, np.array([0, -1, 0, 0]), k=3)
+    np.testing.assert_array_equal(share, [1, np.nan, 1, 1])
+    assert np.isnan(other).all()
+
+
+def test_duplicate_coordinates():
+    # three trees at the same spot: the point itself is not always the first neighbour
+    xy = np.array([[0, 0], [0, 0], [0, 0], [50, 0], [51, 0]], dtype=float)
+    share, other = species_neighbours(xy, np.array([0, 0, 1, 1, 1]), k=2)
+    np.testing.assert_array_equal(share[:3], [0.5, 0.5, 0.0])
+    np.testing.assert_array_equal(other[:3], [0, 0, 0])
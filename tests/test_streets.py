@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from utils.streets import normalize_streets, build_street_index, street_rows, search_streets
+
+
+def test_abbreviations_expanded_only_where_unambiguous():
+    raw = {
+        "RUE DE L'AVE-MARIA": "RUE DE L AVE MARIA",
+        "RUE DU PAS-DE-LA-MULE": "RUE DU PAS DE LA MULE",
+        "PAS DES EAUX": "PASSAGE DES EAUX",
+        "12 bis av. du Gal Leclerc": "AVENUE DU GENERAL LECLERC",
+        "BD ST-GERMAIN / RUE DU BAC": "BOULEVARD SAINT GERMAIN",
+        "Rue Ste-Croix-de-la-Bretonnerie": "RUE SAINTE CROIX DE LA BRETONNERIE",
+        "PL. DU DR-PAUL-MICHAUX": "PLACE DU DOCTEUR PAUL MICHAUX",
+        "SQUARE DU PL": "SQUARE DU PL",
+        "IMP": "IMP",
+        "RUE DE LA PTE": "RUE DE LA PTE",
+        None: "",
+    }
+    got = normalize_streets(pd.Index(list(raw), dtype=object))
+    assert got.tolist() == list(raw.values())
+
+
+def test_street_index_groups_rows():
+    df = pd.DataFrame({
+        "address": ["1 AV DES TERNES", "AVENUE DES TERNES", "RUE DU PAS DE LA MULE", None, "3 av. des Ternes"],
+        "arr_num": [17, 17, 3, 3, 17],
+        "genus_species": ["Tilia cordata", "Platanus x", "Tilia cordata", "Acer z", "Tilia cordata"],
+    })
+    index = build_street_index(df)
+    assert index["labels"].tolist() == ["AVENUE DES TERNES", "RUE DU PAS DE LA MULE"]
+    np.testing.assert_array_equal(np.sort(street_rows(index, "AVENUE DES TERNES")), [0, 1, 4])
+    assert index["streets"].loc["AVENUE DES TERNES", "districts"] == "17e"
+    assert search_streets(index, "pas-de-la") == ["RUE DU PAS DE LA MULE"]
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+# ======================
+# BIODIVERSITY METRICS
+# ======================
+# Labels are turned into integer codes once; every count is then a bincount
+# (one per level: species, genus, family), and all metrics derive from the
+# count matrices, for every group at once.
+
+# Santamour's "10-20-30" rule for urban forests: no species above 10% of the
+# trees, no genus above 20%, no family above 30%
+RULE_10_20_30 = {"species": 0.10, "genus": 0.20, "family": 0.30}
+
+# Botanical family of the genera planted in Paris (APG IV)
+GENUS_FAMILY = {
+    "abies": "Pinaceae", "acer": "Sapindaceae", "aesculus": "Sapindaceae", "ailanthus": "Simaroubaceae",
+    "albizia": "Fabaceae", "alnus": "Betulaceae", "amelanchier": "Rosaceae", "araucaria": "Araucariaceae",
+    "arbutus": "Ericaceae", "betula": "Betulaceae", "broussonetia": "Moraceae", "buxus": "Buxaceae",
+    "calocedrus": "Cupressaceae", "carpinus": "Betulaceae", "carya": "Juglandaceae", "castanea": "Fagaceae",
+    "catalpa": "Bignoniaceae", "cedrela": "Meliaceae", "cedrus": "Pinaceae", "celtis": "Cannabaceae",
+    "cercidiphyllum": "Cercidiphyllaceae", "cercis": "Fabaceae", "chamaecyparis": "Cupressaceae",
+    "cladrastis": "Fabaceae", "cornus": "Cornaceae", "corylus": "Betulaceae", "cotinus": "Anacardiaceae",
+    "crataegus": "Rosaceae", "cryptomeria": "Cupressaceae", "cupressus": "Cupressaceae",
+    "davidia": "Nyssaceae", "diospyros": "Ebenaceae", "elaeagnus": "Elaeagnaceae", "eriobotrya": "Rosaceae",
+    "eucommia": "Eucommiaceae", "fagus": "Fagaceae", "ficus": "Moraceae", "fraxinus": "Oleaceae",
+    "ginkgo": "Ginkgoaceae", "gleditsia": "Fabaceae", "gymnocladus": "Fabaceae", "halesia": "Styracaceae",
+    "hibiscus": "Malvaceae", "ilex": "Aquifoliaceae", "juglans": "Juglandaceae", "juniperus": "Cupressaceae",
+    "koelreuteria": "Sapindaceae", "laburnum": "Fabaceae", "lagerstroemia": "Lythraceae", "larix": "Pinaceae",
+    "laurus": "Lauraceae", "ligustrum": "Oleaceae", "liquidambar": "Altingiaceae",
+    "liriodendron": "Magnoliaceae", "maclura": "Moraceae", "magnolia": "Magnoliaceae", "malus": "Rosaceae",
+    "melia": "Meliaceae", "mespilus": "Rosaceae", "metasequoia": "Cupressaceae", "morus": "Moraceae",
+    "nyssa": "Nyssaceae", "olea": "Oleaceae", "ostrya": "Betulaceae", "parrotia": "Hamamelidaceae",
+    "paulownia": "Paulowniaceae", "phellodendron": "Rutaceae", "photinia": "Rosaceae", "picea": "Pinaceae",
+    "pinus": "Pinaceae", "pistacia": "Anacardiaceae", "platanus": "Platanaceae", "populus": "Salicaceae",
+    "prunus": "Rosaceae", "pseudotsuga": "Pinaceae", "pterocarya": "Juglandaceae", "pyrus": "Rosaceae",
+    "quercus": "Fagaceae", "rhus": "Anacardiaceae", "robinia": "Fabaceae", "salix": "Salicaceae",
+    "sequoia": "Cupressaceae", "sequoiadendron": "Cupressaceae", "sophora": "Fabaceae",
+    "sorbus": "Rosaceae", "styphnolobium": "Fabaceae", "syringa": "Oleaceae", "taxodium": "Cupressaceae",
+    "taxus": "Taxaceae", "tetradium": "Rutaceae", "thuja": "Cupressaceae", "tilia": "Malvaceae",
+    "toona": "Meliaceae", "trachycarpus": "Arecaceae", "ulmus": "Ulmaceae", "zanthoxylum": "Rutaceae",
+    "zelkova": "Ulmaceae",
+}
+
+# Genus values that do not identify a genus
+_UNKNOWN_GENUS = {"", "nan", "none", "<na>", "non spécifié", "non specifie"}
+
+
+def _codes(values: pd.Series, clean, unknown=()):
+    """
+    (int codes, labels) of a label column; -1 = missing/unknown.
+    Raw values are factorized first, so `clean` (str -> str, vectorized on an
+    Index) only runs on the distinct values, not on every row.
+    """
+    raw_codes, raw = pd.factorize(values, sort=False)
+    cleaned = clean(pd.Index(raw).astype(str))
+    remap, labels = pd.factorize(cleaned, sort=False)
+    labels = pd.Index(labels)
+    if len(unknown):
+        bad = np.flatnonzero(labels.str.casefold().isin(list(unknown)))
+        remap = np.where(np.isin(remap, bad), -1, remap)
+    # raw code -1 (NaN) -> last slot (-1)
+    return np.append(remap, -1)[raw_codes], labels
+
+
+def taxon_codes(df: pd.DataFrame, levels=("species", "genus", "family")) -> dict:
+    """
+    Integer codes of each tree per level: {'species'|'genus'|'family': (codes, labels)}.
+    Species = 'genus_species', genus = 'genus', family from GENUS_FAMILY (unknown genus -> -1).
+    """
+    out = {}
+    if "species" in levels and "genus_species" in df.columns:
+        out["species"] = _codes(df["genus_species"], lambda s: s.str.strip(), unknown=_UNKNOWN_GENUS)
+
+    if {"genus", "family"} & set(levels) and "genus" in df.columns:
+        g_codes, g_labels = _codes(df["genus"], lambda s: s.str.strip().str.capitalize(), unknown=_UNKNOWN_GENUS)
+        out["genus"] = (g_codes, g_labels)
+        # family: map the (few) genus labels, then gather through the codes
+        keys = g_labels.str.casefold()
+        families = pd.Index(sorted(set(GENUS_FAMILY[k] for k in keys if k in GENUS_FAMILY)))
+        family_of_genus = np.array(
+            [families.get_loc(GENUS_FAMILY[k]) if k in GENUS_FAMILY else -1 for k in keys] + [-1],
+            dtype=np.int64,
+        )
+        out["family"] = (family_of_genus[g_codes], families)  # g_codes == -1 -> last slot (-1)
+    return {level: out[level] for level in levels if level in out}
+
+
+def count_matrix(codes: np.ndarray, n_codes: int, groups: np.ndarray = None, n_groups: int = 1) -> np.ndarray:
+    """(n_groups, n_codes) counts in one bincount; rows with a negative code or group are skipped."""
+    if groups is None:
+        groups = np.zeros(len(codes), dtype=np.int64)
+    keep = (codes >= 0) & (groups >= 0)
+    flat = groups[keep].astype(np.int64) * n_codes + codes[keep]
+    return np.bincount(flat, minlength=n_groups * n_codes).reshape(n_groups, n_codes)
+
+
+def metrics_from_counts(counts: np.ndarray) -> dict:
+    """
+    Row-wise diversity of a (groups, taxa) count matrix:
+    n, richness, Shannon H' (natural log), Gini-Simpson 1 - sum(p^2), Pielou J = H'/ln(S).
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = counts / n[:, None]
+        plogp = np.where(counts > 0, p * np.log(np.where(counts > 0, p, 1.0)), 0.0)
+        shannon = 0.0 - plogp.sum(axis=1)
+        simpson = 1.0 - (p ** 2).sum(axis=1)
+        richness = (counts > 0).sum(axis=1)
+        pielou = np.where(richness > 1, shannon / np.log(np.maximum(richness, 2)), np.nan)
+    empty = n == 0
+    shannon[empty] = np.nan
+    simpson[empty] = np.nan
+    return {"n": n.astype(np.int64), "richness": richness, "shannon": shannon, "simpson": simpson, "pielou": pielou}
+
+
+def sparse_metrics(X) -> dict:
+    """
+    Row-wise n, richness, Shannon H', Gini-Simpson and largest share of a CSR
+    count matrix (units x taxa), from its non-zero entries only: one bincount
+    per metric over the entries' row ids, however many units there are.
+    """
+    n_rows = X.shape[0]
+    row = np.repeat(np.arange(n_rows), np.diff(X.indptr))
+    n = np.bincount(row, weights=X.data, minlength=n_rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = X.data / n[row]
+        shannon = 0.0 - np.bincount(row, weights=p * np.log(p), minlength=n_rows)
+        simpson = 1.0 - np.bincount(row, weights=p * p, minlength=n_rows)
+    top = np.zeros(n_rows)
+    filled = np.flatnonzero(np.diff(X.indptr))
+    if filled.size:
+        top[filled] = np.maximum.reduceat(p, X.indptr[filled])
+    empty = n == 0
+    shannon[empty] = simpson[empty] = top[empty] = np.nan
+    return {"n": n.astype(np.int64), "richness": np.diff(X.indptr), "shannon": shannon,
+            "simpson": simpson, "top_share": top}
+
+
+def _top(counts: np.ndarray, labels: pd.Index):
+    """(label, share) of the most frequent taxon of each row (None, nan for empty rows)."""
+    n = counts.sum(axis=1)
+    if counts.shape[1] == 0:
+        return [None] * len(counts), np.full(len(counts), np.nan)
+    idx = counts.argmax(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = counts[np.arange(len(counts)), idx] / n
+    names = [labels[i] if total else None for i, total in zip(idx, n)]
+    return names, share
+
+
+def diversity_metrics(df: pd.DataFrame, by: str = None) -> pd.DataFrame:
+    """
+    Diversity of a selection, overall (by=None, one row) or per group of `by`
+    (e.g. 'arr_num': one row per district), computed in one pass:
+    n_trees, richness, shannon, simpson, pielou (species level), the largest
+    species / genus / family and their shares, and the 10-20-30 rule checks.
+    """
+    taxa = taxon_codes(df)
+    if by is None:
+        groups, keys = None, pd.Index(["all"])
+    else:
+        groups, keys = pd.factorize(df[by], sort=True)
+        keys = pd.Index(keys, name=by)
+
+    out = pd.DataFrame(index=keys)
+    out["n_trees"] = (
+        np.bincount(groups[groups >= 0], minlength=len(keys)) if groups is not None else [len(df)]
+    )
+    for level, (codes, labels) in taxa.items():
+        counts = count_matrix(codes, len(labels), groups, len(keys))
+        if level == "species":
+            for name, values in metrics_from_counts(counts).items():
+                if name != "n":
+                    out[name] = values
+        top, share = _top(counts, labels)
+        out[f"top_{level}"] = top
+        out[f"top_{level}_share"] = share
+        out[f"rule_{level}"] = share <= RULE_10_20_30[level]
+    rules = [f"rule_{level}" for level in RULE_10_20_30 if f"rule_{level}" in out.columns]
+    if rules:
+        out["rule_10_20_30"] = out[rules].all(axis=1)
+    return out
@@ -0,0 +1,46 @@
+import numpy as np
+
+# ======================
+# BOOTSTRAP ON COUNTS
+# ======================
+# The insights quote shares of a count vector (trees per district, species,
+# ownership, stage). Resampling trees with replacement is the same as drawing
+# the count vector from a multinomial(n, observed shares), so replicates are
+# drawn directly on the counts: cost grows with the number of categories, not
+# with the number of trees.
+
+N_REPLICATES = 2000
+LEVEL = 0.95
+# Intervals narrower than this (in share points, 0.02 = 2 %) are not worth
+# printing: the share is shown as is
+MIN_WIDTH = 0.02
+
+
+def replicate_shares(counts, n_replicates: int = N_REPLICATES, seed: int = 0) -> np.ndarray:
+    """(n_replicates, k) bootstrap shares of a count vector (seeded: same counts -> same replicates)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    n = int(counts.sum())
+    if n == 0:
+        return np.zeros((n_replicates, counts.size))
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(n, counts / n, size=n_replicates) / n
+
+
+def share_intervals(counts, parts, level: float = LEVEL, n_replicates: int = N_REPLICATES, seed: int = 0) -> np.ndarray:
+    """
+    Percentile intervals of the share held by each part of a count vector.
+    parts: list of category positions (an int, or a list for a combined share
+    such as the top 3). Returns a (len(parts), 2) array of (low, high) shares.
+    """
+    reps = replicate_shares(counts, n_replicates, seed)
+    sums = np.column_stack([reps[:, np.atleast_1d(p)].sum(axis=1) for p in parts])
+    alpha = (1 - level) / 2
+    return np.quantile(sums, [alpha, 1 - alpha], axis=0).T
+
+
+def ci_text(interval, min_width: float = MIN_WIDTH, level: float = LEVEL) -> str:
+    """' [95% CI 38.1–46.5%]' for a (low, high) share interval, or '' when it is narrower than min_width."""
+    low, high = interval
+    if not high - low >= min_width:
+        return ""
+    return f" [{level:.0%} CI {low * 100:.1f}–{high * 100:.1f}%]"
@@ -0,0 +1,277 @@
+"""
+Offline build: clean a raw export once and write every derived artifact the
+app needs to a versioned directory, so startup only opens files: numeric
+columns are memory-mapped, string columns are decoded from their dictionaries
+into memory.
+
+    python -m utils.build                                  # data/data.csv -> artifacts/<version>/
+    python -m utils.build --data data/synthetic.csv --out artifacts
+
+The version is the first 12 hex digits of the raw file's SHA-256 (plus the
+artifact format, the TREES_BOUNDARIES file if set and the boundary mode); artifacts/LATEST names the most recent build. Layout:
+
+    manifest.json        source, row count, column encodings, sizes, build timings
+    columns/<col>.npy    cleaned dataset, one array per column (numeric as is,
+                         nullable ints as values + .mask, strings as int32 codes)
+    catalogs.json        sidebar facet lists
+    sketches.pkl         height / circumference quantile sketches per filter cell (utils/sketch.py)
+    canopy.pkl           canopy coverage per district and grid cell (utils/canopy.py)
+    streets.pkl          street index: per-street aggregates and rows (utils/streets.py)
+    profile.pkl          build_profile() of the cleaned dataset
+    quality_bits.npy     evaluate_rules() bitset (+ quality_rules.json)
+    clean_report.csv     clean_trees() stage report
+    district_report.csv  geometric vs label district per source label (only with TREES_BOUNDARIES)
+"""
+import argparse
+import hashlib
+import json
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BUILD_FORMAT = 12
+DEFAULT_ROOT = "artifacts"
+
+
+def dataset_version(path) -> str:
+    """Content hash of a raw export (streamed, so large files are fine)."""
+    from utils.districts import BOUNDARIES_PATH
+    from utils.prep import BOUNDARY_MODE
+
+    h = hashlib.sha256(f"format-{BUILD_FORMAT}-{BOUNDARY_MODE}".encode())
+    if BOUNDARIES_PATH:  # district numbers depend on it
+        h.update(Path(BOUNDARIES_PATH).read_bytes())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+# ======================
+# COLUMN ENCODING
+# ======================
+def _save_column(s: pd.Series, folder: Path) -> dict:
+    """Write one column as .npy file(s); returns how to read it back."""
+    name = s.name
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(s.dtype):
+        mask = s.isna().to_numpy()
+        np.save(folder / f"{name}.npy", s.to_numpy(dtype="int64", na_value=0))
+        np.save(folder / f"{name}.mask.npy", mask)
+        return {"encoding": "masked", "dtype": str(s.dtype)}
+    if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        np.save(folder / f"{name}.npy", s.to_numpy())
+        return {"encoding": "plain", "dtype": str(s.dtype)}
+
+    codes, categories = pd.factorize(s, sort=True)
+    np.save(folder / f"{name}.npy", codes.astype("int32"))
+    return {"encoding": "dictionary", "dtype": str(s.dtype), "categories": [str(c) for c in categories]}
+
+
+def _mmap(path) -> np.ndarray:
+    """Read-only memory map of a .npy file, as a plain ndarray view."""
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+def _load_column(name: str, spec: dict, folder: Path):
+    values = _mmap(folder / f"{name}.npy")
+    if spec["encoding"] == "plain":
+        return values
+    if spec["encoding"] == "masked":
+        mask = _mmap(folder / f"{name}.mask.npy")
+        return pd.arrays.IntegerArray(values, mask, copy=False)
+    # dictionary: decode once (codes -> strings), -1 = missing
+    return pd.array(spec["categories"], dtype=spec["dtype"]).take(values, allow_fill=True)
+
+
+# ======================
+# BUILD
+# ======================
+def build(data_path, root=DEFAULT_ROOT, force: bool = False) -> Path:
+    """Clean `data_path` and write its artifacts; returns the version directory."""
+    from utils.io import load_data
+    from utils.prep import clean_trees, add_derived_columns
+    from utils.profile import build_profile
+    from utils.quality import evaluate_rules
+    from utils.filters import facet_catalogs
+    from utils.spatial import add_contiguity_columns
+    from utils.sketch import build_sketches
+    from utils.canopy import canopy_coverage
+    from utils.streets import build_street_index
+    from utils.districts import load_boundaries, add_district_numbers
+
+    timings = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        out = fn()
+        timings[name] = round(time.perf_counter() - t0, 3)
+        return out
+
+    version = step("hash", lambda: dataset_version(data_path))
+    root = Path(root)
+    target = root / version
+    if (target / "manifest.json").exists() and not force:
+        (root / "LATEST").write_text(version + "\n")
+        return target
+
+    df_raw = step("load", lambda: load_data(str(data_path)))
+    boundaries = load_boundaries()
+    df, clean_report = step("clean", lambda: clean_trees(df_raw, with_report=True, boundaries=boundaries))
+    df = step("derive", lambda: add_derived_columns(df.copy()))
+    df, district_report = step("districts", lambda: add_district_numbers(df, boundaries))
+    df = step("contiguity", lambda: add_contiguity_columns(df))
+
+    tmp = root / f".{version}.tmp"
+    (tmp / "columns").mkdir(parents=True, exist_ok=True)
+
+    def write_columns():
+        np.save(tmp / "columns" / "_index.npy", df.index.to_numpy(dtype="int64"))
+        return {col: _save_column(df[col], tmp / "columns") for col in df.columns}
+
+    columns = step("columns", write_columns)
+    catalogs = step("catalogs", lambda: facet_catalogs(df))
+
+    def write_sketches():
+        with open(tmp / "sketches.pkl", "wb") as f:
+            pickle.dump(build_sketches(df), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    step("sketches", write_sketches)
+
+    def write_canopy():
+        with open(tmp / "canopy.pkl", "wb") as f:
+            pickle.dump(canopy_coverage(df), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    step("canopy", write_canopy)
+
+    def write_streets():
+        with open(tmp / "streets.pkl", "wb") as f:
+            pickle.dump(build_street_index(df), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    step("streets", write_streets)
+
+    def write_profile():
+        with open(tmp / "profile.pkl", "wb") as f:
+            pickle.dump(build_profile(df), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    step("profile", write_profile)
+
+    def write_quality():
+        quality = evaluate_rules(df)
+        np.save(tmp / "quality_bits.npy", quality["bits"].to_numpy(dtype=np.uint64))
+        (tmp / "quality_rules.json").write_text(json.dumps(quality["rules"], ensure_ascii=False, indent=2))
+
+    step("quality", write_quality)
+    clean_report.to_csv(tmp / "clean_report.csv", index=False)
+    if district_report is not None:
+        district_report.to_csv(tmp / "district_report.csv", index=False)
+
+    (tmp / "catalogs.json").write_text(json.dumps(
+        {"facets": catalogs}, ensure_ascii=False, default=str
+    ))
+    manifest = {
+        "format": BUILD_FORMAT,
+        "version": version,
+        "source": str(data_path),
+        "source_bytes": Path(data_path).stat().st_size,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "n_rows": len(df),
+        "columns": columns,
+        "timings_s": timings,
+        "files": {
+            str(p.relative_to(tmp)): p.stat().st_size for p in sorted(tmp.rglob("*")) if p.is_file()
+        },
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+
+    # Publish atomically: readers never see a half-written version
+    if target.exists():
+        import shutil
+        shutil.rmtree(target)
+    tmp.rename(target)
+    (root / "LATEST").write_text(version + "\n")
+    return target
+
+
+# ======================
+# LOAD
+# ======================
+def latest_version(root=DEFAULT_ROOT):
+    """Directory of the newest build under root, or None."""
+    latest = Path(root) / "LATEST"
+    if not latest.exists():
+        return None
+    path = Path(root) / latest.read_text().strip()
+    return path if (path / "manifest.json").exists() else None
+
+
+def load_artifacts(path) -> dict:
+    """
+    Open a build: numeric columns and the quality bitset are memory-mapped
+    (pages are read on first access and shared between processes); string
+    columns are decoded from their dictionaries into ordinary in-memory arrays,
+    as large as after cleaning. Same keys as app.get_data() plus 'manifest'
+    and 'path'.
+    """
+    path = Path(path)
+    manifest = json.loads((path / "manifest.json").read_text())
+    folder = path / "columns"
+    index = pd.Index(_mmap(folder / "_index.npy"))
+    df = pd.DataFrame(
+        {col: _load_column(col, spec, folder) for col, spec in manifest["columns"].items()},
+        index=index,
+        copy=False,
+    )
+    with open(path / "profile.pkl", "rb") as f:
+        profile = pickle.load(f)
+    with open(path / "sketches.pkl", "rb") as f:
+        sketches = pickle.load(f)
+    with open(path / "canopy.pkl", "rb") as f:
+        canopy = pickle.load(f)
+    with open(path / "streets.pkl", "rb") as f:
+        streets = pickle.load(f)
+    quality = {
+        "rules": json.loads((path / "quality_rules.json").read_text()),
+        "bits": pd.Series(_mmap(path / "quality_bits.npy"), index=index, copy=False),
+    }
+    return {
+        "df": df,
+        "profile": profile,
+        "quality": quality,
+        "clean_report": pd.read_csv(path / "clean_report.csv", keep_default_na=False),
+        "district_report": (
+            pd.read_csv(path / "district_report.csv", keep_default_na=False)
+            if (path / "district_report.csv").exists() else None
+        ),
+        "catalogs": json.loads((path / "catalogs.json").read_text())["facets"],
+        "sketches": sketches,
+        "canopy": canopy,
+        "streets": streets,
+        "version": manifest["version"],
+        "manifest": manifest,
+        "path": path,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the app's derived artifacts for one dataset version.")
+    ap.add_argument("--data", default="data/data.csv", help="raw export (';' CSV or .xlsx)")
+    ap.add_argument("--out", default=DEFAULT_ROOT, help="artifacts root (one sub-directory per version)")
+    ap.add_argument("--force", action="store_true", help="rebuild even if this version already exists")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    target = build(args.data, args.out, force=args.force)
+    manifest = json.loads((target / "manifest.json").read_text())
+    size_mb = sum(manifest["files"].values()) / 2**20
+    print(f"{manifest['n_rows']:,} rows -> {target} ({size_mb:.1f} MB) in {time.perf_counter() - t0:.1f} s".replace(",", " "))
+    for name, seconds in manifest["timings_s"].items():
+        print(f"  {name:<16} {seconds:>8.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
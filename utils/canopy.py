@@ -0,0 +1,214 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.spatial import to_metres
+
+# ======================
+# CANOPY COVERAGE
+# ======================
+# Crown size from trunk size (allometry), crowns drawn as discs on a metre
+# grid, overlapping crowns counted once. The grid is never allocated: every
+# crown pixel is an int64 key, and the union of crowns is the sorted keys
+# without repeats, so memory follows the canopy, not the extent of the map.
+
+RES_M = 1.0      # raster resolution (m)
+CELL_M = 250.0   # reporting cells (same grid as utils.spatial.grid_cells)
+
+# Crown diameter (m) = CROWN_A * factor(genus) * DBH(cm) ** CROWN_B, DBH = circumference / pi.
+# Fitted to the usual urban ranges (DBH 10 cm -> ~4 m, 50 cm -> ~12 m, 100 cm -> ~18 m);
+# the genus factor widens spreading crowns and narrows columnar or pruned ones.
+CROWN_A = 0.78
+CROWN_B = 0.68
+GENUS_CROWN_FACTOR = {
+    "platanus": 1.15, "aesculus": 1.05, "quercus": 1.1, "fagus": 1.1, "tilia": 1.0, "celtis": 1.0,
+    "styphnolobium": 1.05, "sophora": 1.05, "acer": 0.95, "fraxinus": 1.0, "ulmus": 1.0, "zelkova": 1.0,
+    "robinia": 1.0, "gleditsia": 1.0, "paulownia": 1.05, "catalpa": 1.05, "cedrus": 1.0, "juglans": 1.05,
+    "prunus": 0.9, "malus": 0.9, "pyrus": 0.7, "carpinus": 0.8, "betula": 0.8, "alnus": 0.8,
+    "liquidambar": 0.8, "ginkgo": 0.7, "populus": 0.75, "sorbus": 0.8, "crataegus": 0.85,
+    "koelreuteria": 0.9, "magnolia": 0.9, "ailanthus": 0.95, "pinus": 0.8, "taxus": 0.6,
+}
+# Without a circumference: crown diameter ~ this share of the height
+CROWN_PER_HEIGHT = 0.6
+# Values past the data-quality bounds are treated as missing
+MAX_CIRCUMFERENCE_CM = 2000
+MAX_HEIGHT_M = 60
+
+# Official areas (ha) of the arrondissements; 12th and 16th without the Bois de
+# Vincennes / Boulogne, whose trees are listed under their own label
+ARR_AREA_HA = {
+    1: 183, 2: 99, 3: 117, 4: 160, 5: 254, 6: 215, 7: 409, 8: 388, 9: 218, 10: 289,
+    11: 367, 12: 637, 13: 715, 14: 564, 15: 848, 16: 795, 17: 567, 18: 601, 19: 679, 20: 598,
+}
+
+
+def crown_radius_m(df: pd.DataFrame) -> tuple:
+    """
+    (radius in m, estimated) per tree. Radius from circumference by allometry,
+    else from height, else the median radius of the genus (estimated=True for
+    the last two). Crowns never exceed the tree's height when it is known.
+    """
+    n = len(df)
+    circ = pd.to_numeric(df.get("circumference_cm"), errors="coerce") if "circumference_cm" in df else pd.Series(np.nan, index=df.index)
+    height = pd.to_numeric(df.get("height_m"), errors="coerce") if "height_m" in df else pd.Series(np.nan, index=df.index)
+    circ = circ.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    height = height.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    circ[~((circ > 0) & (circ <= MAX_CIRCUMFERENCE_CM))] = np.nan
+    height[~((height > 0) & (height <= MAX_HEIGHT_M))] = np.nan
+
+    genus = (
+        df["genus"].astype(str).str.strip().str.casefold()
+        if "genus" in df.columns else pd.Series("", index=df.index)
+    )
+    factor = genus.map(GENUS_CROWN_FACTOR).fillna(1.0).to_numpy(dtype="float64")
+
+    diameter = CROWN_A * factor * (circ / np.pi) ** CROWN_B
+    from_height = np.isnan(diameter) & ~np.isnan(height)
+    diameter[from_height] = CROWN_PER_HEIGHT * height[from_height]
+    diameter = np.where(np.isnan(height), diameter, np.minimum(diameter, height))
+
+    radius = diameter / 2
+    missing = np.isnan(radius)
+    if missing.any():
+        known = pd.Series(radius).groupby(genus.to_numpy()).transform("median").to_numpy()
+        fallback = np.nanmedian(radius) if (~missing).any() else 2.0
+        radius[missing] = np.where(np.isnan(known[missing]), fallback, known[missing])
+    estimated = from_height | missing
+    return np.maximum(radius, RES_M / 2), estimated if n else np.zeros(0, dtype=bool)
+
+
+# --- rasterization ---
+_OFFSET = 1 << 24  # pixel coordinates are shifted to stay positive
+
+
+def _disc(r_px: int) -> np.ndarray:
+    """(m, 2) pixel offsets of a disc of radius r_px."""
+    d = np.arange(-r_px, r_px + 1)
+    dx, dy = np.meshgrid(d, d)
+    inside = dx ** 2 + dy ** 2 <= r_px ** 2 + r_px  # a bit generous: pixel centres
+    return np.column_stack([dx[inside], dy[inside]])
+
+
+def crown_pixels(xy: np.ndarray, radius_m: np.ndarray, res_m: float = RES_M, chunk: int = 4_000_000):
+    """
+    (keys, tree) of every crown pixel: int64 pixel key and the tree drawing it (int32).
+    Trees are grouped by radius in pixels, so each group is one broadcast of
+    its disc stencil over its trees.
+    """
+    px = np.floor(xy / res_m).astype(np.int64) + _OFFSET
+    r_px = np.maximum(np.rint(radius_m / res_m), 0).astype(np.int64)
+    radii, counts = np.unique(r_px, return_counts=True)
+    stencils = [_disc(int(r)) for r in radii]
+    total = sum(int(c) * len(s) for c, s in zip(counts, stencils))
+    keys = np.empty(total, dtype=np.int64)  # filled in place: no list of chunks to concatenate
+    trees = np.empty(total, dtype=np.int32)
+    at = 0
+    for r, stencil in zip(radii, stencils):
+        members = np.flatnonzero(r_px == r)
+        step = max(1, chunk // len(stencil))
+        for start in range(0, len(members), step):
+            idx = members[start:start + step]
+            cx = px[idx, 0][:, None] + stencil[:, 0]
+            cy = px[idx, 1][:, None] + stencil[:, 1]
+            size = cx.size
+            keys[at:at + size] = ((cx << 32) | cy).ravel()
+            trees[at:at + size] = np.repeat(idx, len(stencil))
+            at += size
+    return keys, trees
+
+
+def canopy_coverage(df: pd.DataFrame, res_m: float = RES_M, cell_m: float = CELL_M) -> dict:
+    """
+    Canopy of the whole dataset: covered area per district and per cell_m grid cell.
+    {'districts': arr_num, trees, covered_ha, area_ha, coverage;
+     'cells': ix, iy, trees, covered_m2, coverage;
+     'res_m', 'cell_m', 'n_trees', 'n_estimated', 'covered_ha', 'seconds'}
+    A pixel under several crowns counts once, for the district of one of them.
+    cell_m must be a multiple of res_m.
+    """
+    per = cell_m / res_m
+    if per != int(per):
+        raise ValueError(f"cell_m ({cell_m}) must be a multiple of res_m ({res_m})")
+    per = int(per)
+
+    t0 = time.perf_counter()
+    geo = df[["lat", "lon"]].notna().all(axis=1).to_numpy()
+    rows = np.flatnonzero(geo)
+    sub = df.iloc[rows]
+    xy = to_metres(sub["lat"].to_numpy(), sub["lon"].to_numpy())
+    radius, estimated = crown_radius_m(sub)
+
+    keys, tree = crown_pixels(xy, radius, res_m)
+    order = np.argsort(keys, kind="stable")  # union of crowns: sort, keep the first of each run
+    keys = keys[order]
+    tree = tree[order]
+    del order
+    first = np.empty(len(keys), dtype=bool)
+    first[:1] = True
+    np.not_equal(keys[1:], keys[:-1], out=first[1:])
+    keys, owner = keys[first], tree[first]
+    del tree, first
+    pixel_m2 = res_m * res_m
+
+    # per district (pixel -> district of one of the trees covering it):
+    # pixels owned per tree, then summed per district of the owners
+    arr = sub["arr_num"].to_numpy(dtype="float64", na_value=np.nan) if "arr_num" in sub.columns else np.full(len(sub), np.nan)
+    known = ~np.isnan(arr)
+    arr_codes = arr[known].astype(np.int64)
+    owned = np.bincount(owner, minlength=len(sub))
+    del owner
+    covered = np.bincount(arr_codes, weights=owned[known], minlength=21) * pixel_m2 / 10_000
+    trees = np.bincount(arr_codes, minlength=21)
+    districts = pd.DataFrame({"arr_num": list(ARR_AREA_HA)})
+    districts["trees"] = trees[districts["arr_num"]]
+    districts["covered_ha"] = covered[districts["arr_num"]].round(2)
+    districts["area_ha"] = districts["arr_num"].map(ARR_AREA_HA)
+    districts["coverage"] = (districts["covered_ha"] / districts["area_ha"]).round(4)
+
+    # per grid cell (same anchoring as utils.spatial.grid_cells): a pixel
+    # belongs to the cell of its centre, i.e. pixel index // pixels per cell
+    ix = keys >> 32
+    ix -= _OFFSET
+    ix //= per
+    iy = keys & 0xFFFFFFFF
+    iy -= _OFFSET
+    iy //= per
+    if len(keys):
+        x0, y0 = ix.min(), iy.min()
+        ny = int(iy.max() - y0) + 1
+        ix -= x0
+        ix *= ny
+        iy -= y0
+        ix += iy
+        pix_per_cell = np.bincount(ix)
+        flat = np.flatnonzero(pix_per_cell)
+        cx, cy = flat // ny + x0, flat % ny + y0
+    else:
+        pix_per_cell = flat = cx = cy = np.empty(0, dtype=np.int64)
+    del ix, iy
+    ckey = (cx << 32) + (cy & 0xFFFFFFFF)
+    order = np.argsort(ckey)
+    cells_key = ckey[order]
+    tij = np.floor(xy / cell_m).astype(np.int64)
+    tkey = (tij[:, 0] << 32) + (tij[:, 1] & 0xFFFFFFFF)
+    cells = pd.DataFrame({
+        "ix": cx[order],
+        "iy": cy[order],
+        "covered_m2": pix_per_cell[flat][order] * pixel_m2,
+    })
+    pos = np.searchsorted(cells_key, tkey)
+    in_cells = (pos < len(cells_key)) & (cells_key[np.minimum(pos, len(cells_key) - 1)] == tkey)
+    cells["trees"] = np.bincount(pos[in_cells], minlength=len(cells_key))
+    cells["coverage"] = (cells["covered_m2"] / cell_m ** 2).clip(upper=1.0).round(4)
+
+    return {
+        "districts": districts,
+        "cells": cells,
+        "res_m": res_m,
+        "cell_m": cell_m,
+        "n_trees": int(len(sub)),
+        "n_estimated": int(estimated.sum()),
+        "covered_ha": round(len(keys) * pixel_m2 / 10_000, 2),
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
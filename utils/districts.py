@@ -0,0 +1,235 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.spatial import to_metres
+
+# ======================
+# DISTRICT BOUNDARIES
+# ======================
+# Arrondissement of a tree from its coordinates, not from its label: the
+# 'district' text only gives a number for "PARIS <n>E ARRDT", while woods and
+# suburb labels ("BOIS DE VINCENNES", "HAUTS-DE-SEINE"...) cover trees that
+# may stand inside Paris. Opt-in: no boundaries are shipped with the app, so
+# this only runs when TREES_BOUNDARIES points to the City's open-data export
+# (arrondissements.geojson); otherwise the label-based number is kept and the
+# report says so. Only the city limit has a bundled, approximate fallback
+# (PARIS_OUTLINE).
+
+# Unset = label-based districts; set to a missing file = error, not a silent fallback
+BOUNDARIES_PATH = os.environ.get("TREES_BOUNDARIES") or None
+
+# City limits (woods included) as lon_min, lat_min, lon_max, lat_max: the
+# bounding-box prefilter of in_city(), and its only test without boundaries
+PARIS_BBOX = (2.224, 48.815, 2.470, 48.903)
+
+# APPROXIMATE city limit (lon, lat), hand-traced along the Boulevard
+# Périphérique and the outer edges of the Bois de Boulogne and de Vincennes,
+# clockwise from the Porte Maillot. Accurate to a few hundred metres: enough to
+# tell a suburb park from a Paris street, not to place trees along the limit
+# itself, and never used to assign districts or to drop trees. The official
+# boundaries file (TREES_BOUNDARIES) takes precedence when set.
+PARIS_OUTLINE = np.array([
+    (2.2828, 48.8781), (2.2927, 48.8857), (2.3009, 48.8893), (2.3133, 48.8946), (2.3290, 48.8975),
+    (2.3446, 48.8997), (2.3594, 48.8986), (2.3705, 48.8980), (2.3856, 48.8976), (2.3960, 48.8945),
+    (2.3925, 48.8884), (2.4066, 48.8770), (2.4087, 48.8645), (2.4106, 48.8534), (2.4107, 48.8470),
+    (2.4130, 48.8440), (2.4190, 48.8395), (2.4330, 48.8410), (2.4500, 48.8395), (2.4650, 48.8380),
+    (2.4700, 48.8330), (2.4600, 48.8220), (2.4400, 48.8190),
+    (2.4150, 48.8250), (2.3994, 48.8305), (2.3840, 48.8270), (2.3695, 48.8215), (2.3640, 48.8195),
+    (2.3600, 48.8190), (2.3530, 48.8160), (2.3420, 48.8170), (2.3380, 48.8190), (2.3250, 48.8230),
+    (2.3130, 48.8240), (2.3050, 48.8275), (2.2880, 48.8320), (2.2780, 48.8350), (2.2720, 48.8335),
+    (2.2680, 48.8390), (2.2570, 48.8380), (2.2510, 48.8430), (2.2300, 48.8500), (2.2250, 48.8650),
+    (2.2350, 48.8750), (2.2600, 48.8800),
+])
+
+# Error margin of PARIS_OUTLINE: a tree is outside Paris only if it stands
+# farther than this beyond the outline
+OUTLINE_TOLERANCE_M = 300.0
+
+# Property holding the arrondissement number, by export
+NUMBER_PROPERTIES = ("c_ar", "arr_num", "arrondissement", "c_arinsee")
+
+
+def _number(props: dict):
+    """Arrondissement number (1-20) of a GeoJSON feature, from its properties (None if absent)."""
+    for key in NUMBER_PROPERTIES:
+        value = props.get(key)
+        if value is not None:
+            n = int(value)
+            return n - 75100 if n > 75100 else n  # INSEE code 75101..75120
+    return None
+
+
+def load_boundaries(path=BOUNDARIES_PATH):
+    """
+    Arrondissement polygons of a GeoJSON FeatureCollection (lon/lat), or None
+    without a path (TREES_BOUNDARIES unset): {'arr': number per part, 'rings':
+    list of rings per part ((m, 2) lon/lat arrays, holes included), 'bbox':
+    (n, 4) lon_min, lat_min, lon_max, lat_max per part, 'source': path}.
+    MultiPolygons are split into parts. FileNotFoundError if the path is set
+    but missing.
+    """
+    if not path:
+        return None
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No arrondissement boundaries at {path} (TREES_BOUNDARIES)")
+    features = json.loads(path.read_text(encoding="utf-8"))["features"]
+    arr, rings = [], []
+    for feature in features:
+        n = _number(feature.get("properties") or {})
+        geom = feature.get("geometry") or {}
+        if n is None or geom.get("type") not in ("Polygon", "MultiPolygon"):
+            continue
+        polygons = [geom["coordinates"]] if geom["type"] == "Polygon" else geom["coordinates"]
+        for polygon in polygons:
+            arr.append(n)
+            rings.append([np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon])
+    bbox = np.array([
+        [*np.min(np.vstack(r), axis=0), *np.max(np.vstack(r), axis=0)] for r in rings
+    ]).reshape(-1, 4)
+    return {"arr": np.array(arr, dtype=np.int64), "rings": rings, "bbox": bbox, "source": str(path)}
+
+
+# ======================
+# POINT IN POLYGON
+# ======================
+def _inside(x: np.ndarray, y: np.ndarray, rings: list) -> np.ndarray:
+    """
+    Even-odd test of points (x sorted by y) against one polygon and its holes.
+    Points are sorted by latitude, so each edge only tests the slice of points
+    within its latitude band (two searchsorted) instead of every point.
+    """
+    inside = np.zeros(len(x), dtype=bool)
+    for ring in rings:
+        a = ring
+        b = np.roll(ring, -1, axis=0)
+        lo = np.searchsorted(y, np.minimum(a[:, 1], b[:, 1]), side="left")
+        hi = np.searchsorted(y, np.maximum(a[:, 1], b[:, 1]), side="left")
+        for k in np.flatnonzero(hi > lo):
+            (xa, ya), (xb, yb) = a[k], b[k]
+            s = slice(lo[k], hi[k])
+            # half-open band [min, max): a vertex shared by two edges counts once
+            inside[s] ^= x[s] < xa + (y[s] - ya) * (xb - xa) / (yb - ya)
+    return inside
+
+
+def in_polygon(lat, lon, rings: list) -> np.ndarray:
+    """Even-odd test of points against one polygon (rings: outer ring then holes, (m, 2) lon/lat)."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    out = np.zeros(len(lat), dtype=bool)
+    rows = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    rows = rows[np.argsort(lat[rows], kind="stable")]
+    out[rows] = _inside(lon[rows], lat[rows], rings)
+    return out
+
+
+def distance_to_ring_m(lat, lon, ring: np.ndarray) -> np.ndarray:
+    """Distance (m) of each point to the nearest edge of a closed ring ((m, 2) lon/lat), one pass per edge."""
+    p = to_metres(lat, lon)
+    a = to_metres(ring[:, 1], ring[:, 0])
+    b = np.roll(a, -1, axis=0)
+    out = np.full(len(p), np.inf)
+    for (xa, ya), (xb, yb) in zip(a, b):
+        dx, dy = xb - xa, yb - ya
+        t = np.clip(((p[:, 0] - xa) * dx + (p[:, 1] - ya) * dy) / (dx * dx + dy * dy), 0, 1)
+        np.minimum(out, np.hypot(p[:, 0] - xa - t * dx, p[:, 1] - ya - t * dy), out=out)
+    return out
+
+
+def assign_districts(lat, lon, boundaries: dict) -> np.ndarray:
+    """
+    Arrondissement number of each point (0 = outside every polygon or no
+    coordinates). A bounding-box prefilter picks the candidate points of each
+    polygon before the exact test.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    out = np.zeros(len(lat), dtype=np.int64)
+    todo = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    for n, rings, (x0, y0, x1, y1) in zip(boundaries["arr"], boundaries["rings"], boundaries["bbox"]):
+        cand = todo[(lon[todo] >= x0) & (lon[todo] <= x1) & (lat[todo] >= y0) & (lat[todo] <= y1)]
+        if cand.size == 0:
+            continue
+        cand = cand[np.argsort(lat[cand], kind="stable")]
+        hit = cand[_inside(lon[cand], lat[cand], rings)]
+        out[hit] = n
+        todo = np.setdiff1d(todo, hit, assume_unique=True)  # first polygon wins on shared borders
+    return out
+
+
+def in_city(lat, lon, boundaries=None) -> np.ndarray:
+    """
+    True for points inside Paris: inside PARIS_BBOX (prefilter), then inside
+    one of the arrondissements, whose union is the city limit, or without
+    boundaries inside the approximate PARIS_OUTLINE or less than
+    OUTLINE_TOLERANCE_M beyond it. Points without coordinates are False.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    x0, y0, x1, y1 = PARIS_BBOX
+    inside = (lon >= x0) & (lon <= x1) & (lat >= y0) & (lat <= y1)  # NaN -> False
+    rows = np.flatnonzero(inside)
+    if boundaries is not None:
+        inside[rows] = assign_districts(lat[rows], lon[rows], boundaries) > 0
+    else:
+        near = in_polygon(lat[rows], lon[rows], [PARIS_OUTLINE])
+        out = rows[~near]
+        near[~near] = distance_to_ring_m(lat[out], lon[out], PARIS_OUTLINE) <= OUTLINE_TOLERANCE_M
+        inside[rows] = near
+    return inside
+
+
+def label_districts(district: pd.Series) -> pd.Series:
+    """Arrondissement number written in the 'district' label ("PARIS 12E ARRDT" -> 12), NA otherwise."""
+    return district.astype(str).str.extract(r"(\d{1,2})", expand=False).astype("Int64")
+
+
+# ======================
+# ASSIGNMENT + REPORT
+# ======================
+def add_district_numbers(df: pd.DataFrame, boundaries=None):
+    """
+    (df, report): set 'arr_num' from the coordinates when boundaries are
+    given (trees outside every polygon get NA), from the label otherwise.
+    The report compares both per source label: trees, label district ('12e',
+    '' if none), same / other district / outside Paris / no coordinates, and
+    the district most trees were moved to.
+    """
+    label = label_districts(df["district"]) if "district" in df.columns else pd.Series(pd.NA, index=df.index, dtype="Int64")
+    if boundaries is None or not {"lat", "lon"}.issubset(df.columns):
+        df["arr_num"] = label
+        return df, None
+
+    geo = assign_districts(df["lat"].to_numpy(dtype="float64", na_value=np.nan),
+                           df["lon"].to_numpy(dtype="float64", na_value=np.nan), boundaries)
+    df["arr_num"] = pd.Series(geo, index=df.index, dtype="Int64").where(geo > 0)
+
+    no_coords = df["lat"].isna().to_numpy() | df["lon"].isna().to_numpy()
+    label_n = label.to_numpy(dtype="float64", na_value=np.nan)
+    status = np.select(
+        [no_coords, geo == 0, geo == label_n],
+        ["no_coords", "outside", "same"],
+        default="other",
+    )
+    t = pd.DataFrame({
+        "district": df["district"].astype(str).to_numpy() if "district" in df.columns else "",
+        "status": status,
+        "geo": geo,
+    })
+    report = pd.crosstab(t["district"], t["status"]).reindex(columns=["same", "other", "outside", "no_coords"], fill_value=0)
+    report.insert(0, "trees", report.sum(axis=1))
+    label_arr = label.groupby(t["district"].to_numpy()).first().reindex(report.index)
+    report.insert(1, "label_arr", [f"{n}e" if pd.notna(n) else "" for n in label_arr])
+    moved = t[t["status"] == "other"]
+    report["moved_to"] = (
+        moved.groupby("district")["geo"].agg(lambda g: f"{g.mode().iloc[0]}e").reindex(report.index).fillna("")
+        if not moved.empty else ""
+    )
+    report = report.reset_index().sort_values("trees", ascending=False, ignore_index=True)
+    report.columns.name = None
+    return df, report
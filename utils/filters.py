@@ -0,0 +1,62 @@
+import pandas as pd
+
+
+def apply_filters(
+    df: pd.DataFrame,
+    selected_arrs,
+    only_remarkable: bool = False,
+    selected_owners=(),
+    selected_stages=(),
+    search_col: str = None,
+    picked_values=(),
+) -> pd.DataFrame:
+    """
+    Sidebar filters, in the order the app applies them:
+    districts (and geolocated rows only), remarkable, ownership, growth stage, search.
+    Empty ownership / stage / search selections mean "no filtering".
+    """
+    df_filtered = (
+        df[df["arr_num"].isin(selected_arrs)]
+          .dropna(subset=["lat", "lon"])
+    )
+
+    if only_remarkable:
+        df_filtered = df_filtered[df_filtered["is_remarkable"]]
+
+    # Filter by ownership
+    if "ownership" in df_filtered.columns and selected_owners:
+        df_filtered = df_filtered[
+            df_filtered["ownership"].astype(str).str.strip().isin(selected_owners)
+        ]
+
+    # Filter by growth stage
+    if "growth_stage" in df_filtered.columns and selected_stages:
+        df_filtered = df_filtered[
+            df_filtered["growth_stage"].astype(str).str.strip().isin(selected_stages)
+        ]
+
+    # Apply search filter if any values picked
+    if picked_values and search_col in df_filtered.columns:
+        df_filtered = df_filtered[
+            df_filtered[search_col].astype(str).str.strip().isin(picked_values)
+        ]
+
+    return df_filtered
+
+
+# Sidebar option lists, computed once per dataset
+CATALOG_COLS = ["en_name", "genus_species", "ownership", "growth_stage"]
+
+
+def facet_catalogs(df: pd.DataFrame) -> dict:
+    """
+    Distinct values offered by the sidebar widgets: sorted, stripped strings per
+    CATALOG_COLS column (when present) and the arrondissement numbers under 'arr_num'.
+    """
+    catalogs = {
+        col: df[col].dropna().astype(str).str.strip().drop_duplicates().sort_values().tolist()
+        for col in CATALOG_COLS if col in df.columns
+    }
+    if "arr_num" in df.columns:
+        catalogs["arr_num"] = sorted(df["arr_num"].dropna().unique().astype(int).tolist())
+    return catalogs
@@ -0,0 +1,39 @@
+import importlib
+
+import streamlit as st
+
+from utils import perf
+
+
+def _resolve(render_fn):
+    """A callable, or a 'package.module:function' path imported on first use."""
+    if isinstance(render_fn, str):
+        module, _, name = render_fn.partition(":")
+        return getattr(importlib.import_module(module), name)
+    return render_fn
+
+
+@st.fragment
+def lazy_section(title: str, render_fn, *args, key: str, help: str = None, **kwargs):
+    """
+    Collapsed-by-default block whose content is only computed when opened.
+
+    Unlike st.expander (which runs its body on every rerun, even closed),
+    nothing inside `render_fn` runs until the toggle is switched on.
+    The block is a fragment: opening/closing it reruns only this block,
+    with the arguments it was last called with.
+    render_fn may be given as 'module:function' so its module (and heavy
+    imports) are only loaded once the block is opened.
+    """
+    with st.container(border=True):
+        opened = st.toggle(title, value=False, key=f"lazy_{key}", help=help)
+
+        if not opened:
+            cost = perf.last_cost(key)
+            if cost is not None:
+                st.caption(f"⏱️ Not computed — saves ~{perf.fmt_ms(cost)} per rerun.")
+            return
+
+        with perf.timed(key):
+            _resolve(render_fn)(*args, **kwargs)
+        st.caption(f"⏱️ Computed in {perf.fmt_ms(perf.last_cost(key))}.")
@@ -0,0 +1,188 @@
+import os
+import time
+from contextlib import contextmanager
+
+# streamlit is only imported by the session helpers: rss_bytes() is also used
+# outside the app (cleaning report, benchmarks).
+
+_STATE_KEY = "_perf_last_cost"
+_RUN_KEY = "_perf_run"
+_FRAGMENT_KEY = "_perf_fragment_run"
+
+
+@contextmanager
+def timed(label: str):
+    """
+    Time the enclosed block and remember its duration (seconds) for this session.
+    The last known cost is kept even when the block is later skipped,
+    so the UI can tell how much a lazy block saves.
+    """
+    import streamlit as st
+
+    t0 = time.perf_counter()
+    try:
+        with step(label):
+            yield
+    finally:
+        st.session_state.setdefault(_STATE_KEY, {})[label] = time.perf_counter() - t0
+
+
+def last_cost(label: str):
+    """Last measured duration (seconds) of a timed block, or None if it never ran."""
+    import streamlit as st
+
+    return st.session_state.get(_STATE_KEY, {}).get(label)
+
+
+def fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:,.0f} ms".replace(",", " ")
+
+
+def rss_bytes():
+    """Resident memory of this process in bytes (None if it cannot be read)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ======================
+# PER-RERUN TIMELINE (developer overlay)
+# ======================
+def perf_enabled() -> bool:
+    """Overlay switch: '?perf=1' in the URL or TREES_PERF=1 in the environment."""
+    import streamlit as st
+
+    flag = st.query_params.get("perf", os.environ.get("TREES_PERF", ""))
+    return str(flag).strip().lower() in ("1", "true", "yes", "on")
+
+
+def start_run():
+    """Reset the timeline; call once at the top of the script."""
+    import streamlit as st
+
+    st.session_state[_RUN_KEY] = _new_run()
+
+
+def _new_run(fragments=None) -> dict:
+    return {"t0": time.perf_counter(), "steps": [], "charts": [], "notes": {}, "fragments": fragments}
+
+
+def _fragment_ids():
+    """Ids of the fragments rerun on their own (None in a full rerun, which also runs every fragment)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return (ctx.fragment_ids_this_run or None) if ctx is not None else None
+
+
+def _run():
+    """
+    Timeline of the current rerun. A fragment-only rerun does not run the top of
+    the script: it gets its own timeline, started fresh by its first step,
+    instead of adding bars to the last full rerun's waterfall.
+    """
+    import streamlit as st
+
+    fragments = _fragment_ids()
+    if fragments is None:
+        return st.session_state.get(_RUN_KEY)
+    run = st.session_state.get(_FRAGMENT_KEY)
+    if run is None or run["fragments"] is not fragments:  # one id list per fragment rerun
+        run = st.session_state[_FRAGMENT_KEY] = _new_run(fragments)
+    return run
+
+
+@contextmanager
+def step(label: str):
+    """Record the enclosed block as one bar of the current rerun's waterfall."""
+    run = _run()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if run is not None:
+            run["steps"].append({"step": label, "start_s": t0 - run["t0"], "seconds": time.perf_counter() - t0})
+
+
+def note(label: str, value):
+    """Free-form fact about the current rerun, listed under the waterfall (e.g. cache hits)."""
+    run = _run()
+    if run is not None:
+        run["notes"][label] = value
+
+
+def record_chart(label: str, fig):
+    """Size of the JSON a Plotly figure sends to the browser (only measured with the overlay on)."""
+    run = _run()
+    if run is None or not perf_enabled():
+        return
+    run["charts"].append({"chart": label, "payload_kb": round(len(fig.to_json()) / 1024, 1)})
+
+
+def render_overlay():
+    """
+    Timing waterfall of the current rerun, chart payloads and process RSS
+    (sidebar), then the last fragment-only rerun on its own timeline.
+    """
+    import streamlit as st
+
+    run = _run()
+    if run is None or not perf_enabled():
+        return
+    rss = rss_bytes()
+
+    with st.sidebar.expander("⏱️ Performance (this rerun)", expanded=True):
+        c1, c2 = st.columns(2)
+        c1.metric("Rerun", fmt_ms(time.perf_counter() - run["t0"]))
+        c2.metric("Process RSS", f"{rss / 2**20:,.0f} MB".replace(",", " ") if rss else "N/A")
+        _render_timeline(run, key="perf_run")
+
+    last = st.session_state.get(_FRAGMENT_KEY)
+    if last is not None and last["steps"]:
+        end = max(s["start_s"] + s["seconds"] for s in last["steps"])
+        with st.sidebar.expander(f"⏱️ Last fragment rerun ({fmt_ms(end)})", expanded=False):
+            st.caption("Blocks rerun on their own (lazy blocks, map controls), before this rerun.")
+            _render_timeline(last, key="perf_fragment_run")
+
+
+def _render_timeline(run: dict, key: str):
+    """Waterfall, step table, notes and chart payloads of one timeline."""
+    import pandas as pd
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    steps = pd.DataFrame(run["steps"], columns=["step", "start_s", "seconds"])
+    if not steps.empty:
+        fig = go.Figure(go.Bar(
+            y=steps["step"],
+            x=steps["seconds"] * 1000,
+            base=steps["start_s"] * 1000,
+            orientation="h",
+            marker_color="#509C6F",
+            hovertemplate="%{y}: %{x:.0f} ms (from %{base:.0f} ms)<extra></extra>",
+        ))
+        fig.update_yaxes(autorange="reversed")
+        fig.update_layout(
+            height=60 + 24 * len(steps),
+            margin=dict(l=0, r=0, t=10, b=30),
+            xaxis_title="ms since start of rerun",
+        )
+        st.plotly_chart(fig, use_container_width=True, key=key)
+        st.dataframe(
+            steps.assign(ms=(steps["seconds"] * 1000).round(1))[["step", "ms"]],
+            use_container_width=True, hide_index=True,
+        )
+
+    for label, value in run["notes"].items():
+        st.caption(f"**{label}**: {value}")
+
+    if run["charts"]:
+        st.markdown("**Plotly payload sent to the browser**")
+        st.dataframe(pd.DataFrame(run["charts"]), use_container_width=True, hide_index=True)
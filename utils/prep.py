@@ -1,54 +1,43 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
 import pandas as pd
 import numpy as np
 
-def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Clean the raw dataset:
-      1️⃣ Standardize column names
-      2️⃣ Extract lat/lon from 'geo_point_2d'
-    """
-    df = df.copy()
-
-    # 1) Standardize column names (explicit mapping + fallback)
-    rename_map = {
-        "IDBASE": "tree_id",
-        "TYPE EMPLACEMENT": "location_type",
-        "DOMANIALITE": "ownership",
-        "ARRONDISSEMENT": "district",
-        "COMPLEMENT ADRESSE": "address_complement",
-        "LIEU / ADRESSE": "address",
-        "IDEMPLACEMENT": "location_id",
-        "LIBELLE FRANCAIS": "french_name",
-        "GENRE": "genus",
-        "ESPECE": "species",
-        "VARIETE OU CULTIVAR": "variety",
-        "CIRCONFERENCE (cm)": "circumference_cm",
-        "HAUTEUR (m)": "height_m",
-        "STADE DE DEVELOPPEMENT": "growth_stage",
-        "REMARQUABLE": "remarkable",
-        "geo_point_2d": "geo_point_2d",
-    }
-    df.rename(columns=rename_map, inplace=True)
-
-    # 2) Extract lat/lon from "geo_point_2d" (format: "lat, lon")
-    if "geo_point_2d" in df.columns:
-        lat, lon = [], []
-        for val in df["geo_point_2d"].astype(str):
-            parts = [p.strip() for p in val.split(",")]
-            if len(parts) == 2:
-                try:
-                    lat.append(float(parts[0]))
-                    lon.append(float(parts[1]))
-                except ValueError:
-                    lat.append(np.nan); lon.append(np.nan)
-            else:
-                lat.append(np.nan); lon.append(np.nan)
-        df["lat"] = lat
-        df["lon"] = lon
-
-    # 3) Translate tree
+from utils.perf import rss_bytes
+from utils.districts import label_districts, in_city, OUTLINE_TOLERANCE_M
+
+# Stage messages (genus fallbacks, dropped rows) end up in the cleaning report
+log = logging.getLogger(__name__)
+
+# ======================
+# REFERENCE MAPPINGS
+# ======================
+
+# Standardize column names (explicit mapping + fallback)
+RENAME_MAP = {
+    "IDBASE": "tree_id",
+    "TYPE EMPLACEMENT": "location_type",
+    "DOMANIALITE": "ownership",
+    "ARRONDISSEMENT": "district",
+    "COMPLEMENT ADRESSE": "address_complement",
+    "LIEU / ADRESSE": "address",
+    "IDEMPLACEMENT": "location_id",
+    "LIBELLE FRANCAIS": "french_name",
+    "GENRE": "genus",
+    "ESPECE": "species",
+    "VARIETE OU CULTIVAR": "variety",
+    "CIRCONFERENCE (cm)": "circumference_cm",
+    "HAUTEUR (m)": "height_m",
+    "STADE DE DEVELOPPEMENT": "growth_stage",
+    "REMARQUABLE": "remarkable",
+    "geo_point_2d": "geo_point_2d",
+}
 
-    translation_map = {
+# Translate tree names (French common name -> English)
+TRANSLATION_MAP = {
     "Platane": "Plane tree",
     "Tilleul": "Linden",
     "Micocoulier": "Hackberry",
@@ -279,26 +268,532 @@ def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
     "Castanopsis": "Chinquapin",
     "Papayer": "Papaya",
 }
+
+# Growth stages in English
+GROWTH_STAGE_MAP = {
+    None: None,
+    "Adulte": "Adult",
+    "Jeune (arbre)": "Young tree",
+    "Jeune (arbre)Adulte": "Adult",  # your choice
+    "Mature": "Mature",
+}
+
+# --- Standardize and translate ownership (domanialité) ---
+OWNERSHIP_MAP = {
+    "Alignement": "Street alignment",
+    "Jardin": "Gardens",
+    "CIMETIERE": "Cemeteries",
+    "PERIPHERIQUE": "Ring road",
+    "DASCO": "Schools",
+    "DJS": "Youth & Sports facilities",
+    "DAC": "Cultural venues",
+    "DFPE": "Early childhood facilities",
+    "DASES": "Social & Health services",
+    "DEVE": "Green spaces & environment",
+    "DPE": "Sanitation, Water & Streets",
+    "DVD": "Roads & Mobility",
+}
+
+# -----------------------------------------------------
+# Manual name fixes from genus_species
+# -----------------------------------------------------
+# Dictionnaire extensible : clés = genus_species (insensible à la casse)
+MANUAL_NAMES = {
+    "prunus serrulata": {"french_name": "Cerisier du Japon", "en_name": "East Asian cherry"},
+    "salix pyrifolia": {"french_name": "Saule à feuilles de poirier", "en_name": "Balsam willow"},
+    "pyrus pyrifolia": {"french_name": "Poirier asiatique", "en_name": "Asian pear"},
+    "populus n. sp.": {"french_name": "Peuplier (espèce non spécifiée)", "en_name": "Poplar (unspecified species)"},
+    "prunus x hillieri": {"french_name": "Cerisier d’Hillier", "en_name": "Hillier cherry"},
+    "acer platanoides": {"french_name": "Érable plane", "en_name": "Norway maple"},
+    "cedrus atlantica": {"french_name": "Cèdre de l’Atlas", "en_name": "Atlas cedar"},
+
+    # 🌿 Nouveaux ajouts :
+    "sorbus aria": {"french_name": "Alisier blanc", "en_name": "Whitebeam"},
+    "catalpa speciosa": {"french_name": "Catalpa commun", "en_name": "Northern catalpa"},
+    "olea europaea": {"french_name": "Olivier", "en_name": "Olive tree"},
+    "platanus x hispanica": {"french_name": "Platane commun", "en_name": "London plane"},
+    "prunus avium": {"french_name": "Merisier", "en_name": "Wild cherry"},
+    "cupressus sempervirens": {"french_name": "Cyprès toujours vert", "en_name": "Italian cypress"},
+    "prunus domestica": {"french_name": "Prunier domestique", "en_name": "European plum"},
+    "crataegus laevigata": {"french_name": "Aubépine à deux styles", "en_name": "Midland hawthorn"},
+    "malus domestica": {"french_name": "Pommier domestique", "en_name": "Apple tree"},
+            "olea europea": {
+        "french_name": "Olivier",
+        "en_name": "Olive tree",
+    },
+    "prunus n. sp.": {
+        "french_name": "Prunier (espèce non spécifiée)",
+        "en_name": "Plum (unspecified species)",
+    },
+    "malus floribunda": {
+        "french_name": "Pommier florifère",
+        "en_name": "Japanese flowering crabapple",
+    },
+    "malus communis": {
+        "french_name": "Pommier commun",
+        "en_name": "Common apple tree",
+    },
+    "gleditsia triacanthos f. inermis": {
+        "french_name": "Févier sans épines",
+        "en_name": "Thornless honey locust",
+    },
+    "poncirus trifoliata": {
+        "french_name": "Oranger trifolié",
+        "en_name": "Trifoliate orange",
+    },
+    "ulmus minor": {
+        "french_name": "Orme champêtre",
+        "en_name": "Field elm",
+    },
+    "acer n. sp.": {
+        "french_name": "Érable (espèce non spécifiée)",
+        "en_name": "Maple (unspecified species)",
+    },
+    "rhamnus alaternus": {
+        "french_name": "Nerprun alaterne",
+        "en_name": "Italian buckthorn",
+    },
+            "magnolia x loebneri": {
+        "french_name": "Magnolia de Loebner",
+        "en_name": "Loebner magnolia",
+    },
+    "tilia x flavescens": {
+        "french_name": "Tilleul jaune",
+        "en_name": "Yellow linden",
+    },
+    "betula n. sp.": {
+        "french_name": "Bouleau (espèce non spécifiée)",
+        "en_name": "Birch (unspecified species)",
+    },
+    "styphnolobium japonica": {
+        "french_name": "Sophora du Japon",
+        "en_name": "Japanese pagoda tree",
+    },
+    "populus canadensis": {
+        "french_name": "Peuplier du Canada",
+        "en_name": "Canadian poplar",
+    },
+    "pistacia sp.": {
+        "french_name": "Pistachier (espèce non spécifiée)",
+        "en_name": "Pistachio (unspecified species)",
+    },
+    "malus toringoides": {
+        "french_name": "Pommier du Tibet",
+        "en_name": "Tibetan crabapple",
+    },
+    "ulmus parviflora": {
+        "french_name": "Orme de Chine",
+        "en_name": "Chinese elm",
+    },
+    "prunus pendula": {
+        "french_name": "Cerisier pleureur",
+        "en_name": "Weeping cherry",
+    },
+    "x chitalpa sp.": {
+        "french_name": "Chitalpa (hybride)",
+        "en_name": "Chitalpa (hybrid)",
+    },
+    "fraxinus americana": {
+        "french_name": "Frêne d’Amérique",
+        "en_name": "White ash",
+    },
+    "malus spectabilis": {
+        "french_name": "Pommier à fleurs",
+        "en_name": "Chinese flowering crabapple",
+    },
+    "ulmus minor var. vulgaris": {
+        "french_name": "Orme champêtre (variété commune)",
+        "en_name": "Field elm (common variety)",
+    },
+    "platanus acerifolia": {
+        "french_name": "Platane à feuilles d’érable",
+        "en_name": "Maple-leaved plane",
+    },
+    "sorbus sp.": {
+        "french_name": "Alisier (espèce non spécifiée)",
+        "en_name": "Whitebeam (unspecified species)",
+    },
+    "prunus sp.": {
+        "french_name": "Prunier (espèce non spécifiée)",
+        "en_name": "Plum (unspecified species)",
+    },
+    "eriolobus trilobata": {
+        "french_name": "Pommier à trois lobes",
+        "en_name": "Three-lobed apple tree",
+    },
+            "ehretia macrophylla": {
+        "french_name": "Ehretia à grandes feuilles",
+        "en_name": "Large-leaved ehretia",
+    },
+    "ilex aquifolium": {
+        "french_name": "Houx commun",
+        "en_name": "Common holly",
+    },
+    "sorbus torminalis": {
+        "french_name": "Alisier torminal",
+        "en_name": "Wild service tree",
+    },
+    "halesia carolina": {
+        "french_name": "Arbre aux clochettes",
+        "en_name": "Carolina silverbell",
+    },
+    "crataegus japonicum": {
+        "french_name": "Aubépine du Japon",
+        "en_name": "Japanese hawthorn",
+    },
+    "styphnolobium n. sp.": {
+        "french_name": "Sophora (espèce non spécifiée)",
+        "en_name": "Pagoda tree (unspecified species)",
+    },
+    "quercus robur": {
+        "french_name": "Chêne pédonculé",
+        "en_name": "English oak",
+    },
+    "sorbus aucuparia": {
+        "french_name": "Sorbier des oiseleurs",
+        "en_name": "Rowan tree",
+    },
+    "ilex sp.": {
+        "french_name": "Houx (espèce non spécifiée)",
+        "en_name": "Holly (unspecified species)",
+    },
+    "eriobotrya sp.": {
+        "french_name": "Néflier (espèce non spécifiée)",
+        "en_name": "Loquat (unspecified species)",
+    },
+    "malus baccata": {
+        "french_name": "Pommier de Sibérie",
+        "en_name": "Siberian crabapple",
+    },
+    "prunus spinosa": {
+        "french_name": "Prunellier",
+        "en_name": "Blackthorn",
+    },
+    "ficus n. sp.": {
+        "french_name": "Figuier (espèce non spécifiée)",
+        "en_name": "Fig tree (unspecified species)",
+    },
+            "pinus n. sp.": {
+        "french_name": "Pin (espèce non spécifiée)",
+        "en_name": "Pine (unspecified species)",
+    },
+    "prunus americana": {
+        "french_name": "Prunier d'Amérique",
+        "en_name": "American plum",
+    },
+    "zanthoxylum n. sp.": {
+        "french_name": "Clavalier (espèce non spécifiée)",
+        "en_name": "Prickly ash (unspecified species)",
+    },
+    "taxus x media": {
+        "french_name": "If hybride",
+        "en_name": "Hybrid yew",
+    },
+    "eriobotrya japonicum": {
+        "french_name": "Néflier du Japon",
+        "en_name": "Japanese loquat",
+    },
+    "prunus glandulosa": {
+        "french_name": "Amandier à fleurs",
+        "en_name": "Dwarf flowering almond",
+    },
+    "ulmus glabra": {
+        "french_name": "Orme de montagne",
+        "en_name": "Wych elm",
+    },
+    "phellodendron japonicum": {
+        "french_name": "Arbre-liège du Japon",
+        "en_name": "Japanese cork tree",
+    },
+    "magnolia sp.": {
+        "french_name": "Magnolia (espèce non spécifiée)",
+        "en_name": "Magnolia (unspecified species)",
+    },
+    "crataegus prunifolia": {
+        "french_name": "Aubépine à feuilles de prunier",
+        "en_name": "Plumleaf hawthorn",
+    },
+    "betula albosinensis": {
+        "french_name": "Bouleau de Chine",
+        "en_name": "Chinese red birch",
+    },
+    "corylus colurna": {
+        "french_name": "Noisetier de Byzance",
+        "en_name": "Turkish hazel",
+    },
+    "robinia hispida": {
+        "french_name": "Robinier hérissé",
+        "en_name": "Bristly locust",
+    },
+    "ulmus x hollandica": {
+        "french_name": "Orme de Hollande",
+        "en_name": "Dutch elm",
+    },
+    "ulmus parvifolia": {
+        "french_name": "Orme de Chine",
+        "en_name": "Chinese elm",
+    },
+            "salix x pendulina": {
+        "french_name": "Saule pleureur",
+        "en_name": "Weeping willow",
+    },
+    "paulownia tomentosa": {
+        "french_name": "Paulownia impérial",
+        "en_name": "Princess tree",
+    },
+    "ulmus n. sp.": {
+        "french_name": "Orme (espèce non spécifiée)",
+        "en_name": "Elm (unspecified species)",
+    },
+    "phoenix sp.": {
+        "french_name": "Palmier (espèce non spécifiée)",
+        "en_name": "Palm tree (unspecified species)",
+    },
+    "prunus padus": {
+        "french_name": "Merisier à grappes",
+        "en_name": "Bird cherry",
+    },
+    "cotoneaster franchetii": {
+        "french_name": "Cotoneaster de Franchet",
+        "en_name": "Franchet's cotoneaster",
+    },
+    "carpinus carpinifolia": {
+        "french_name": "Charme à feuilles de charme",
+        "en_name": "Hornbeam",
+    },
+    "robinia ornus": {
+        "french_name": "Robinier orne",
+        "en_name": "Robinia ornis (hybrid)",
+    },
+    "robinia x margaretta": {
+        "french_name": "Robinier de Margaretta",
+        "en_name": "Margaretta locust",
+    },
+    "prunus cerasifera": {
+        "french_name": "Prunier-cerise",
+        "en_name": "Cherry plum",
+    },
+    "acer sp.": {
+        "french_name": "Érable (espèce non spécifiée)",
+        "en_name": "Maple (unspecified species)",
+    },
+    "ligustrum vulgaris": {
+        "french_name": "Troène commun",
+        "en_name": "Common privet",
+    },
+    "crataegus n. sp.": {
+        "french_name": "Aubépine (espèce non spécifiée)",
+        "en_name": "Hawthorn (unspecified species)",
+    },
+    "sorbus padus": {
+        "french_name": "Sorbier des oiseleurs à grappes",
+        "en_name": "European bird cherry",
+    },
+    "pyrus sp.": {
+        "french_name": "Poirier (espèce non spécifiée)",
+        "en_name": "Pear tree (unspecified species)",
+    },
+            "ilex latifolia": {
+        "french_name": "Houx à larges feuilles",
+        "en_name": "Lusterleaf holly",
+    },
+    "robinia pseudocamellia": {
+        "french_name": "Robinier faux-camélia",
+        "en_name": "False camellia locust",
+    },
+    "picea glauca": {
+        "french_name": "Épinette blanche",
+        "en_name": "White spruce",
+    },
+    "platanus n. sp.": {
+        "french_name": "Platane (espèce non spécifiée)",
+        "en_name": "Plane tree (unspecified species)",
+    },
+    "alangium sinensis": {
+        "french_name": "Alangium de Chine",
+        "en_name": "Chinese alangium",
+    },
+}
+
+# Remplissage générique quand species est vide/NaN mais genus présent
+GENUS_FALLBACK = {
+    "taxus": {"french_name": "If", "en_name": "Yew"},
+    "styphnolobium": {"french_name": "Arbre aux pagodes", "en_name": "Japanese pagoda tree"},
+    "prunus": {"french_name": "Cerisier / Prunier", "en_name": "Cherry / Plum tree"},
+    "pyrus": {"french_name": "Poirier", "en_name": "Pear tree"},
+    "celtis": {"french_name": "Micocoulier", "en_name": "Hackberry"},
+    "carpinus": {"french_name": "Charme", "en_name": "Hornbeam"},
+    "ulmus": {"french_name": "Orme", "en_name": "Elm"},
+    "cupressus": {"french_name": "Cyprès", "en_name": "Cypress"},
+    "fraxinus": {"french_name": "Frêne", "en_name": "Ash tree"},
+    "aesculus": {"french_name": "Marronnier", "en_name": "Horse chestnut"},
+    "crataegus": {"french_name": "Aubépine", "en_name": "Hawthorn"},
+    "malus": {"french_name": "Pommier", "en_name": "Apple tree"},
+    "paulownia": {"french_name": "Paulownia", "en_name": "Princess tree"},
+    "sorbus": {"french_name": "Sorbier", "en_name": "Rowan / Mountain ash"},
+    "acer": {"french_name": "Érable", "en_name": "Maple"},
+    "morus": {"french_name": "Mûrier", "en_name": "Mulberry"},
+    "zelkova":      {"french_name": "Zelkova",            "en_name": "Zelkova"},
+    "lagerstroemia":{"french_name": "Lilas des Indes",    "en_name": "Crape myrtle"},
+    "magnolia":     {"french_name": "Magnolia",           "en_name": "Magnolia"},
+    "ilex":         {"french_name": "Houx",               "en_name": "Holly"},
+    "tilia":        {"french_name": "Tilleul",            "en_name": "Linden"},
+    "toona":        {"french_name": "Cédrèle",            "en_name": "Toona / Chinese cedar"},
+    "x chitalpa":   {"french_name": "Chitalpa (hybride)", "en_name": "Chitalpa (hybrid)"},
+    "chitalpa":     {"french_name": "Chitalpa",           "en_name": "Chitalpa"},
+    "robinia":      {"french_name": "Robinier",           "en_name": "Locust"},
+    "pinus":        {"french_name": "Pin",                "en_name": "Pine"},
+    "salix":        {"french_name": "Saule",              "en_name": "Willow"},
+    "olea":         {"french_name": "Olivier",            "en_name": "Olive tree"},
+    "populus":      {"french_name": "Peuplier",           "en_name": "Poplar"},
+    "thuja":       {"french_name": "Thuya",              "en_name": "Thuja / Arborvitae"},
+    "cornus":      {"french_name": "Cornouiller",        "en_name": "Dogwood"},
+    "koelreuteria": {"french_name": "Savonnier",         "en_name": "Golden rain tree"},
+    "platanus":    {"french_name": "Platane",            "en_name": "Plane tree"},
+    "cedrus":      {"french_name": "Cèdre",              "en_name": "Cedar"},
+    "quercus":     {"french_name": "Chêne",              "en_name": "Oak"},
+    "ligustrum":   {"french_name": "Troène",             "en_name": "Privet"},
+    "tamarix":     {"french_name": "Tamaris",            "en_name": "Tamarisk"},
+    "ailanthus":   {"french_name": "Ailante",            "en_name": "Tree of Heaven"},
+    "sambucus":    {"french_name": "Sureau",             "en_name": "Elder / Elderberry"},
+    "betula":      {"french_name": "Bouleau",            "en_name": "Birch"},
+    "gleditsia":   {"french_name": "Févier",             "en_name": "Honey locust"},
+    "albizia":       {"french_name": "Albizia / Arbre à soie", "en_name": "Silk tree / Albizia"},
+    "clerodendrum":  {"french_name": "Clérodendron",           "en_name": "Clerodendrum"},
+    "alnus":         {"french_name": "Aulne",                  "en_name": "Alder"},
+    "poncirus":      {"french_name": "Poncirus / Oranger trifolié", "en_name": "Trifoliate orange"},
+    "cydonia":       {"french_name": "Cognassier",             "en_name": "Quince tree"},
+    "cephalotaxus":  {"french_name": "Cephalotaxus / If à prunes", "en_name": "Plum yew"},
+    "amelanchier":   {"french_name": "Amélanchier",            "en_name": "Serviceberry"},
+    "viburnum":      {"french_name": "Viorne",                 "en_name": "Viburnum"},
+    "phillyrea":     {"french_name": "Filaire",                "en_name": "Phillyrea / Mock privet"},
+    "eriolobus":   {"french_name": "Cormier / Alisier",             "en_name": "Service tree"},
+    "gymnocladus": {"french_name": "Gymnocladus / Arbre aux haricots", "en_name": "Kentucky coffeetree"},
+    "elaeagnus":   {"french_name": "Éléagnus",                      "en_name": "Oleaster / Silverberry"},
+    "liquidambar": {"french_name": "Copalme d'Amérique",            "en_name": "Sweetgum"},
+    "eucalyptus":  {"french_name": "Eucalyptus",                    "en_name": "Eucalyptus"},
+    "parrotia":    {"french_name": "Parrotie de Perse",             "en_name": "Persian ironwood"},
+    "styrax":      {"french_name": "Styrax",                        "en_name": "Snowbell tree"},
+    "photinia":    {"french_name": "Photinia",                      "en_name": "Photinia"},
+    "zanthoxylum": {"french_name": "Clavalier / Poivrier du Sichuan","en_name": "Prickly ash / Sichuan pepper tree"},
+    "fontanesia":  {"french_name": "Fontanésia",                    "en_name": "Fontanesia"},
+    "laurus":      {"french_name": "Laurier",                       "en_name": "Bay laurel"},
+    "ehretia":        {"french_name": "Ehretia",                   "en_name": "Ehretia"},
+    "ficus":          {"french_name": "Figuier",                   "en_name": "Fig tree"},
+    "pterocarya":     {"french_name": "Ptérocarier",               "en_name": "Wingnut tree"},
+    "ostrya":         {"french_name": "Charme houblon",            "en_name": "Hop-hornbeam"},
+    "chamaecyparis":  {"french_name": "Faux-cyprès",               "en_name": "False cypress"},
+    "sequoiadendron": {"french_name": "Séquoia géant",             "en_name": "Giant sequoia"},
+    "abies":          {"french_name": "Sapin",                     "en_name": "Fir"},
+    "platycladus":    {"french_name": "Thuya de Chine",            "en_name": "Chinese arborvitae"},
+    "broussonetia":   {"french_name": "Mûrier à papier",           "en_name": "Paper mulberry"},
+    "melia":          {"french_name": "Mélié / Lilas de Perse",    "en_name": "Chinaberry / Persian lilac"},
+    "cryptomeria":    {"french_name": "Cryptoméria du Japon",      "en_name": "Japanese cedar"},
+    "fagus":          {"french_name": "Hêtre",                     "en_name": "Beech"},
+    "vitex":          {"french_name": "Gattilier",                 "en_name": "Chaste tree"},
+    "wisteria":       {"french_name": "Glycine",                   "en_name": "Wisteria"},
+    "buxus":          {"french_name": "Buis", "en_name": "Boxwood"},
+
+}
+
+
+def _blank(s):
+    """'Empty field' helper: NaN or blank string."""
+    return s.isna() | s.astype(str).str.strip().eq("")
+
+
+# ======================
+# CLEANING STAGES
+# ======================
+# Each stage takes and returns the DataFrame; clean_trees() runs them in order.
+
+def rename_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """1) Standardize column names."""
+    return df.rename(columns=RENAME_MAP)
+
+
+def parse_geo_point(df: pd.DataFrame) -> pd.DataFrame:
+    """2) Extract lat/lon from "geo_point_2d" (format: "lat, lon")."""
+    if "geo_point_2d" in df.columns:
+        lat, lon = [], []
+        # fillna: with pandas' string dtype, astype(str) keeps blanks as NaN
+        for val in df["geo_point_2d"].astype(str).fillna(""):
+            parts = [p.strip() for p in val.split(",")]
+            if len(parts) == 2:
+                try:
+                    lat.append(float(parts[0]))
+                    lon.append(float(parts[1]))
+                except ValueError:
+                    lat.append(np.nan); lon.append(np.nan)
+            else:
+                lat.append(np.nan); lon.append(np.nan)
+        df["lat"] = lat
+        df["lon"] = lon
+    return df
+
+
+# Trees outside the city limits (suburb parks, cemeteries...): "keep" them
+# untouched, "flag" them ('in_paris' column) or "drop" them
+BOUNDARY_MODES = ("keep", "flag", "drop")
+BOUNDARY_MODE = os.environ.get("TREES_BOUNDARY_MODE", "flag")
+
+
+def filter_intra_muros(df: pd.DataFrame, mode: str = None, boundaries: dict = None) -> pd.DataFrame:
+    """
+    2b) Trees inside Paris (utils.districts.in_city): bounding-box prefilter,
+    then the arrondissement polygons (boundaries, see utils.districts.load_boundaries)
+    or, without them, the approximate bundled city outline with its tolerance
+    (utils.districts.OUTLINE_TOLERANCE_M), which can flag but not drop trees.
+    Trees without coordinates are never flagged nor dropped. Outside counts
+    are logged per source 'district' label.
+    """
+    mode = mode or BOUNDARY_MODE
+    if mode not in BOUNDARY_MODES:
+        raise ValueError(f"Unknown boundary mode {mode!r}, expected one of {BOUNDARY_MODES}")
+    if mode == "drop" and boundaries is None:
+        raise ValueError("Boundary mode 'drop' needs the arrondissement boundaries (TREES_BOUNDARIES): "
+                         "the bundled city outline is only approximate")
+    if not {"lat", "lon"}.issubset(df.columns):
+        return df
+
+    inside = in_city(df["lat"].to_numpy(dtype="float64", na_value=np.nan),
+                     df["lon"].to_numpy(dtype="float64", na_value=np.nan), boundaries)
+    outside = ~inside & df["lat"].notna().to_numpy() & df["lon"].notna().to_numpy()
+    n_out = int(outside.sum())
+    test = ("arrondissement polygons" if boundaries is not None
+            else f"approximate city outline ± {OUTLINE_TOLERANCE_M:.0f} m (TREES_BOUNDARIES not set)")
+    action = {"keep": "kept", "flag": "flagged (in_paris = False)", "drop": "dropped"}[mode]
+    log.info(f"🗺️ {n_out:,} rows ({100 * n_out / max(len(df), 1):.2f}%) outside Paris, {action} — {test}.")
+    if n_out and "district" in df.columns:
+        for label, n in df.loc[outside, "district"].fillna("(no label)").value_counts().items():
+            log.info(f"↳ {label}: {n:,} rows outside")
+
+    if mode == "flag":
+        df["in_paris"] = ~outside
+    elif mode == "drop" and n_out:
+        df = df.loc[~outside].copy()
+    return df
+
+
+def translate_names(df: pd.DataFrame) -> pd.DataFrame:
+    """3) Translate tree names ('en_name' from 'french_name')."""
     if "french_name" in df.columns:
-        df["en_name"] = df["french_name"].map(translation_map).fillna(df["french_name"])
+        df["en_name"] = df["french_name"].map(TRANSLATION_MAP).fillna(df["french_name"])
+    return df
 
-        # --- inside clean_trees(df) ---
-    if "growth_stage" in df.columns:
-        map_growth = {
-            None: None,
-            "Adulte": "Adult",
-            "Jeune (arbre)": "Young tree",
-            "Jeune (arbre)Adulte": "Adult",  # your choice
-            "Mature": "Mature",
-        }
 
-        # Replace the original column with English equivalents
-        df["growth_stage"] = df["growth_stage"].map(map_growth).fillna(df["growth_stage"])
+def map_growth_stage(df: pd.DataFrame) -> pd.DataFrame:
+    """4) Replace the original growth stages with English equivalents."""
+    if "growth_stage" in df.columns:
+        df["growth_stage"] = df["growth_stage"].map(GROWTH_STAGE_MAP).fillna(df["growth_stage"])
+    return df
 
-    # --- inside clean_trees(df) ---
 
-    # Build "genus_species" as a simple "Genus species" concatenation.
-    # Robust to missing columns / NaNs / extra spaces.
+def build_genus_species(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    5) Build "genus_species" as a simple "Genus species" concatenation.
+    Robust to missing columns / NaNs / extra spaces.
+    """
     g = df["genus"].astype(str).str.strip() if "genus" in df.columns else ""
     s = df["species"].astype(str).str.strip() if "species" in df.columns else ""
 
@@ -315,23 +810,11 @@ def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
 
     # Optional: if you prefer an empty string when both are missing
     df.loc[df["genus_species"].isin(["", "nan", "none"]), "genus_species"] = ""
+    return df
 
-    # --- Standardize and translate ownership (domanialité) ---
-    OWNERSHIP_MAP = {
-        "Alignement": "Street alignment",
-        "Jardin": "Gardens",
-        "CIMETIERE": "Cemeteries",
-        "PERIPHERIQUE": "Ring road",
-        "DASCO": "Schools",
-        "DJS": "Youth & Sports facilities",
-        "DAC": "Cultural venues",
-        "DFPE": "Early childhood facilities",
-        "DASES": "Social & Health services",
-        "DEVE": "Green spaces & environment",
-        "DPE": "Sanitation, Water & Streets",
-        "DVD": "Roads & Mobility",
-    }
 
+def map_ownership(df: pd.DataFrame) -> pd.DataFrame:
+    """6) Standardize and translate ownership."""
     if "ownership" in df.columns:
         df["ownership"] = (
             df["ownership"]
@@ -339,428 +822,32 @@ def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
             .str.strip()
             .replace(OWNERSHIP_MAP)
         )
+    return df
 
 
-        # -----------------------------------------------------
-    # Manual name fixes from genus_species
-    # -----------------------------------------------------
-    # Dictionnaire extensible : clés = genus_species (insensible à la casse)
-    MANUAL_NAMES = {
-        "prunus serrulata": {"french_name": "Cerisier du Japon", "en_name": "East Asian cherry"},
-        "salix pyrifolia": {"french_name": "Saule à feuilles de poirier", "en_name": "Balsam willow"},
-        "pyrus pyrifolia": {"french_name": "Poirier asiatique", "en_name": "Asian pear"},
-        "populus n. sp.": {"french_name": "Peuplier (espèce non spécifiée)", "en_name": "Poplar (unspecified species)"},
-        "prunus x hillieri": {"french_name": "Cerisier d’Hillier", "en_name": "Hillier cherry"},
-        "acer platanoides": {"french_name": "Érable plane", "en_name": "Norway maple"},
-        "cedrus atlantica": {"french_name": "Cèdre de l’Atlas", "en_name": "Atlas cedar"},
-
-        # 🌿 Nouveaux ajouts :
-        "sorbus aria": {"french_name": "Alisier blanc", "en_name": "Whitebeam"},
-        "catalpa speciosa": {"french_name": "Catalpa commun", "en_name": "Northern catalpa"},
-        "olea europaea": {"french_name": "Olivier", "en_name": "Olive tree"},
-        "platanus x hispanica": {"french_name": "Platane commun", "en_name": "London plane"},
-        "prunus avium": {"french_name": "Merisier", "en_name": "Wild cherry"},
-        "cupressus sempervirens": {"french_name": "Cyprès toujours vert", "en_name": "Italian cypress"},
-        "prunus domestica": {"french_name": "Prunier domestique", "en_name": "European plum"},
-        "crataegus laevigata": {"french_name": "Aubépine à deux styles", "en_name": "Midland hawthorn"},
-        "malus domestica": {"french_name": "Pommier domestique", "en_name": "Apple tree"},
-                "olea europea": {
-            "french_name": "Olivier",
-            "en_name": "Olive tree",
-        },
-        "prunus n. sp.": {
-            "french_name": "Prunier (espèce non spécifiée)",
-            "en_name": "Plum (unspecified species)",
-        },
-        "malus floribunda": {
-            "french_name": "Pommier florifère",
-            "en_name": "Japanese flowering crabapple",
-        },
-        "malus communis": {
-            "french_name": "Pommier commun",
-            "en_name": "Common apple tree",
-        },
-        "gleditsia triacanthos f. inermis": {
-            "french_name": "Févier sans épines",
-            "en_name": "Thornless honey locust",
-        },
-        "poncirus trifoliata": {
-            "french_name": "Oranger trifolié",
-            "en_name": "Trifoliate orange",
-        },
-        "ulmus minor": {
-            "french_name": "Orme champêtre",
-            "en_name": "Field elm",
-        },
-        "acer n. sp.": {
-            "french_name": "Érable (espèce non spécifiée)",
-            "en_name": "Maple (unspecified species)",
-        },
-        "rhamnus alaternus": {
-            "french_name": "Nerprun alaterne",
-            "en_name": "Italian buckthorn",
-        },
-                "magnolia x loebneri": {
-            "french_name": "Magnolia de Loebner",
-            "en_name": "Loebner magnolia",
-        },
-        "tilia x flavescens": {
-            "french_name": "Tilleul jaune",
-            "en_name": "Yellow linden",
-        },
-        "betula n. sp.": {
-            "french_name": "Bouleau (espèce non spécifiée)",
-            "en_name": "Birch (unspecified species)",
-        },
-        "styphnolobium japonica": {
-            "french_name": "Sophora du Japon",
-            "en_name": "Japanese pagoda tree",
-        },
-        "populus canadensis": {
-            "french_name": "Peuplier du Canada",
-            "en_name": "Canadian poplar",
-        },
-        "pistacia sp.": {
-            "french_name": "Pistachier (espèce non spécifiée)",
-            "en_name": "Pistachio (unspecified species)",
-        },
-        "malus toringoides": {
-            "french_name": "Pommier du Tibet",
-            "en_name": "Tibetan crabapple",
-        },
-        "ulmus parviflora": {
-            "french_name": "Orme de Chine",
-            "en_name": "Chinese elm",
-        },
-        "prunus pendula": {
-            "french_name": "Cerisier pleureur",
-            "en_name": "Weeping cherry",
-        },
-        "x chitalpa sp.": {
-            "french_name": "Chitalpa (hybride)",
-            "en_name": "Chitalpa (hybrid)",
-        },
-        "fraxinus americana": {
-            "french_name": "Frêne d’Amérique",
-            "en_name": "White ash",
-        },
-        "malus spectabilis": {
-            "french_name": "Pommier à fleurs",
-            "en_name": "Chinese flowering crabapple",
-        },
-        "ulmus minor var. vulgaris": {
-            "french_name": "Orme champêtre (variété commune)",
-            "en_name": "Field elm (common variety)",
-        },
-        "platanus acerifolia": {
-            "french_name": "Platane à feuilles d’érable",
-            "en_name": "Maple-leaved plane",
-        },
-        "sorbus sp.": {
-            "french_name": "Alisier (espèce non spécifiée)",
-            "en_name": "Whitebeam (unspecified species)",
-        },
-        "prunus sp.": {
-            "french_name": "Prunier (espèce non spécifiée)",
-            "en_name": "Plum (unspecified species)",
-        },
-        "eriolobus trilobata": {
-            "french_name": "Pommier à trois lobes",
-            "en_name": "Three-lobed apple tree",
-        },
-                "ehretia macrophylla": {
-            "french_name": "Ehretia à grandes feuilles",
-            "en_name": "Large-leaved ehretia",
-        },
-        "ilex aquifolium": {
-            "french_name": "Houx commun",
-            "en_name": "Common holly",
-        },
-        "sorbus torminalis": {
-            "french_name": "Alisier torminal",
-            "en_name": "Wild service tree",
-        },
-        "halesia carolina": {
-            "french_name": "Arbre aux clochettes",
-            "en_name": "Carolina silverbell",
-        },
-        "crataegus japonicum": {
-            "french_name": "Aubépine du Japon",
-            "en_name": "Japanese hawthorn",
-        },
-        "styphnolobium n. sp.": {
-            "french_name": "Sophora (espèce non spécifiée)",
-            "en_name": "Pagoda tree (unspecified species)",
-        },
-        "quercus robur": {
-            "french_name": "Chêne pédonculé",
-            "en_name": "English oak",
-        },
-        "sorbus aucuparia": {
-            "french_name": "Sorbier des oiseleurs",
-            "en_name": "Rowan tree",
-        },
-        "ilex sp.": {
-            "french_name": "Houx (espèce non spécifiée)",
-            "en_name": "Holly (unspecified species)",
-        },
-        "eriobotrya sp.": {
-            "french_name": "Néflier (espèce non spécifiée)",
-            "en_name": "Loquat (unspecified species)",
-        },
-        "malus baccata": {
-            "french_name": "Pommier de Sibérie",
-            "en_name": "Siberian crabapple",
-        },
-        "prunus spinosa": {
-            "french_name": "Prunellier",
-            "en_name": "Blackthorn",
-        },
-        "ficus n. sp.": {
-            "french_name": "Figuier (espèce non spécifiée)",
-            "en_name": "Fig tree (unspecified species)",
-        },
-                "pinus n. sp.": {
-            "french_name": "Pin (espèce non spécifiée)",
-            "en_name": "Pine (unspecified species)",
-        },
-        "prunus americana": {
-            "french_name": "Prunier d'Amérique",
-            "en_name": "American plum",
-        },
-        "zanthoxylum n. sp.": {
-            "french_name": "Clavalier (espèce non spécifiée)",
-            "en_name": "Prickly ash (unspecified species)",
-        },
-        "taxus x media": {
-            "french_name": "If hybride",
-            "en_name": "Hybrid yew",
-        },
-        "eriobotrya japonicum": {
-            "french_name": "Néflier du Japon",
-            "en_name": "Japanese loquat",
-        },
-        "prunus glandulosa": {
-            "french_name": "Amandier à fleurs",
-            "en_name": "Dwarf flowering almond",
-        },
-        "ulmus glabra": {
-            "french_name": "Orme de montagne",
-            "en_name": "Wych elm",
-        },
-        "phellodendron japonicum": {
-            "french_name": "Arbre-liège du Japon",
-            "en_name": "Japanese cork tree",
-        },
-        "magnolia sp.": {
-            "french_name": "Magnolia (espèce non spécifiée)",
-            "en_name": "Magnolia (unspecified species)",
-        },
-        "crataegus prunifolia": {
-            "french_name": "Aubépine à feuilles de prunier",
-            "en_name": "Plumleaf hawthorn",
-        },
-        "betula albosinensis": {
-            "french_name": "Bouleau de Chine",
-            "en_name": "Chinese red birch",
-        },
-        "corylus colurna": {
-            "french_name": "Noisetier de Byzance",
-            "en_name": "Turkish hazel",
-        },
-        "robinia hispida": {
-            "french_name": "Robinier hérissé",
-            "en_name": "Bristly locust",
-        },
-        "ulmus x hollandica": {
-            "french_name": "Orme de Hollande",
-            "en_name": "Dutch elm",
-        },
-        "ulmus parvifolia": {
-            "french_name": "Orme de Chine",
-            "en_name": "Chinese elm",
-        },
-                "salix x pendulina": {
-            "french_name": "Saule pleureur",
-            "en_name": "Weeping willow",
-        },
-        "paulownia tomentosa": {
-            "french_name": "Paulownia impérial",
-            "en_name": "Princess tree",
-        },
-        "ulmus n. sp.": {
-            "french_name": "Orme (espèce non spécifiée)",
-            "en_name": "Elm (unspecified species)",
-        },
-        "phoenix sp.": {
-            "french_name": "Palmier (espèce non spécifiée)",
-            "en_name": "Palm tree (unspecified species)",
-        },
-        "prunus padus": {
-            "french_name": "Merisier à grappes",
-            "en_name": "Bird cherry",
-        },
-        "cotoneaster franchetii": {
-            "french_name": "Cotoneaster de Franchet",
-            "en_name": "Franchet's cotoneaster",
-        },
-        "carpinus carpinifolia": {
-            "french_name": "Charme à feuilles de charme",
-            "en_name": "Hornbeam",
-        },
-        "robinia ornus": {
-            "french_name": "Robinier orne",
-            "en_name": "Robinia ornis (hybrid)",
-        },
-        "robinia x margaretta": {
-            "french_name": "Robinier de Margaretta",
-            "en_name": "Margaretta locust",
-        },
-        "prunus cerasifera": {
-            "french_name": "Prunier-cerise",
-            "en_name": "Cherry plum",
-        },
-        "acer sp.": {
-            "french_name": "Érable (espèce non spécifiée)",
-            "en_name": "Maple (unspecified species)",
-        },
-        "ligustrum vulgaris": {
-            "french_name": "Troène commun",
-            "en_name": "Common privet",
-        },
-        "crataegus n. sp.": {
-            "french_name": "Aubépine (espèce non spécifiée)",
-            "en_name": "Hawthorn (unspecified species)",
-        },
-        "sorbus padus": {
-            "french_name": "Sorbier des oiseleurs à grappes",
-            "en_name": "European bird cherry",
-        },
-        "pyrus sp.": {
-            "french_name": "Poirier (espèce non spécifiée)",
-            "en_name": "Pear tree (unspecified species)",
-        },
-                "ilex latifolia": {
-            "french_name": "Houx à larges feuilles",
-            "en_name": "Lusterleaf holly",
-        },
-        "robinia pseudocamellia": {
-            "french_name": "Robinier faux-camélia",
-            "en_name": "False camellia locust",
-        },
-        "picea glauca": {
-            "french_name": "Épinette blanche",
-            "en_name": "White spruce",
-        },
-        "platanus n. sp.": {
-            "french_name": "Platane (espèce non spécifiée)",
-            "en_name": "Plane tree (unspecified species)",
-        },
-        "alangium sinensis": {
-            "french_name": "Alangium de Chine",
-            "en_name": "Chinese alangium",
-        },
-    }
-        # colonne clé normalisée (sans espaces superflus, sans casse)
+def apply_manual_names(df: pd.DataFrame) -> pd.DataFrame:
+    """7) Fill blank French/English names from MANUAL_NAMES (keyed on genus_species)."""
     if "genus_species" in df.columns:
+        # colonne clé normalisée (sans espaces superflus, sans casse)
         gs_key = (
             df["genus_species"]
             .astype(str)
             .str.strip()
             .str.casefold()
         )
-        def _blank(s):
-            return s.isna() | s.astype(str).str.strip().eq("")
 
+        # boucle d'application : on complète seulement les vides
         for key, names in MANUAL_NAMES.items():
             m = gs_key.eq(key)
             if "french_name" in df.columns and "french_name" in names:
                 df.loc[m & _blank(df["french_name"]), "french_name"] = names["french_name"]
             if "en_name" in df.columns and "en_name" in names:
                 df.loc[m & _blank(df["en_name"]), "en_name"] = names["en_name"]
+    return df
 
 
-        # Remplissage générique quand species est vide/NaN mais genus présent
-    GENUS_FALLBACK = {
-        "taxus": {"french_name": "If", "en_name": "Yew"},
-        "styphnolobium": {"french_name": "Arbre aux pagodes", "en_name": "Japanese pagoda tree"},
-        "prunus": {"french_name": "Cerisier / Prunier", "en_name": "Cherry / Plum tree"},
-        "pyrus": {"french_name": "Poirier", "en_name": "Pear tree"},
-        "celtis": {"french_name": "Micocoulier", "en_name": "Hackberry"},
-        "carpinus": {"french_name": "Charme", "en_name": "Hornbeam"},
-        "ulmus": {"french_name": "Orme", "en_name": "Elm"},
-        "cupressus": {"french_name": "Cyprès", "en_name": "Cypress"},
-        "fraxinus": {"french_name": "Frêne", "en_name": "Ash tree"},
-        "aesculus": {"french_name": "Marronnier", "en_name": "Horse chestnut"},
-        "crataegus": {"french_name": "Aubépine", "en_name": "Hawthorn"},
-        "malus": {"french_name": "Pommier", "en_name": "Apple tree"},
-        "paulownia": {"french_name": "Paulownia", "en_name": "Princess tree"},
-        "sorbus": {"french_name": "Sorbier", "en_name": "Rowan / Mountain ash"},
-        "acer": {"french_name": "Érable", "en_name": "Maple"},
-        "morus": {"french_name": "Mûrier", "en_name": "Mulberry"},
-        "zelkova":      {"french_name": "Zelkova",            "en_name": "Zelkova"},
-        "lagerstroemia":{"french_name": "Lilas des Indes",    "en_name": "Crape myrtle"},
-        "magnolia":     {"french_name": "Magnolia",           "en_name": "Magnolia"},
-        "ilex":         {"french_name": "Houx",               "en_name": "Holly"},
-        "tilia":        {"french_name": "Tilleul",            "en_name": "Linden"},
-        "toona":        {"french_name": "Cédrèle",            "en_name": "Toona / Chinese cedar"},
-        "x chitalpa":   {"french_name": "Chitalpa (hybride)", "en_name": "Chitalpa (hybrid)"},
-        "chitalpa":     {"french_name": "Chitalpa",           "en_name": "Chitalpa"},
-        "robinia":      {"french_name": "Robinier",           "en_name": "Locust"},
-        "pinus":        {"french_name": "Pin",                "en_name": "Pine"},
-        "salix":        {"french_name": "Saule",              "en_name": "Willow"},
-        "olea":         {"french_name": "Olivier",            "en_name": "Olive tree"},
-        "populus":      {"french_name": "Peuplier",           "en_name": "Poplar"},
-        "thuja":       {"french_name": "Thuya",              "en_name": "Thuja / Arborvitae"},
-        "cornus":      {"french_name": "Cornouiller",        "en_name": "Dogwood"},
-        "koelreuteria": {"french_name": "Savonnier",         "en_name": "Golden rain tree"},
-        "platanus":    {"french_name": "Platane",            "en_name": "Plane tree"},
-        "cedrus":      {"french_name": "Cèdre",              "en_name": "Cedar"},
-        "quercus":     {"french_name": "Chêne",              "en_name": "Oak"},
-        "ligustrum":   {"french_name": "Troène",             "en_name": "Privet"},
-        "tamarix":     {"french_name": "Tamaris",            "en_name": "Tamarisk"},
-        "ailanthus":   {"french_name": "Ailante",            "en_name": "Tree of Heaven"},
-        "sambucus":    {"french_name": "Sureau",             "en_name": "Elder / Elderberry"},
-        "betula":      {"french_name": "Bouleau",            "en_name": "Birch"},
-        "gleditsia":   {"french_name": "Févier",             "en_name": "Honey locust"},
-        "albizia":       {"french_name": "Albizia / Arbre à soie", "en_name": "Silk tree / Albizia"},
-        "clerodendrum":  {"french_name": "Clérodendron",           "en_name": "Clerodendrum"},
-        "alnus":         {"french_name": "Aulne",                  "en_name": "Alder"},
-        "poncirus":      {"french_name": "Poncirus / Oranger trifolié", "en_name": "Trifoliate orange"},
-        "cydonia":       {"french_name": "Cognassier",             "en_name": "Quince tree"},
-        "cephalotaxus":  {"french_name": "Cephalotaxus / If à prunes", "en_name": "Plum yew"},
-        "amelanchier":   {"french_name": "Amélanchier",            "en_name": "Serviceberry"},
-        "viburnum":      {"french_name": "Viorne",                 "en_name": "Viburnum"},
-        "phillyrea":     {"french_name": "Filaire",                "en_name": "Phillyrea / Mock privet"},
-        "eriolobus":   {"french_name": "Cormier / Alisier",             "en_name": "Service tree"},
-        "gymnocladus": {"french_name": "Gymnocladus / Arbre aux haricots", "en_name": "Kentucky coffeetree"},
-        "elaeagnus":   {"french_name": "Éléagnus",                      "en_name": "Oleaster / Silverberry"},
-        "liquidambar": {"french_name": "Copalme d'Amérique",            "en_name": "Sweetgum"},
-        "eucalyptus":  {"french_name": "Eucalyptus",                    "en_name": "Eucalyptus"},
-        "parrotia":    {"french_name": "Parrotie de Perse",             "en_name": "Persian ironwood"},
-        "styrax":      {"french_name": "Styrax",                        "en_name": "Snowbell tree"},
-        "photinia":    {"french_name": "Photinia",                      "en_name": "Photinia"},
-        "zanthoxylum": {"french_name": "Clavalier / Poivrier du Sichuan","en_name": "Prickly ash / Sichuan pepper tree"},
-        "fontanesia":  {"french_name": "Fontanésia",                    "en_name": "Fontanesia"},
-        "laurus":      {"french_name": "Laurier",                       "en_name": "Bay laurel"},
-        "ehretia":        {"french_name": "Ehretia",                   "en_name": "Ehretia"},
-        "ficus":          {"french_name": "Figuier",                   "en_name": "Fig tree"},
-        "pterocarya":     {"french_name": "Ptérocarier",               "en_name": "Wingnut tree"},
-        "ostrya":         {"french_name": "Charme houblon",            "en_name": "Hop-hornbeam"},
-        "chamaecyparis":  {"french_name": "Faux-cyprès",               "en_name": "False cypress"},
-        "sequoiadendron": {"french_name": "Séquoia géant",             "en_name": "Giant sequoia"},
-        "abies":          {"french_name": "Sapin",                     "en_name": "Fir"},
-        "platycladus":    {"french_name": "Thuya de Chine",            "en_name": "Chinese arborvitae"},
-        "broussonetia":   {"french_name": "Mûrier à papier",           "en_name": "Paper mulberry"},
-        "melia":          {"french_name": "Mélié / Lilas de Perse",    "en_name": "Chinaberry / Persian lilac"},
-        "cryptomeria":    {"french_name": "Cryptoméria du Japon",      "en_name": "Japanese cedar"},
-        "fagus":          {"french_name": "Hêtre",                     "en_name": "Beech"},
-        "vitex":          {"french_name": "Gattilier",                 "en_name": "Chaste tree"},
-        "wisteria":       {"french_name": "Glycine",                   "en_name": "Wisteria"},
-        "buxus":          {"french_name": "Buis", "en_name": "Boxwood"},
-
-        }
-
+def apply_genus_fallback(df: pd.DataFrame) -> pd.DataFrame:
+    """8) Generic names when species is empty/NaN but genus is known (GENUS_FALLBACK)."""
     genus_key = df["genus"].astype(str).str.strip().str.casefold()
     no_species = df["species"].isna() | df["species"].astype(str).str.strip().eq("")
     no_name = _blank(df["french_name"]) & _blank(df["en_name"])
@@ -769,22 +856,21 @@ def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
         m = no_species & no_name & genus_key.eq(g)
         hits = int(m.sum())
         if hits:
-            print(f"↳ Genus fallback '{g}': {hits} rows")
+            log.info(f"↳ Genus fallback '{g}': {hits} rows")
             if "french_name" in names:
                 df.loc[m, "french_name"] = names["french_name"]
             if "en_name" in names:
                 df.loc[m, "en_name"] = names["en_name"]
+    return df
 
 
-        # -----------------------------------------------------
-    # 🧹 Remove rows with no usable identification
-    #   Règle: (pas de nom FR ET pas de nom EN) ET (pas de genus)
-    # -----------------------------------------------------
+def drop_unidentified(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    9) 🧹 Remove rows with no usable identification
+       Règle: (pas de nom FR ET pas de nom EN) ET (pas de genus)
+    """
     initial_n = len(df)
 
-    def _blank(s):
-        return s.isna() | s.astype(str).str.strip().eq("")
-
     cond_no_name = _blank(df["french_name"]) & _blank(df["en_name"])
 
     # "no genus" = NaN / vide / "Non spécifié" (insensible à la casse)
@@ -799,33 +885,114 @@ def clean_trees(df: pd.DataFrame) -> pd.DataFrame:
 
     if n_drop > 0:
         pct_drop = (n_drop / max(initial_n, 1)) * 100
-        print(f"🪓 Dropped {n_drop:,} rows ({pct_drop:.2f}% of dataset) with no FR/EN name and no genus.")
+        log.info(f"🪓 Dropped {n_drop:,} rows ({pct_drop:.2f}% of dataset) with no FR/EN name and no genus.")
         df = df.loc[~drop_mask].copy()
     else:
-        print("✅ No rows dropped: every row has either a name (FR/EN) or a genus.")
+        log.info("✅ No rows dropped: every row has either a name (FR/EN) or a genus.")
+    return df
 
-    # colonne clé normalisée (sans espaces superflus, sans casse)
-    if "genus_species" in df.columns:
-        gs_key = (
-            df["genus_species"]
-            .astype(str)
-            .str.strip()
-            .str.casefold()
-        )
-        # helpers "champ vide"
-        def _blank(s):
-            return s.isna() | s.astype(str).str.strip().eq("")
 
-        # boucle d'application : on complète seulement les vides
-        for key, names in MANUAL_NAMES.items():
-            m = gs_key.eq(key)
-            if "french_name" in df.columns and "french_name" in names:
-                df.loc[m & _blank(df["french_name"]), "french_name"] = names["french_name"]
-            if "en_name" in df.columns and "en_name" in names:
-                df.loc[m & _blank(df["en_name"]), "en_name"] = names["en_name"]
+# (name, stage, columns the stage writes: used to count modified rows)
+CLEAN_STAGES = [
+    ("rename", rename_columns, []),
+    ("geo_parse", parse_geo_point, ["lat", "lon"]),
+    ("boundary", filter_intra_muros, ["in_paris"]),
+    ("translation", translate_names, ["en_name"]),
+    ("growth_stage", map_growth_stage, ["growth_stage"]),
+    ("genus_species", build_genus_species, ["genus_species"]),
+    ("ownership", map_ownership, ["ownership"]),
+    ("manual_names", apply_manual_names, ["french_name", "en_name"]),
+    ("genus_fallback", apply_genus_fallback, ["french_name", "en_name"]),
+    ("row_drop", drop_unidentified, []),
+]
+
+
+def clean_trees(df: pd.DataFrame, with_report: bool = False, boundary_mode: str = None, boundaries: dict = None):
+    """
+    Clean the raw dataset by running CLEAN_STAGES in order:
+      1️⃣ Standardize column names
+      2️⃣ Extract lat/lon from 'geo_point_2d', keep / flag / drop trees outside
+         Paris (boundary_mode, default BOUNDARY_MODE; boundaries: arrondissement
+         polygons of utils.districts.load_boundaries, if any)
+      3️⃣ Translate names, growth stages and ownership
+      4️⃣ Build 'genus_species' and fill missing names
+      5️⃣ Drop rows with no usable identification
+
+    with_report=True returns (df, report): one row per stage with wall time,
+    rows in/out, rows modified, memory delta (process RSS) and stage messages.
+    """
+    df = df.copy()
+    stages = [
+        (name, (lambda d: filter_intra_muros(d, boundary_mode, boundaries)) if stage is filter_intra_muros else stage, cols)
+        for name, stage, cols in CLEAN_STAGES
+    ]
+    if not with_report:
+        for _, stage, _ in stages:
+            df = stage(df)
+        return df
+
+    records = []
+    for name, stage, cols in stages:
+        before = df[[c for c in cols if c in df.columns]]
+        rows_in = len(df)
+
+        with _capture_log() as notes:
+            rss0 = rss_bytes()
+            t0 = time.perf_counter()
+            df = stage(df)
+            seconds = time.perf_counter() - t0
+            rss1 = rss_bytes()
+
+        records.append({
+            "stage": name,
+            "seconds": round(seconds, 4),
+            "rows_in": rows_in,
+            "rows_out": len(df),
+            "rows_modified": _rows_modified(before, df[[c for c in cols if c in df.columns]]),
+            "mem_delta_mb": round((rss1 - rss0) / 2**20, 1) if rss0 and rss1 else None,
+            "notes": " | ".join(notes),
+        })
+    return df, pd.DataFrame(records)
+
+
+def _rows_modified(before: pd.DataFrame, after: pd.DataFrame) -> int:
+    """
+    Rows (still present after the stage) where any written column changed value.
+    A new boolean column is a flag: only its False rows count.
+    """
+    if after.shape[1] == 0:
+        return 0
+    changed = pd.Series(False, index=after.index)
+    for col in after.columns:
+        a = after[col]
+        if col not in before.columns:
+            changed |= ~a if a.dtype == bool else a.notna()
+            continue
+        b = before[col].reindex(after.index)
+        changed |= (b.astype(object) != a.astype(object)) & ~(b.isna() & a.isna())
+    return int(changed.sum())
+
+
+@contextmanager
+def _capture_log():
+    """
+    Collect this module's log messages into a list while the block runs. The
+    logger is opened to INFO for the block only when the app or CLI did not
+    configure it lower, and restored afterwards.
+    """
+    messages = []
+    handler = logging.Handler(logging.INFO)
+    handler.emit = lambda record: messages.append(record.getMessage())
+    level = log.level
+    if log.getEffectiveLevel() > logging.INFO:
+        log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    try:
+        yield messages
+    finally:
+        log.removeHandler(handler)
+        log.setLevel(level)
 
-    
-    return df
 
 def pick_common_name_col(df):
     """Return the common-name column to use, preferring English then French; None if absent."""
@@ -834,3 +1001,19 @@ def pick_common_name_col(df):
     if "french_name" in df.columns:
         return "french_name"
     return None
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columns the app derives from the cleaned data, computed once with it:
+      - 'arr_num': arrondissement number extracted from the 'district' label
+        (replaced by the geometric one when TREES_BOUNDARIES is set, see
+        utils.districts.add_district_numbers)
+      - 'is_remarkable': boolean from 'remarkable' (OUI/NON only)
+    """
+    if "district" in df.columns:
+        df["arr_num"] = label_districts(df["district"])
+
+    remarkable = df["remarkable"] if "remarkable" in df.columns else pd.Series("NON", index=df.index)
+    df["is_remarkable"] = remarkable.astype(str).str.strip().str.upper().eq("OUI")
+    return df
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from utils.sketch import signed_buckets, signed_bucket_value
+
+# Columns with more distinct values than this (ids, coordinates, free text)
+# keep a bounded summary instead of their value counts
+MAX_EXACT = 1000
+# Summary: most frequent values kept, and hashes kept for the distinct estimate
+TOP_K = 20
+KMV_K = 4096
+# Relative accuracy of their quantiles: finer than the height/circumference
+# sketches, since coordinates only span a fraction of a percent of their value
+ACCURACY = 1e-4
+
+
+def build_profile(df: pd.DataFrame) -> dict:
+    """
+    Column statistics computed once per dataset (not per rerun).
+
+    Each column keeps its dtype and null count. Low-cardinality columns keep
+    their full value counts; the others keep a summary of bounded size (see
+    _summarize()). Everything shown to the user (distinct, top-k, quantiles,
+    mean) is derived from either, and both are mergeable: see update_profile().
+    """
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        p = {
+            "dtype": str(s.dtype),
+            "numeric": _is_numeric(s),
+            "n_null": int(s.isna().sum()),
+            "counts": s.value_counts(dropna=True, sort=False),
+        }
+        columns[col] = _summarize(p) if p["counts"].size > MAX_EXACT else p
+    return {"n_rows": len(df), "columns": columns}
+
+
+def update_profile(profile: dict, new_rows: pd.DataFrame) -> dict:
+    """Return the profile of (profiled rows + new_rows) without rescanning the old rows."""
+    delta = build_profile(new_rows)
+    columns = {}
+    for col in dict.fromkeys([*profile["columns"], *delta["columns"]]):
+        old = profile["columns"].get(col)
+        new = delta["columns"].get(col)
+        if old is None or new is None:
+            # Column missing on one side: its values there count as nulls
+            base = old or new
+            n_missing = delta["n_rows"] if old is not None else profile["n_rows"]
+            columns[col] = {**base, "n_null": base["n_null"] + n_missing}
+            continue
+        p = {
+            "dtype": old["dtype"] if old["dtype"] == new["dtype"] else "object",
+            "numeric": old["numeric"] and new["numeric"],
+            "n_null": old["n_null"] + new["n_null"],
+        }
+        if "counts" in old and "counts" in new:
+            p["counts"] = old["counts"].add(new["counts"], fill_value=0).astype("int64")
+            columns[col] = _summarize(p) if p["counts"].size > MAX_EXACT else p
+        else:
+            columns[col] = _merge_summaries(p, _summarize({**old, **p}), _summarize({**new, **p}))
+    return {"n_rows": profile["n_rows"] + delta["n_rows"], "columns": columns}
+
+
+def _summarize(p: dict) -> dict:
+    """
+    Bounded summary of a column's value counts (returned as is if already summarized):
+    'top' (the TOP_K most frequent values), 'hashes' (the KMV_K smallest
+    distinct value hashes: distinct count estimate) and, for numeric columns,
+    exact 'min'/'max'/'sum' and a 'sketch' (signed log-bucket key -> count,
+    quantiles within ACCURACY).
+    """
+    if "counts" not in p:
+        return p
+    counts = p["counts"]
+    out = {k: v for k, v in p.items() if k != "counts"}
+    out["top"] = counts.nlargest(TOP_K)
+    out["hashes"] = np.unique(pd.util.hash_array(counts.index.to_numpy()))[:KMV_K]
+    if p["numeric"]:
+        values = counts.index.to_numpy(dtype="float64", na_value=np.nan)
+        weights = counts.to_numpy(dtype="int64")
+        ok = np.isfinite(values)
+        values, weights = values[ok], weights[ok]
+        out["min"] = float(values.min()) if values.size else np.nan
+        out["max"] = float(values.max()) if values.size else np.nan
+        out["sum"] = float(np.dot(values, weights))
+        out["sketch"] = pd.Series(weights).groupby(signed_buckets(values, ACCURACY)).sum()
+    return out
+
+
+def _merge_summaries(p: dict, a: dict, b: dict) -> dict:
+    """
+    Summary of two summarized parts. Top values are approximate after a merge:
+    a value outside the top of one part misses its count there.
+    """
+    out = dict(p)
+    out["top"] = a["top"].add(b["top"], fill_value=0).astype("int64").nlargest(TOP_K)
+    out["hashes"] = np.union1d(a["hashes"], b["hashes"])[:KMV_K]
+    if p["numeric"]:
+        out["min"] = float(np.fmin(a["min"], b["min"]))
+        out["max"] = float(np.fmax(a["max"], b["max"]))
+        out["sum"] = a["sum"] + b["sum"]
+        out["sketch"] = a["sketch"].add(b["sketch"], fill_value=0).astype("int64")
+    return out
+
+
+def _distinct(hashes: np.ndarray) -> int:
+    """Distinct count from the KMV_K smallest hashes: exact below KMV_K, estimated above."""
+    if len(hashes) < KMV_K:
+        return len(hashes)
+    return int(round((KMV_K - 1) * 2.0 ** 64 / float(hashes[KMV_K - 1])))
+
+
+def profile_table(profile: dict, top_k: int = 3, quantiles=(0.25, 0.5, 0.75)) -> pd.DataFrame:
+    """
+    One row per column: type, null rate, distinct count, top-k values and numeric
+    quantiles. Summarized columns: distinct is an estimate, quantiles are within
+    ACCURACY (mean, min and max stay exact).
+    """
+    n_rows = profile["n_rows"]
+    rows = []
+    for col, p in profile["columns"].items():
+        exact = "counts" in p
+        top = p["counts"].nlargest(top_k) if exact else p["top"].head(top_k)
+        row = {
+            "column": col,
+            "dtype": p["dtype"],
+            "null_%": round(100 * p["n_null"] / n_rows, 2) if n_rows else 0.0,
+            "distinct": int(p["counts"].size) if exact else _distinct(p["hashes"]),
+            "top": ", ".join(f"{v} ({n:,})".replace(",", " ") for v, n in top.items()),
+        }
+        if p["numeric"] and exact and p["counts"].size:
+            row.update(_numeric_stats(p["counts"], quantiles))
+        elif p["numeric"] and not exact and p["sketch"].sum():
+            sketch = pd.Series(p["sketch"].to_numpy(), index=signed_bucket_value(p["sketch"].index, ACCURACY))
+            stats = _numeric_stats(sketch, quantiles)
+            stats.update(mean=p["sum"] / sketch.sum(), min=p["min"], max=p["max"])
+            row.update(stats)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _is_numeric(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def _numeric_stats(counts: pd.Series, quantiles) -> dict:
+    """Mean, min/max and quantiles straight from a value -> count table (inverted CDF)."""
+    counts = counts.sort_index()
+    values = counts.index.to_numpy(dtype="float64")
+    weights = counts.to_numpy(dtype="float64")
+    cum = np.cumsum(weights)
+    total = cum[-1]
+
+    stats = {"mean": float(np.dot(values, weights) / total), "min": values[0]}
+    for q in quantiles:
+        pos = min(np.searchsorted(cum, q * total, side="left"), len(values) - 1)
+        stats[f"p{round(q * 100)}"] = values[pos]
+    stats["max"] = values[-1]
+    return stats
+
+
+def render_profile(profile: dict):
+    """Quick-stats table of a profile (app on-demand block)."""
+    import streamlit as st
+
+    st.dataframe(profile_table(profile), hide_index=True)
+    limit = f"{MAX_EXACT:,}".replace(",", " ")
+    st.caption(
+        f"Columns with more than {limit} distinct values: distinct count estimated, "
+        f"quantiles within {ACCURACY:.2%}."
+    )
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+# ======================
+# RULE REGISTRY
+# ======================
+# A rule = a name, the columns it needs, and a vectorized check returning
+# True for rows that FAIL it. Rules are evaluated once per dataset into a
+# packed per-row bitset (bit i set = row fails RULES[i]); selections then
+# only need popcounts on their rows.
+
+RULES = []
+
+
+def rule(name: str, columns: list):
+    """Decorator registering a data-quality rule."""
+    def register(check):
+        RULES.append({"name": name, "columns": list(columns), "check": check})
+        return check
+    return register
+
+
+@rule("Latitude in Paris [48.80–48.92]", ["lat"])
+def _lat_in_paris(df):
+    return df["lat"].notna() & ~df["lat"].between(48.80, 48.92)
+
+
+@rule("Longitude in Paris [2.23–2.48]", ["lon"])
+def _lon_in_paris(df):
+    return df["lon"].notna() & ~df["lon"].between(2.23, 2.48)
+
+
+@rule("District number in [1–20]", ["arr_num"])
+def _district_number(df):
+    return df["arr_num"].notna() & ~df["arr_num"].between(1, 20)
+
+
+@rule("Inside Paris (city limits)", ["in_paris"])
+def _in_paris(df):
+    # flagged by the cleaning 'boundary' stage (utils.prep.filter_intra_muros)
+    return ~df["in_paris"].astype(bool)
+
+
+@rule("Height (m) in [0–60]", ["height_m"])
+def _height_bounds(df):
+    return df["height_m"].notna() & ~df["height_m"].between(0, 60)  # 0–60 m plausible
+
+
+@rule("Circumference (cm) in [0–2000]", ["circumference_cm"])
+def _circumference_bounds(df):
+    return df["circumference_cm"].notna() & ~df["circumference_cm"].between(0, 2000)
+
+
+ALLOWED_STAGES = {"Young tree", "Adult", "Mature", "Unknown"}
+
+
+@rule(f"Growth stage ∈ {sorted(ALLOWED_STAGES)}", ["growth_stage"])
+def _growth_stage(df):
+    return df["growth_stage"].notna() & ~df["growth_stage"].astype(str).isin(ALLOWED_STAGES)
+
+
+@rule("Ownership not empty", ["ownership"])
+def _ownership(df):
+    # derive allowed from current, but flag obvious blanks
+    return df["ownership"].isna() | df["ownership"].astype(str).str.strip().eq("")
+
+
+@rule("Tree ID unique", ["tree_id"])
+def _tree_id_unique(df):
+    # evaluated on the whole dataset: flags IDs repeated anywhere, not just in the selection
+    return df["tree_id"].notna() & df["tree_id"].duplicated(keep=False)
+
+
+# Rough maximum heights (m) reached by the most common genera in Paris.
+# Above that, the measurement (or the identification) is suspicious.
+GENUS_MAX_HEIGHT = {
+    "platanus": 50, "tilia": 40, "aesculus": 35, "acer": 35, "styphnolobium": 30,
+    "celtis": 30, "fraxinus": 40, "quercus": 45, "pinus": 40, "populus": 45,
+    "robinia": 30, "ulmus": 40, "gleditsia": 30, "betula": 30, "carpinus": 30,
+    "ginkgo": 35, "zelkova": 35, "alnus": 30, "liquidambar": 35, "catalpa": 20,
+    "prunus": 20, "pyrus": 20, "malus": 15, "magnolia": 25, "crataegus": 15,
+    "sorbus": 20, "koelreuteria": 15, "paulownia": 25, "ailanthus": 30, "taxus": 20,
+}
+
+
+@rule("Height plausible for genus", ["height_m", "genus"])
+def _height_for_genus(df):
+    max_h = df["genus"].astype(str).str.strip().str.casefold().map(GENUS_MAX_HEIGHT)
+    return max_h.notna() & df["height_m"].notna() & df["height_m"].gt(max_h)
+
+
+@rule("No near duplicate (same genus within 1 m)", ["lat", "lon", "genus"])
+def _near_duplicate(df):
+    from utils.spatial import near_duplicates  # scipy, only needed when rules are evaluated
+
+    pairs = near_duplicates(df, radius_m=1.0, match_col="genus")
+    return pd.Series(df.index.isin(pd.concat([pairs["a"], pairs["b"]])), index=df.index)
+
+
+# ======================
+# EVALUATION
+# ======================
+def evaluate_rules(df: pd.DataFrame) -> dict:
+    """
+    Evaluate every applicable rule once over the whole dataset.
+    Returns {"rules": [names], "bits": uint64 Series aligned on df.index}.
+    """
+    active = [r for r in RULES if set(r["columns"]).issubset(df.columns)]
+    if len(active) > 64:
+        raise ValueError("At most 64 rules fit in the per-row bitset.")
+
+    bits = np.zeros(len(df), dtype=np.uint64)
+    for i, r in enumerate(active):
+        failed = r["check"](df).fillna(False).to_numpy(dtype=bool)
+        bits |= failed.astype(np.uint64) << np.uint64(i)
+
+    return {"rules": [r["name"] for r in active], "bits": pd.Series(bits, index=df.index)}
+
+
+def selection_bits(quality: dict, index: pd.Index) -> np.ndarray:
+    """Bitset rows of a selection (rows are matched on the dataset index)."""
+    return quality["bits"].reindex(index, fill_value=0).to_numpy(dtype=np.uint64)
+
+
+def rule_failures(quality: dict, bits: np.ndarray) -> pd.DataFrame:
+    """Per-rule failure counts (popcounts) for the selected rows: one shift-and-mask pass per rule."""
+    bits = np.asarray(bits, dtype=np.uint64)
+    counts = np.array(
+        [np.count_nonzero((bits >> np.uint64(i)) & np.uint64(1)) for i in range(len(quality["rules"]))],
+        dtype=np.int64,
+    )
+    n = len(bits)
+    return pd.DataFrame({
+        "rule": quality["rules"],
+        "failures": counts,
+        "share_%": np.round(100 * counts / n, 2) if n else 0.0,
+    })
+
+
+def rule_mask(quality: dict, bits: np.ndarray, name: str) -> np.ndarray:
+    """Boolean mask of selected rows failing one rule."""
+    i = np.uint64(quality["rules"].index(name))
+    return ((bits >> i) & np.uint64(1)).astype(bool)
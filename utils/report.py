@@ -0,0 +1,215 @@
+"""
+Headless batch reports: the section figures and insights for every
+(district x facet), written as static HTML / JSON / CSV.
+
+    python -m utils.report -o reports/2026-10
+    python -m utils.report --data data/data.csv --workers 8 --owners "Street alignment" Garden
+
+Scopes are Paris as a whole plus each of the 20 arrondissements; facets are
+the app's distribution, diversity, location and growth-stage sections (same
+aggregation, figure and insight functions, no Streamlit session).
+The dataset is loaded and cleaned once, then the (scope, facet) tasks are
+spread over a process pool; workers inherit the cleaned frame at start-up.
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from utils.io import load_data
+from utils.prep import clean_trees, add_derived_columns
+from utils.districts import load_boundaries, add_district_numbers
+from utils.filters import apply_filters
+from sections.distribution import ordinal, district_counts, district_figure, district_insight
+from sections.diversity import species_labels, species_counts, top_species_figure, diversity_insight
+from sections.location import ownership_counts, ownership_figure, ownership_insight
+from sections.growth_stage import stage_counts, stage_figure, stage_insight
+
+# Columns the facets read: workers only get these
+REPORT_COLS = [
+    "arr_num", "lat", "lon", "is_remarkable", "ownership", "growth_stage",
+    "en_name", "french_name", "genus_species",
+]
+
+
+# ======================
+# FACETS
+# ======================
+# selection -> (table, figure or None, insight or None)
+def _distribution(sel):
+    counts = district_counts(sel)
+    return counts, (district_figure(counts) if not counts.empty else None), district_insight(counts)
+
+
+def _diversity(sel):
+    label_col, title_label, series = species_labels(sel)
+    if label_col is None:
+        return pd.DataFrame(), None, None
+    counts = species_counts(series)
+    table = counts.rename_axis(label_col).reset_index(name="count")
+    return table, top_species_figure(counts, label_col, title_label, len(sel)), diversity_insight(counts)
+
+
+def _location(sel):
+    counts = ownership_counts(sel)
+    return counts, (ownership_figure(counts, len(sel)) if not counts.empty else None), ownership_insight(counts)
+
+
+def _growth_stage(sel):
+    counts = stage_counts(sel)
+    return counts, stage_figure(counts), stage_insight(counts)
+
+
+FACETS = {
+    "distribution": _distribution,
+    "diversity": _diversity,
+    "location": _location,
+    "growth_stage": _growth_stage,
+}
+
+
+# ======================
+# WORKERS
+# ======================
+_DF = None
+_OUT = None
+_OWNERS = ()
+
+
+def _init_worker(df, out, owners):
+    global _DF, _OUT, _OWNERS
+    _DF, _OUT, _OWNERS = df, Path(out), tuple(owners)
+
+
+def _scope_label(scope):
+    return "Paris" if scope == "paris" else f"{ordinal(scope)} arrondissement"
+
+
+def _md_to_html(text: str) -> str:
+    return re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", html.escape(text))
+
+
+def _write_task(scope, facet) -> dict:
+    """Compute one (scope, facet) report and write its .html/.json/.csv files."""
+    t0 = time.perf_counter()
+    arrs = sorted(_DF["arr_num"].dropna().unique()) if scope == "paris" else [scope]
+    sel = apply_filters(_DF, arrs, selected_owners=_OWNERS)
+    table, fig, insight = FACETS[facet](sel)
+
+    folder = _OUT / str(scope)
+    folder.mkdir(parents=True, exist_ok=True)
+    stem = folder / facet
+    table.to_csv(stem.with_suffix(".csv"), index=False)
+
+    title = f"{facet.replace('_', ' ').capitalize()} — {_scope_label(scope)}"
+    stem.with_suffix(".json").write_text(json.dumps({
+        "scope": scope,
+        "facet": facet,
+        "n_trees": len(sel),
+        "insight": insight,
+        "table": table.to_dict(orient="records"),
+        "figure": json.loads(fig.to_json()) if fig is not None else None,
+    }, ensure_ascii=False, default=str))
+
+    chart = fig.to_html(full_html=False, include_plotlyjs=False) if fig is not None else "<p>No data.</p>"
+    n_trees = f"{len(sel):,}".replace(",", " ")
+    stem.with_suffix(".html").write_text(
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><script src='../plotly.min.js'></script></head><body>"
+        f"<h2>{html.escape(title)}</h2><p>{n_trees} trees</p>{chart}"
+        f"<p>{_md_to_html(insight) if insight else 'No insight for this selection.'}</p>"
+        "<p><a href='../index.html'>All reports</a></p></body></html>",
+        encoding="utf-8",
+    )
+    return {"scope": scope, "facet": facet, "n_trees": len(sel), "insight": insight,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def _run_task(task):
+    return _write_task(*task)
+
+
+# ======================
+# ENGINE
+# ======================
+def build_reports(df: pd.DataFrame, out, owners=(), workers=None, facets=None) -> list:
+    """
+    Write every (scope, facet) report of the cleaned + derived frame under `out`.
+    Returns one summary dict per report (also written to out/manifest.json).
+    """
+    import plotly.offline
+
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "plotly.min.js").write_text(plotly.offline.get_plotlyjs(), encoding="utf-8")
+
+    df = df[[c for c in REPORT_COLS if c in df.columns]]
+    scopes = ["paris"] + sorted(int(a) for a in df["arr_num"].dropna().unique())
+    tasks = [(s, f) for s in scopes for f in (facets or FACETS)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(df, out, owners)
+        results = [_run_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df, out, owners)) as pool:
+            results = list(pool.map(_run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    (out / "manifest.json").write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+    _write_index(out, scopes, facets or list(FACETS), results)
+    return results
+
+
+def _write_index(out: Path, scopes, facets, results):
+    by_key = {(r["scope"], r["facet"]): r for r in results}
+    head = "".join(f"<th>{f.replace('_', ' ')}</th>" for f in facets)
+    rows = []
+    for s in scopes:
+        cells = "".join(
+            f"<td><a href='{s}/{f}.html'>chart</a> · <a href='{s}/{f}.csv'>csv</a> · <a href='{s}/{f}.json'>json</a></td>"
+            for f in facets
+        )
+        n_trees = f"{by_key[(s, facets[0])]['n_trees']:,}".replace(",", " ")
+        rows.append(f"<tr><th>{html.escape(_scope_label(s))}</th><td>{n_trees}</td>{cells}</tr>")
+    (out / "index.html").write_text(
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Paris trees — reports</title></head><body>"
+        "<h1>🌳 Paris trees — reports</h1>"
+        f"<table border='1' cellpadding='4'><tr><th>Scope</th><th>Trees</th>{head}</tr>{''.join(rows)}</table>"
+        "</body></html>",
+        encoding="utf-8",
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write the section reports for every district x facet.")
+    ap.add_argument("-o", "--out", default="reports")
+    ap.add_argument("--data", default="data/data.csv", help="raw export (';' CSV or .xlsx)")
+    ap.add_argument("--owners", nargs="*", default=[], help="ownership types to keep (default: all)")
+    ap.add_argument("--facets", nargs="*", choices=list(FACETS), default=None)
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    boundaries = load_boundaries()
+    df = add_derived_columns(clean_trees(load_data(args.data), boundaries=boundaries).copy())
+    df, _ = add_district_numbers(df, boundaries)  # same districts as the app
+    t_prep = time.perf_counter() - t0
+
+    results = build_reports(df, args.out, owners=args.owners, workers=args.workers, facets=args.facets)
+    total = time.perf_counter() - t0
+    print(
+        f"{len(results)} reports written to {args.out}/ in {total:.1f} s "
+        f"(load + clean {t_prep:.1f} s, {args.workers or os.cpu_count()} worker(s))"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
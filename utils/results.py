@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+from utils.filters import apply_filters
+
+# ======================
+# FILTER STATE -> VIEW
+# ======================
+# Everything the page shows for one sidebar state (filtered rows, map sample,
+# section aggregates) is a "view". Views are cached per state, and the states
+# a user is most likely to pick next are computed ahead in the background.
+
+FilterState = namedtuple(
+    "FilterState",
+    ["arrs", "only_remarkable", "owners", "stages", "search_col", "picked", "max_points"],
+)
+
+
+def filter_state(selected_arrs, only_remarkable, selected_owners, selected_stages,
+                 search_col, picked_values, max_points) -> FilterState:
+    """Hashable, order-insensitive key of the sidebar selections."""
+    return FilterState(
+        tuple(sorted(selected_arrs)), bool(only_remarkable),
+        tuple(sorted(selected_owners)), tuple(sorted(selected_stages)),
+        search_col, tuple(sorted(picked_values)), int(max_points),
+    )
+
+
+MAP_COLS = [
+    "lat", "lon",
+    "district", "arr_num",
+    "french_name", "en_name",
+    "genus_species",
+    "height_m", "circumference_cm",
+    "ownership", "location_type",
+    "growth_stage", "remarkable", "is_remarkable",
+    "same_species_share", "nearest_other_m",
+]
+
+
+def compute_view(df: pd.DataFrame, state: FilterState, checkpoint=None) -> dict:
+    """
+    Filtered rows, prepared map sample and section aggregates for one state.
+    The view is cached and shared across sessions (ResultCache): read-only.
+    checkpoint: called between steps; the prefetcher raises there to stop a
+    view once its CPU budget is spent or a rerun cancelled it.
+    """
+    checkpoint = checkpoint or (lambda: None)
+    from utils.viz import map_frame
+    from sections.overview import key_figures
+    from sections.distribution import district_counts
+    from sections.diversity import species_labels, species_counts, biodiversity_tables
+    from sections.location import ownership_counts
+    from sections.growth_stage import stage_counts
+    from sections.similarity import district_similarity
+    from sections.contiguity import contiguity_tables
+
+    t0 = time.perf_counter()
+    sel = apply_filters(
+        df, state.arrs,
+        only_remarkable=state.only_remarkable,
+        selected_owners=state.owners,
+        selected_stages=state.stages,
+        search_col=state.search_col,
+        picked_values=state.picked,
+    )
+    view = {"df_filtered": sel, "map_frame": None, "key_figures": None, "district_counts": None,
+            "species": None, "indices": None, "similarity": None, "contiguity": None, "ownership_counts": None, "stage_counts": None}
+
+    if not sel.empty:
+        checkpoint()
+        cols = [c for c in MAP_COLS if c in sel.columns]
+        sample = sel[cols].sample(int(min(state.max_points, len(sel))), random_state=42)
+        view["map_frame"] = map_frame(sample)
+        view["key_figures"] = key_figures(sel)
+        checkpoint()
+        label_col, title_label, series = species_labels(sel, "Common name")
+        if label_col is not None:
+            view["species"] = (label_col, title_label, species_counts(series))
+        view["indices"] = biodiversity_tables(sel)
+        checkpoint()
+        view["similarity"] = district_similarity(sel)
+        checkpoint()
+        if "same_species_share" in sel.columns:
+            view["contiguity"] = contiguity_tables(sel)
+        if "ownership" in sel.columns:
+            view["ownership_counts"] = ownership_counts(sel)
+        if "growth_stage" in sel.columns:
+            view["stage_counts"] = stage_counts(sel)
+    if "arr_num" in sel.columns and not sel["arr_num"].dropna().empty:
+        view["district_counts"] = district_counts(sel)
+
+    view["seconds"] = time.perf_counter() - t0
+    view["bytes"] = int(sel.memory_usage(index=True).sum())
+    return view
+
+
+def likely_next_states(state: FilterState, view: dict, all_arrs, k: int = 3) -> list:
+    """
+    Neighbouring states a user most often picks next, most likely first:
+    toggling 'remarkable', picking one of the top species (or clearing the
+    search), narrowing to one of the largest districts (or back to all of them).
+    """
+    toggle = [state._replace(only_remarkable=not state.only_remarkable)]
+
+    if state.picked:
+        species = [state._replace(picked=())]
+    elif view.get("species") is not None and state.search_col == view["species"][0]:
+        species = [state._replace(picked=(name,)) for name in view["species"][2].index[:k]]
+    else:
+        species = []
+
+    all_arrs = tuple(sorted(all_arrs))
+    if state.arrs != all_arrs:
+        districts = [state._replace(arrs=all_arrs)]
+    elif view.get("district_counts") is not None:
+        districts = [state._replace(arrs=(int(a),)) for a in view["district_counts"]["arr"].head(k)]
+    else:
+        districts = []
+
+    # interleave: one of each kind before the second-best of any kind
+    ranked = toggle[:]
+    for i in range(max(len(species), len(districts))):
+        ranked += species[i:i + 1] + districts[i:i + 1]
+    return ranked
+
+
+# ======================
+# CACHE + PREFETCH
+# ======================
+class _PrefetchStopped(Exception):
+    """Raised at a compute_view checkpoint to stop a prefetch."""
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of views, bounded by entry count and memory, with a
+    low-priority background thread that fills it ahead of the user.
+    A state being computed (by a rerun or the prefetcher) is never computed twice:
+    other callers wait for it.
+    Views are shared by every session of the process and returned as is, not
+    copied: callers must treat them (df_filtered, map_frame, tables) as
+    read-only, and copy before any in-place change.
+    """
+
+    def __init__(self, max_entries: int = 16, max_mb: float = 256):
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 2**20
+        self.stats = {"hits": 0, "misses": 0, "prefetched": 0, "prefetch_hits": 0}
+        self._views = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._queue = []
+        self._wake = threading.Condition(self._lock)
+        self._worker = None
+
+    # --- lookups ---
+    def get_or_compute(self, key, compute):
+        """(view, hit): the cached view of `key`, or compute() it and cache it."""
+        while True:
+            with self._lock:
+                if key in self._views:
+                    self._views.move_to_end(key)
+                    view = self._views[key]
+                    self.stats["hits"] += 1
+                    if view.pop("_prefetched", False):
+                        self.stats["prefetch_hits"] += 1
+                    return view, True
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.stats["misses"] += 1
+                    break
+            pending.wait()  # computed elsewhere: pick it up from the cache
+
+        try:
+            view = compute()
+            self._store(key, view)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+        return view, False
+
+    def _store(self, key, view, prefetched: bool = False):
+        with self._lock:
+            if prefetched:
+                self.stats["prefetched"] += 1
+            self._views[key] = view
+            self._views.move_to_end(key)
+            while len(self._views) > 1 and (
+                len(self._views) > self.max_entries
+                or sum(v["bytes"] for v in self._views.values()) > self.max_bytes
+            ):
+                self._views.popitem(last=False)
+
+    # --- prefetch ---
+    def prefetch(self, df: pd.DataFrame, states, cpu_budget_s: float = 1.0):
+        """
+        Compute `states` (most likely first) in the background, until cpu_budget_s
+        of CPU is spent. The budget is checked between the steps of compute_view:
+        a view is dropped half-way once it runs out, so the overrun is at most one step.
+        """
+        with self._lock:
+            self._generation += 1
+            self._queue = [(self._generation, df, s, cpu_budget_s) for s in states]
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="view-prefetch", daemon=True)
+                self._worker.start()
+            self._wake.notify()
+
+    def cancel_prefetch(self):
+        """Drop queued prefetches (a rerun is starting: the user's work goes first)."""
+        with self._lock:
+            self._generation += 1
+            self._queue = []
+
+    def _run(self):
+        try:  # lowest scheduling priority for this thread only (Linux)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+        spent = {}
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._wake.wait()
+                generation, df, state, budget = self._queue.pop(0)
+                used = spent.get(generation, 0.0)
+                if used >= budget or state in self._views or state in self._inflight:
+                    continue
+                self._inflight[state] = threading.Event()
+            t0 = time.thread_time()
+
+            def checkpoint():
+                if used + time.thread_time() - t0 >= budget or generation != self._generation:
+                    raise _PrefetchStopped
+
+            try:
+                view = compute_view(df, state, checkpoint)
+                view["_prefetched"] = True
+                self._store(state, view, prefetched=True)
+            except _PrefetchStopped:
+                pass  # out of budget or cancelled by a rerun: the partial view is dropped
+            finally:
+                with self._lock:
+                    self._inflight.pop(state).set()
+            spent = {generation: used + time.thread_time() - t0}
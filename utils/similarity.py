@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.biodiversity import taxon_codes
+
+# ======================
+# ABUNDANCE MATRIX
+# ======================
+# Trees per (unit, species) as a sparse matrix: units are districts here, but
+# any integer coding of the rows works (grid cells, streets...), and only
+# non-zero (unit, species) pairs are stored, so fine grains stay small.
+
+
+def abundance_matrix(df: pd.DataFrame, units, level: str = "species"):
+    """
+    (X, unit_labels, taxon_labels): CSR matrix of tree counts, one row per unit.
+    units: a column name of df (labels are factorized, sorted) or an array of
+    non-negative integer codes, one per row of df (-1 = left out).
+    """
+    codes, taxa = taxon_codes(df, levels=(level,))[level]
+    if isinstance(units, str):
+        rows, labels = pd.factorize(df[units], sort=True)
+        labels = pd.Index(labels, name=units)
+    else:
+        rows = np.asarray(units, dtype=np.int64)
+        labels = pd.RangeIndex(int(rows.max()) + 1 if rows.size else 0)
+    keep = (rows >= 0) & (codes >= 0)
+    X = sparse.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=np.int32), (rows[keep], codes[keep])),
+        shape=(len(labels), len(taxa)),
+    )  # duplicates are summed: counts
+    return X, labels, taxa
+
+
+# ======================
+# DISSIMILARITY
+# ======================
+def _sum_of_minima(Xc: sparse.csc_matrix, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """sum_s min(X[i, s], q[s]) for every row i, q given by its non-zero (cols, values)."""
+    sub = Xc[:, cols]  # only the query's species can contribute
+    col_of = np.repeat(np.arange(len(cols)), np.diff(sub.indptr))
+    return np.bincount(sub.indices, weights=np.minimum(sub.data, values[col_of]), minlength=Xc.shape[0])
+
+
+def bray_curtis(X: sparse.spmatrix, rows=None) -> np.ndarray:
+    """
+    Bray-Curtis dissimilarity 1 - 2 * sum(min) / (total_i + total_j) between
+    `rows` (default: all) and every row of X: shape (len(rows), n).
+    One vectorized pass per query row, over the query's species only.
+    """
+    X = sparse.csr_matrix(X)
+    Xc = X.tocsc()
+    totals = np.asarray(X.sum(axis=1)).ravel().astype(np.float64)
+    rows = np.arange(X.shape[0]) if rows is None else np.atleast_1d(rows)
+    out = np.ones((len(rows), X.shape[0]))
+    for k, i in enumerate(rows):
+        start, end = X.indptr[i], X.indptr[i + 1]
+        shared = _sum_of_minima(Xc, X.indices[start:end], X.data[start:end])
+        den = totals[i] + totals
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[k] = np.where(den > 0, 1 - 2 * shared / den, np.nan)
+    return out
+
+
+def jaccard(X: sparse.spmatrix, rows=None) -> np.ndarray:
+    """Jaccard dissimilarity of species sets (presence / absence): 1 - |A ∩ B| / |A ∪ B|, one sparse product."""
+    B = (sparse.csr_matrix(X) > 0).astype(np.int32)
+    rows = np.arange(B.shape[0]) if rows is None else np.atleast_1d(rows)
+    inter = (B[rows] @ B.T).toarray().astype(np.float64)
+    richness = np.asarray(B.sum(axis=1)).ravel()
+    union = richness[rows][:, None] + richness[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, 1 - inter / union, np.nan)
+
+
+METRICS = {"Bray-Curtis": bray_curtis, "Jaccard": jaccard}
+
+
+def cluster_order(D: np.ndarray) -> np.ndarray:
+    """Row order that puts similar units next to each other (average-linkage dendrogram leaves)."""
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    from scipy.spatial.distance import squareform
+
+    if len(D) < 3:
+        return np.arange(len(D))
+    D = np.nan_to_num((D + D.T) / 2, nan=1.0)
+    np.fill_diagonal(D, 0.0)
+    return leaves_list(linkage(squareform(D, checks=False), method="average", optimal_ordering=True))
+
+
+def most_similar(D: np.ndarray, labels, k: int = 1) -> pd.DataFrame:
+    """For each unit, its k nearest other units by dissimilarity D ('unit', 'rank', 'match', 'dissimilarity')."""
+    D = np.where(np.eye(len(D), dtype=bool), np.inf, np.nan_to_num(D, nan=np.inf))
+    k = min(k, max(len(D) - 1, 0))
+    nearest = np.argsort(D, axis=1, kind="stable")[:, :k]
+    labels = np.asarray(labels)
+    return pd.DataFrame({
+        "unit": np.repeat(labels, k),
+        "rank": np.tile(np.arange(1, k + 1), len(D)),
+        "match": labels[nearest.ravel()],
+        "dissimilarity": np.take_along_axis(D, nearest, axis=1).ravel(),
+    })
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# ======================
+# MERGEABLE QUANTILE SKETCHES
+# ======================
+# Height and circumference quantiles of any sidebar selection, without
+# touching the rows. Values are bucketed on a logarithmic grid (DDSketch):
+# bucket k holds values in (MIN_VALUE * GAMMA^(k-1), MIN_VALUE * GAMMA^k], so
+# any quantile read from the bucket counts is within RELATIVE_ACCURACY of the
+# exact one. Counts are kept per cell (one cell = one combination of the
+# filter dimensions); a selection is a set of cells, and merging sketches is
+# adding their bucket counts.
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_VALUE = 0.5
+MAX_VALUE = 5000.0
+N_BUCKETS = int(np.ceil(np.log(MAX_VALUE / MIN_VALUE) / np.log(GAMMA))) + 1
+# Offset of the unbounded keys (signed_buckets), larger than any float64 exponent on the grid
+KEY_BIAS = 1 << 40
+
+# Filter dimensions of a cell (what the sidebar can select on)
+CELL_DIMS = ["arr_num", "ownership", "growth_stage", "is_remarkable", "en_name", "genus_species"]
+
+# Sketched columns and the values kept: 0 means "not measured" in the Open Data
+# export, and values past the data-quality bounds are entry errors
+SKETCH_COLS = {"height_m": (0, 60), "circumference_cm": (0, 2000)}
+
+
+def bucket_of(values: np.ndarray) -> np.ndarray:
+    """Bucket index of each value (values below MIN_VALUE share bucket 0)."""
+    v = np.clip(np.asarray(values, dtype=np.float64), MIN_VALUE, MAX_VALUE)
+    return np.ceil(np.log(v / MIN_VALUE) / np.log(GAMMA) - 1e-9).astype(np.int32)
+
+
+def bucket_value(buckets) -> np.ndarray:
+    """Representative value of buckets (relative error <= RELATIVE_ACCURACY within the bucket)."""
+    k = np.asarray(buckets, dtype=np.float64)
+    return np.where(k == 0, MIN_VALUE, MIN_VALUE * 2 * GAMMA ** k / (GAMMA + 1))
+
+
+# --- build ---
+def build_sketches(df: pd.DataFrame) -> dict:
+    """
+    Per-cell sketches of SKETCH_COLS, for the geolocated rows (the rows the app filters).
+    {'cells': DataFrame of CELL_DIMS (one row per cell, strings stripped),
+     'columns': {col: {'cell', 'bucket', 'count'} sparse arrays, 'excluded': n}}
+    """
+    dims = [c for c in CELL_DIMS if c in df.columns]
+    geo = df.dropna(subset=["lat", "lon"]) if {"lat", "lon"} <= set(df.columns) else df
+    keys = pd.DataFrame({
+        c: (geo[c].astype(str).str.strip() if c in ("ownership", "growth_stage", "en_name", "genus_species") else geo[c])
+        for c in dims
+    })
+    grouped = keys.groupby(dims, dropna=False, observed=True, sort=True)
+    cell = grouped.ngroup().to_numpy()
+    cells = grouped.size().reset_index(name="n_trees")
+
+    columns = {}
+    for col, (low, high) in SKETCH_COLS.items():
+        if col not in geo.columns:
+            continue
+        v = pd.to_numeric(geo[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        kept = (v > low) & (v <= high)
+        flat = cell[kept].astype(np.int64) * N_BUCKETS + bucket_of(v[kept])
+        uniq, counts = np.unique(flat, return_counts=True)
+        columns[col] = {
+            "cell": (uniq // N_BUCKETS).astype(np.int32),
+            "bucket": (uniq % N_BUCKETS).astype(np.int16),
+            "count": counts.astype(np.int32),
+            "excluded": int((~kept).sum()),
+        }
+    return {"cells": cells, "columns": columns}
+
+
+# --- query ---
+def select_cells(sketches: dict, state) -> np.ndarray:
+    """Boolean mask of the cells a FilterState selects (same rules as apply_filters)."""
+    cells = sketches["cells"]
+    mask = cells["arr_num"].isin(state.arrs).to_numpy(dtype=bool, na_value=False)
+    if state.only_remarkable and "is_remarkable" in cells.columns:
+        mask &= cells["is_remarkable"].to_numpy(dtype=bool)
+    for col, picked in (("ownership", state.owners), ("growth_stage", state.stages), (state.search_col, state.picked)):
+        if picked and col in cells.columns:
+            mask &= cells[col].isin(picked).to_numpy()
+    return mask
+
+
+def merged_counts(sketches: dict, col: str, mask: np.ndarray, by: str = None):
+    """
+    Bucket counts of the selected cells, merged: a (N_BUCKETS,) vector, or with
+    `by` (a cell dimension) a (groups, N_BUCKETS) matrix and the group labels.
+    """
+    sk = sketches["columns"][col]
+    keep = mask[sk["cell"]]
+    if by is None:
+        return np.bincount(sk["bucket"][keep], weights=sk["count"][keep], minlength=N_BUCKETS)
+    codes, groups = pd.factorize(sketches["cells"][by], sort=True)
+    row = codes[sk["cell"]].astype(np.int64)
+    keep &= row >= 0  # cells with a missing `by` value
+    flat = row[keep] * N_BUCKETS + sk["bucket"][keep]
+    counts = np.bincount(flat, weights=sk["count"][keep], minlength=len(groups) * N_BUCKETS)
+    return counts.reshape(len(groups), N_BUCKETS), pd.Index(groups, name=by)
+
+
+def quantiles(counts: np.ndarray, qs=(0.5, 0.9)) -> np.ndarray:
+    """Quantiles of merged bucket counts, one row per sketch: shape (rows, len(qs)); NaN when empty."""
+    counts = np.atleast_2d(counts)
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1:]
+    out = np.full((counts.shape[0], len(qs)), np.nan)
+    for j, q in enumerate(qs):
+        # first bucket whose cumulative count reaches q of the total
+        pos = (cum < q * total - 1e-9).sum(axis=1)
+        out[:, j] = bucket_value(np.minimum(pos, N_BUCKETS - 1))
+    out[total[:, 0] == 0] = np.nan
+    return out
+
+
+# --- unbounded values (column profiles) ---
+def signed_buckets(values, accuracy: float = RELATIVE_ACCURACY) -> np.ndarray:
+    """
+    Bucket key of any finite values on a logarithmic grid without MIN_VALUE /
+    MAX_VALUE bounds (column profiles: ids, coordinates...): 0 for 0, else
+    sign * (k + KEY_BIAS) for |v| in (gamma^(k-1), gamma^k], gamma from
+    `accuracy` as GAMMA from RELATIVE_ACCURACY. Keys sort like the values.
+    """
+    gamma = (1 + accuracy) / (1 - accuracy)
+    v = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        k = np.ceil(np.log(np.abs(v)) / np.log(gamma) - 1e-9)
+    k = np.clip(np.nan_to_num(k, neginf=1 - KEY_BIAS), 1 - KEY_BIAS, KEY_BIAS).astype(np.int64)
+    return np.sign(v).astype(np.int64) * (k + KEY_BIAS)
+
+
+def signed_bucket_value(keys, accuracy: float = RELATIVE_ACCURACY) -> np.ndarray:
+    """Representative value of signed_buckets() keys (relative error <= accuracy)."""
+    gamma = (1 + accuracy) / (1 - accuracy)
+    keys = np.asarray(keys, dtype=np.int64)
+    k = (np.abs(keys) - KEY_BIAS).astype(np.float64)
+    return np.where(keys == 0, 0.0, np.sign(keys) * 2 * gamma ** k / (gamma + 1))
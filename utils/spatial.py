@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+# Local equirectangular projection around Paris: good to a few cm over the city
+PARIS_LAT0 = 48.8566
+PARIS_LON0 = 2.3522
+M_PER_DEG_LAT = 110_540.0
+M_PER_DEG_LON = 111_320.0 * np.cos(np.radians(PARIS_LAT0))
+
+
+def to_metres(lat, lon) -> np.ndarray:
+    """(n, 2) array of x/y metres east/north of the Paris reference point."""
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    return np.column_stack([(lon - PARIS_LON0) * M_PER_DEG_LON, (lat - PARIS_LAT0) * M_PER_DEG_LAT])
+
+
+def to_degrees(x, y) -> np.ndarray:
+    """Inverse of to_metres(): (n, 2) array of lat/lon."""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    return np.column_stack([y / M_PER_DEG_LAT + PARIS_LAT0, x / M_PER_DEG_LON + PARIS_LON0])
+
+
+# ======================
+# GRID CELLS
+# ======================
+def grid_cells(lat, lon, cell_m: float = 250.0):
+    """
+    Square cells of cell_m metres: (codes, ix, iy). codes[i] is the cell of
+    point i (0..n_cells-1, -1 when not geolocated); ix/iy are the column/row
+    of each cell on the grid anchored at the Paris reference point.
+    """
+    xy = to_metres(lat, lon)
+    ok = np.isfinite(xy).all(axis=1)
+    ij = np.floor(xy[ok] / cell_m).astype(np.int64)
+    key = (ij[:, 0] << 32) + (ij[:, 1] & 0xFFFFFFFF)  # one int64 per (ix, iy)
+    uniq, inverse = np.unique(key, return_inverse=True)
+    codes = np.full(len(xy), -1, dtype=np.int64)
+    codes[ok] = inverse
+    ix = uniq >> 32
+    iy = ((uniq & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000  # back to signed
+    return codes, ix, iy
+
+
+def cell_geojson(ix, iy, cell_m: float = 250.0) -> dict:
+    """GeoJSON squares of grid cells, feature id = position in ix/iy."""
+    x0 = np.asarray(ix, dtype="float64") * cell_m
+    y0 = np.asarray(iy, dtype="float64") * cell_m
+    corners = [to_degrees(x0 + dx, y0 + dy) for dx, dy in ((0, 0), (cell_m, 0), (cell_m, cell_m), (0, cell_m), (0, 0))]
+    ring = np.stack(corners, axis=1)[:, :, ::-1].round(5)  # (cells, 5, lon/lat), ~1 m
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": i, "geometry": {"type": "Polygon", "coordinates": [r.tolist()]}}
+            for i, r in enumerate(ring)
+        ],
+    }
+
+
+# ======================
+# SAME-SPECIES NEIGHBOURHOODS
+# ======================
+# Share of same-species trees among each tree's k nearest neighbours at or above
+# which it is flagged as part of a same-species cluster (row, block)
+CLUSTER_SHARE = 0.75
+
+
+def species_neighbours(xy: np.ndarray, codes: np.ndarray, k: int = 8, max_k: int = 512):
+    """
+    For every point: share of its k nearest neighbours with the same code, and
+    distance (m) to the nearest point with another code (NaN if none within
+    max_k neighbours). One KD-tree; points whose k neighbours all share their
+    code are re-queried with twice as many neighbours, and so on up to max_k.
+    Negative codes (unknown species) are left out: an unidentified neighbour
+    counts neither in the share nor as another species, and unidentified
+    points get NaN for both.
+    """
+    n = len(xy)
+    tree = cKDTree(xy)
+    kk = min(k + 1, n)
+    dist, idx = tree.query(xy, k=kk)
+    dist, idx = dist.reshape(n, -1), idx.reshape(n, -1)
+    # drop the point itself by index: with duplicate coordinates it is not
+    # always the first neighbour (or may not be among them at all)
+    keep = np.argsort(idx == np.arange(n)[:, None], axis=1, kind="stable")[:, :kk - 1]
+    dist, idx = np.take_along_axis(dist, keep, axis=1), np.take_along_axis(idx, keep, axis=1)
+
+    unknown = codes < 0
+    known = ~unknown[idx]
+    same = known & (codes[idx] == codes[:, None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = same.sum(axis=1) / known.sum(axis=1) if kk > 1 else np.full(n, np.nan)
+
+    nearest_other = np.full(n, np.nan)
+    differ = known & ~same
+    found = differ.any(axis=1)
+    nearest_other[found] = dist[found, differ[found].argmax(axis=1)]
+
+    todo = np.flatnonzero(~found & ~unknown)
+    while todo.size and kk < min(max_k, n):
+        kk = min(kk * 2, max_k, n)
+        d2, i2 = tree.query(xy[todo], k=kk)
+        differ = (codes[i2] >= 0) & (codes[i2] != codes[todo, None])  # never the point itself
+        hit = differ.any(axis=1)
+        nearest_other[todo[hit]] = d2[hit, differ[hit].argmax(axis=1)]
+        todo = todo[~hit]
+
+    share[unknown] = np.nan
+    nearest_other[unknown] = np.nan
+    return share, nearest_other
+
+
+def add_contiguity_columns(df: pd.DataFrame, k: int = 8) -> pd.DataFrame:
+    """
+    'same_species_share' (of the k nearest trees) and 'nearest_other_m' (distance
+    to the nearest tree of another species) for every geolocated tree.
+    Neighbours are searched in the whole dataset, so a filter never hides them.
+    """
+    from utils.biodiversity import taxon_codes
+
+    df["same_species_share"] = np.nan
+    df["nearest_other_m"] = np.nan
+    if "genus_species" not in df.columns or not {"lat", "lon"} <= set(df.columns):
+        return df
+    geo = df[["lat", "lon"]].notna().all(axis=1).to_numpy()
+    rows = np.flatnonzero(geo)
+    if rows.size < 2:
+        return df
+    codes = taxon_codes(df.iloc[rows], levels=("species",))["species"][0]
+    xy = to_metres(df["lat"].to_numpy()[rows], df["lon"].to_numpy()[rows])
+    share, other = species_neighbours(xy, codes, k=k)
+    df.iloc[rows, df.columns.get_loc("same_species_share")] = share.round(3)
+    df.iloc[rows, df.columns.get_loc("nearest_other_m")] = other.round(1)
+    return df
+
+
+def near_duplicates(df: pd.DataFrame, radius_m: float = 1.0, match_col: str = "genus") -> pd.DataFrame:
+    """
+    Pairs of trees closer than `radius_m` metres sharing the same `match_col`
+    (case-insensitive; blank values never match).
+
+    Uses a KD-tree range query, so cost grows with the number of close pairs
+    rather than n². Returns one row per pair: index labels 'a', 'b' and 'distance_m'.
+    """
+    empty = pd.DataFrame({"a": df.index[:0], "b": df.index[:0], "distance_m": np.empty(0)})
+    if df.empty or not {"lat", "lon"}.issubset(df.columns):
+        return empty
+
+    geo = df[["lat", "lon"]].notna().all(axis=1).to_numpy()
+    rows = np.flatnonzero(geo)
+    xy = to_metres(df["lat"].to_numpy()[rows], df["lon"].to_numpy()[rows])
+
+    pairs = cKDTree(xy).query_pairs(r=radius_m, output_type="ndarray")
+    if not len(pairs):
+        return empty
+
+    if match_col in df.columns:
+        key = df[match_col].astype(str).str.strip().str.casefold().to_numpy()[rows]
+        blank = np.isin(key, ["", "nan", "none", "non spécifié"])
+        same = (key[pairs[:, 0]] == key[pairs[:, 1]]) & ~blank[pairs[:, 0]]
+        pairs = pairs[same]
+
+    dist = np.hypot(*(xy[pairs[:, 0]] - xy[pairs[:, 1]]).T)
+    return pd.DataFrame({
+        "a": df.index[rows[pairs[:, 0]]],
+        "b": df.index[rows[pairs[:, 1]]],
+        "distance_m": dist.round(2),
+    })
+
+
+def duplicate_clusters(pairs: pd.DataFrame) -> pd.Series:
+    """
+    Group near-duplicate pairs into clusters (connected components:
+    A~B and B~C put A, B and C together). Returns a cluster id per index label.
+    """
+    if pairs.empty:
+        return pd.Series(np.empty(0, dtype="int64"), name="cluster")
+
+    labels, codes = np.unique(np.concatenate([pairs["a"], pairs["b"]]), return_inverse=True)
+    n_pairs = len(pairs)
+    graph = coo_matrix(
+        (np.ones(n_pairs), (codes[:n_pairs], codes[n_pairs:])),
+        shape=(len(labels), len(labels)),
+    )
+    _, cluster = connected_components(graph, directed=False)
+    return pd.Series(cluster, index=labels, name="cluster")
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.biodiversity import taxon_codes, sparse_metrics
+
+# ======================
+# STREET INDEX
+# ======================
+# The 'address' column ('LIEU / ADRESSE') is turned into a street key once per
+# dataset: distinct addresses are normalized with vectorized string ops, then
+# every tree gets the integer code of its street. Per-street aggregates and the
+# rows of each street (grouped: order + offsets) are computed
+# in the same pass, so the sidebar lookup is a slice, not a scan.
+
+# Abbreviations found in the address field, expanded in the street key only
+# where they cannot be part of a name ('RUE DU PAS DE LA MULE', 'RUE DE L AVE MARIA'):
+# street types at the start of the key, Saint/Sainte and titles before a name
+STREET_TYPES = {
+    "AV": "AVENUE", "AVE": "AVENUE", "BD": "BOULEVARD", "BLD": "BOULEVARD", "BLVD": "BOULEVARD",
+    "PL": "PLACE", "SQ": "SQUARE", "PTE": "PORTE", "IMP": "IMPASSE", "PAS": "PASSAGE", "CHE": "CHEMIN",
+}
+SAINT_ABBREVIATIONS = {"ST": "SAINT", "STE": "SAINTE"}
+# after 'DU' only: 'AV DU GAL LECLERC', 'RUE DU DR ROUX'
+TITLE_ABBREVIATIONS = {
+    "GAL": "GENERAL", "MAL": "MARECHAL", "PDT": "PRESIDENT", "PROF": "PROFESSEUR", "DR": "DOCTEUR",
+}
+
+# Streets listed in the sidebar search
+MAX_MATCHES = 25
+
+
+def normalize_streets(addresses: pd.Index, expand: bool = True) -> pd.Index:
+    """
+    Street key of each address (vectorized on an Index of distinct values):
+    upper case without accents, the part before ' / ' (crossing street or
+    cemetery division), no house number, abbreviations expanded where
+    unambiguous (see STREET_TYPES) unless expand=False. '' = no street.
+    """
+    s = (
+        addresses.astype(str).str.upper()
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.split("/").str[0]
+        .str.replace(r"[-'’.,]", " ", regex=True)
+        .str.replace(r"^\s*\d+\s*(?:BIS|TER)?\s+", "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    if expand:
+        for table, pattern in (
+            (STREET_TYPES, r"^({})(?= \w)"),
+            (SAINT_ABBREVIATIONS, r"\b({})(?= \w)"),
+            (TITLE_ABBREVIATIONS, r"(?<=\bDU )({})(?= \w)"),
+        ):
+            words = "|".join(sorted(table, key=len, reverse=True))
+            s = s.str.replace(pattern.format(words), lambda m, t=table: t[m.group(1)], regex=True)
+    return s.where(~s.isin(["NAN", "NONE", "<NA>"]), "").fillna("")
+
+
+def street_codes(df: pd.DataFrame):
+    """(int32 code per row, street labels sorted); -1 = no address."""
+    if "address" not in df.columns:
+        return np.full(len(df), -1, dtype=np.int32), pd.Index([], dtype=str)
+    raw_codes, raw = pd.factorize(df["address"], sort=False)
+    keys = normalize_streets(pd.Index(raw))
+    remap, labels = pd.factorize(keys, sort=True)
+    labels = pd.Index(labels)
+    blank = np.flatnonzero(labels == "")
+    if blank.size:  # '' sorts first: drop it and shift the other codes
+        remap = np.where(remap == blank[0], -1, remap - (remap > blank[0]))
+        labels = labels.delete(blank[0])
+    codes = np.append(remap, -1)[raw_codes]  # raw code -1 (NaN) -> last slot (-1)
+    return codes.astype(np.int32), labels
+
+
+def build_street_index(df: pd.DataFrame) -> dict:
+    """
+    Street index of a cleaned dataset:
+    {'labels': street keys, 'order'/'offsets': row positions grouped by street
+     (street i = order[offsets[i]:offsets[i+1]]),
+     'streets': one row per street: trees, districts, species, shannon,
+     top_species, top_share, one share column per growth stage}
+    """
+    codes, labels = street_codes(df)
+    n = len(labels)
+    known = codes >= 0
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    counts = np.bincount(codes[known], minlength=n)
+    offsets = np.concatenate([[int((~known).sum())], (~known).sum() + np.cumsum(counts)]).astype(np.int64)
+
+    streets = pd.DataFrame({"trees": counts}, index=pd.Index(labels, name="street"))
+
+    # districts crossed by each street, most trees first
+    if "arr_num" in df.columns:
+        arr = df["arr_num"].to_numpy(dtype="float64", na_value=np.nan)
+        ok = known & ~np.isnan(arr)
+        by_arr = (
+            pd.DataFrame({"street": codes[ok], "arr": arr[ok].astype(int)})
+            .value_counts().reset_index().sort_values(["street", "count"], ascending=[True, False])
+        )
+        joined = by_arr.groupby("street")["arr"].agg(lambda a: ", ".join(f"{x}e" for x in a))
+        streets["districts"] = joined.reindex(range(n)).fillna("").to_numpy()
+
+    # species mix: sparse street x species counts, metrics from the non-zeros
+    species_codes, species = taxon_codes(df, levels=("species",)).get("species", (np.full(len(df), -1), pd.Index([])))
+    keep = known & (species_codes >= 0)
+    X = sparse.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=np.int32), (codes[keep], species_codes[keep])),
+        shape=(n, len(species)),
+    )
+    metrics = sparse_metrics(X)
+    streets["species"] = metrics["richness"]
+    streets["shannon"] = metrics["shannon"].round(3)
+    top = np.full(n, -1)
+    filled = np.flatnonzero(np.diff(X.indptr))
+    if filled.size:
+        # column of the largest count in each non-empty row
+        row = np.repeat(np.arange(n), np.diff(X.indptr))
+        best = pd.Series(X.data).groupby(row).idxmax().to_numpy()
+        top[filled] = X.indices[best]
+    streets["top_species"] = np.append(np.asarray(species, dtype=object), None)[top]  # -1 -> None
+    streets["top_share"] = metrics["top_share"].round(4)
+
+    # age structure: share of each growth stage among the street's staged trees
+    if "growth_stage" in df.columns:
+        stage_codes, stages = pd.factorize(df["growth_stage"], sort=True)
+        ok = known & (stage_codes >= 0)
+        flat = codes[ok].astype(np.int64) * len(stages) + stage_codes[ok]
+        table = np.bincount(flat, minlength=n * len(stages)).reshape(n, len(stages))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = table / table.sum(axis=1, keepdims=True)
+        for j, stage in enumerate(stages):
+            streets[str(stage)] = shares[:, j].round(4)
+
+    return {"labels": labels, "order": order, "offsets": offsets, "streets": streets}
+
+
+def street_rows(index: dict, street: str) -> np.ndarray:
+    """Row positions of the trees on `street` (a key of index['labels']); empty if unknown."""
+    i = index["labels"].get_indexer([street])[0]
+    if i < 0:
+        return np.empty(0, dtype=np.int32)
+    return index["order"][index["offsets"][i]:index["offsets"][i + 1]]
+
+
+def search_streets(index: dict, query: str, limit: int = MAX_MATCHES) -> list:
+    """
+    Street keys matching a free-text query (normalized like the addresses):
+    names with a word starting with it first, then the other matches, most trees first.
+    """
+    # a fragment ('PAS DE LA') may start with a street type: try it as typed too
+    queries = {normalize_streets(pd.Index([query]), expand=e)[0] for e in (True, False)} - {""}
+    if not queries:
+        return []
+    streets = index["streets"]
+    labels = streets.index
+    hit = np.zeros(len(labels), dtype=bool)
+    word = np.zeros(len(labels), dtype=bool)
+    for q in queries:
+        hit |= labels.str.contains(q, regex=False)
+        word |= labels.str.startswith(q) | labels.str.contains(" " + q, regex=False)
+    if not hit.any():
+        return []
+    found = streets.loc[hit, ["trees"]].assign(_word=word[hit])
+    found = found.sort_values(["_word", "trees"], ascending=False)
+    return found.index[:limit].tolist()
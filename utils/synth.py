@@ -0,0 +1,253 @@
+"""
+Synthetic tree inventory in the raw schema of the City of Paris export.
+
+    python -m utils.synth --scale 2.5 --seed 7 -o data/synthetic.csv
+    python -m utils.synth --rows 5000000 --years 3 -o data/synthetic_5m.csv
+
+Scale 1 = the size of the real export (214 837 rows). Distributions follow the
+real data closely enough to exercise clean_trees, the filters and the sections:
+district and genus shares, suburbs/woods labels, correlated stage / circumference
+/ height, plus the malformed values found in the export (blank or unparsable
+geo points, 0 and absurd measurements, missing genera, "Non spécifié").
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+REAL_EXPORT_ROWS = 214_837
+
+RAW_COLUMNS = [
+    "IDBASE", "TYPE EMPLACEMENT", "DOMANIALITE", "ARRONDISSEMENT",
+    "COMPLEMENT ADRESSE", "NUMERO", "LIEU / ADRESSE", "IDEMPLACEMENT",
+    "LIBELLE FRANCAIS", "GENRE", "ESPECE", "VARIETE OU CULTIVAR",
+    "CIRCONFERENCE (cm)", "HAUTEUR (m)", "STADE DE DEVELOPPEMENT",
+    "REMARQUABLE", "geo_point_2d",
+]
+
+# label, approximate centre (lat, lon), spread (deg), relative weight
+DISTRICTS = [
+    ("PARIS 1ER ARRDT", 48.8625, 2.3364, 0.004, 1.6),
+    ("PARIS 2E ARRDT", 48.8683, 2.3428, 0.003, 0.5),
+    ("PARIS 3E ARRDT", 48.8630, 2.3600, 0.003, 1.0),
+    ("PARIS 4E ARRDT", 48.8543, 2.3576, 0.004, 2.0),
+    ("PARIS 5E ARRDT", 48.8445, 2.3507, 0.005, 3.0),
+    ("PARIS 6E ARRDT", 48.8491, 2.3328, 0.004, 2.0),
+    ("PARIS 7E ARRDT", 48.8562, 2.3121, 0.006, 5.0),
+    ("PARIS 8E ARRDT", 48.8727, 2.3125, 0.006, 4.5),
+    ("PARIS 9E ARRDT", 48.8770, 2.3375, 0.004, 1.5),
+    ("PARIS 10E ARRDT", 48.8761, 2.3607, 0.005, 3.0),
+    ("PARIS 11E ARRDT", 48.8591, 2.3800, 0.006, 5.0),
+    ("PARIS 12E ARRDT", 48.8400, 2.3880, 0.007, 12.0),
+    ("PARIS 13E ARRDT", 48.8283, 2.3623, 0.008, 14.0),
+    ("PARIS 14E ARRDT", 48.8292, 2.3266, 0.007, 9.0),
+    ("PARIS 15E ARRDT", 48.8401, 2.2931, 0.008, 11.0),
+    ("PARIS 16E ARRDT", 48.8604, 2.2750, 0.009, 11.0),
+    ("PARIS 17E ARRDT", 48.8873, 2.3067, 0.007, 9.0),
+    ("PARIS 18E ARRDT", 48.8925, 2.3484, 0.007, 9.0),
+    ("PARIS 19E ARRDT", 48.8871, 2.3848, 0.008, 13.0),
+    ("PARIS 20E ARRDT", 48.8634, 2.4011, 0.007, 13.0),
+    ("BOIS DE BOULOGNE", 48.8625, 2.2491, 0.010, 15.0),
+    ("BOIS DE VINCENNES", 48.8330, 2.4330, 0.009, 12.0),
+    ("HAUTS-DE-SEINE", 48.7780, 2.2900, 0.020, 30.0),
+    ("SEINE-SAINT-DENIS", 48.9100, 2.4500, 0.015, 10.0),
+    ("VAL-DE-MARNE", 48.7900, 2.4500, 0.015, 14.0),
+]
+
+# genre, espèce, libellé français, relative weight
+TAXA = [
+    ("Platanus", "x hispanica", "Platane", 16.0),
+    ("Platanus", "orientalis", "Platane", 1.0),
+    ("Tilia", "tomentosa", "Tilleul", 5.0),
+    ("Tilia", "x euchlora", "Tilleul", 3.0),
+    ("Tilia", "cordata", "Tilleul", 2.5),
+    ("Aesculus", "hippocastanum", "Marronnier", 7.0),
+    ("Aesculus", "x carnea", "Marronnier", 1.5),
+    ("Acer", "platanoides", "Erable", 3.5),
+    ("Acer", "pseudoplatanus", "Erable", 2.0),
+    ("Acer", "campestre", "Erable", 1.0),
+    ("Acer", "", "Erable", 0.4),
+    ("Styphnolobium", "japonicum", "Sophora", 5.0),
+    ("Celtis", "australis", "Micocoulier", 4.0),
+    ("Prunus", "serrulata", "Cerisier à fleurs", 2.0),
+    ("Prunus", "avium", "Merisier", 1.5),
+    ("Prunus", "cerasifera", "Prunier à fleurs", 1.0),
+    ("Prunus", "", "", 0.3),
+    ("Fraxinus", "excelsior", "Frêne", 2.5),
+    ("Pyrus", "calleryana", "Poirier à fleurs", 2.0),
+    ("Quercus", "robur", "Chêne", 1.5),
+    ("Quercus", "ilex", "Chêne", 0.7),
+    ("Carpinus", "betulus", "Charme", 2.0),
+    ("Pinus", "nigra", "Pin", 1.2),
+    ("Ulmus", "resista", "Orme", 1.5),
+    ("Robinia", "pseudoacacia", "Robinier", 2.0),
+    ("Gleditsia", "triacanthos", "Fevier", 1.0),
+    ("Taxus", "baccata", "If", 1.0),
+    ("Taxus", "", "", 0.2),
+    ("Malus", "floribunda", "Pommier à fleurs", 1.2),
+    ("Betula", "pendula", "Bouleau", 1.0),
+    ("Populus", "nigra", "Peuplier", 0.8),
+    ("Ginkgo", "biloba", "Arbre aux quarante écus", 0.8),
+    ("Liquidambar", "styraciflua", "Copalme", 0.6),
+    ("Alnus", "glutinosa", "Aulne", 0.6),
+    ("Zelkova", "serrata", "", 0.5),
+    ("Magnolia", "grandiflora", "Magnolia", 0.4),
+    ("Cedrus", "atlantica", "", 0.4),
+    ("Catalpa", "bignonioides", "Catalpa", 0.4),
+    ("Koelreuteria", "paniculata", "Savonnier", 0.4),
+    ("Paulownia", "tomentosa", "Paulownia", 0.3),
+    ("Ailanthus", "altissima", "Ailante", 0.3),
+    ("Sorbus", "aria", "", 0.3),
+    ("Crataegus", "laevigata", "Aubépine", 0.3),
+    ("Non spécifié", "", "Non spécifié", 0.3),
+    ("", "sativa", "", 0.07),      # species only: dropped by clean_trees
+    ("", "", "", 0.03),
+]
+
+OWNERSHIP = [
+    ("Alignement", 48.0), ("Jardin", 26.0), ("CIMETIERE", 5.0), ("DASCO", 4.0),
+    ("PERIPHERIQUE", 3.0), ("DJS", 3.0), ("DEVE", 2.5), ("DFPE", 1.5),
+    ("DAC", 0.5), ("DASES", 0.5), ("DVD", 0.3), ("DPE", 0.2),
+]
+
+# stage, weight, (median circumference cm, log-sd)
+STAGES = [
+    ("Adulte", 45.0, (110, 0.35)),
+    ("Jeune (arbre)", 20.0, (40, 0.40)),
+    ("Jeune (arbre)Adulte", 12.0, (70, 0.35)),
+    ("Mature", 8.0, (200, 0.30)),
+    (None, 15.0, (90, 0.60)),
+]
+
+STREET_TYPES = ["RUE", "AVENUE", "BOULEVARD", "QUAI", "PLACE", "ALLEE", "SQUARE", "JARDIN", "PARC", "CIMETIERE"]
+STREET_NAMES = [
+    "GAMBETTA", "DE RIVOLI", "VOLTAIRE", "DAUMESNIL", "DE LA REPUBLIQUE", "DES GOBELINS",
+    "D'ITALIE", "DU GENERAL LECLERC", "JEAN JAURES", "DE CLICHY", "DE LA CHAPELLE", "DE BELLEVILLE",
+    "VICTOR HUGO", "FOCH", "DE GRENELLE", "SAINT-MICHEL", "DE SEBASTOPOL", "MONTPARNASSE",
+    "DE LA VILLETTE", "DES BATIGNOLLES", "DE BERCY", "DE CHARONNE", "DE VAUGIRARD", "LECOURBE",
+    "DE LA PORTE DOREE", "DU PERE LACHAISE", "DES BUTTES CHAUMONT", "MONTSOURIS", "DE MONCEAU",
+    "DU LUXEMBOURG", "DE BOULOGNE", "DE VINCENNES", "RASPAIL", "HAUSSMANN", "DE MAGENTA", "DE PICPUS",
+]
+VARIETIES = ["'Fastigiata'", "'Schwedleri'", "'Globosum'", "'Kanzan'", "'Chanticleer'", "'Pyramidalis'"]
+
+
+def _pick(rng, items, weights, n):
+    p = np.asarray(weights, dtype="float64")
+    return rng.choice(len(items), size=n, p=p / p.sum())
+
+
+def generate_trees(n_rows: int = None, scale: float = 1.0, seed: int = 0, years: int = 1) -> pd.DataFrame:
+    """
+    Raw-schema DataFrame (columns RAW_COLUMNS, values as in the export).
+    `n_rows` wins over `scale` (rows = scale × 214 837). With years > 1, yearly
+    snapshots of the same trees are stacked (same IDBASE, trees grow, a few
+    are replaced), like concatenating successive exports.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(n_rows) if n_rows is not None else int(round(scale * REAL_EXPORT_ROWS))
+
+    # --- Where: district label + coordinates around its centre ---
+    d = _pick(rng, DISTRICTS, [x[4] for x in DISTRICTS], n)
+    centre_lat = np.array([x[1] for x in DISTRICTS])[d]
+    centre_lon = np.array([x[2] for x in DISTRICTS])[d]
+    spread = np.array([x[3] for x in DISTRICTS])[d]
+    lat = centre_lat + rng.normal(0, 1, n) * spread
+    lon = centre_lon + rng.normal(0, 1, n) * spread * 1.5
+
+    # --- What: taxon, stage, measurements ---
+    t = _pick(rng, TAXA, [x[3] for x in TAXA], n)
+    s = _pick(rng, STAGES, [x[1] for x in STAGES], n)
+    med = np.array([x[2][0] for x in STAGES], dtype="float64")[s]
+    sd = np.array([x[2][1] for x in STAGES])[s]
+    circ = np.round(med * np.exp(rng.normal(0, 1, n) * sd)).astype("int64")
+    height = np.clip(np.round(2 + 0.075 * circ + rng.normal(0, 2.5, n)), 1, None).astype("int64")
+
+    # unmeasured trees are recorded as 0, a few typos are absurd
+    zero = rng.random(n) < 0.06
+    circ[zero] = 0
+    height[zero | (rng.random(n) < 0.03)] = 0
+    odd = rng.random(n) < 0.0005
+    circ[odd] = rng.choice([2500, 9999, 20000], size=odd.sum())
+    odd = rng.random(n) < 0.0005
+    height[odd] = rng.choice([75, 880, 1000], size=odd.sum())
+
+    # --- Addresses: each district draws from its own pool of streets ---
+    street_pool = np.array([f"{tp} {nm}" for tp in STREET_TYPES for nm in STREET_NAMES], dtype=object)
+    offset = rng.integers(0, len(street_pool), len(DISTRICTS))[d]
+    street = street_pool[(offset + rng.integers(0, 25, n)) % len(street_pool)]
+    cross = rng.random(n) < 0.15
+    street[cross] = street[cross] + " / " + street_pool[rng.integers(0, len(street_pool), cross.sum())]
+
+    genre = np.array([x[0] for x in TAXA], dtype=object)[t]
+    espece = np.array([x[1] for x in TAXA], dtype=object)[t]
+    libelle = np.array([x[2] for x in TAXA], dtype=object)[t]
+
+    df = pd.DataFrame({
+        "IDBASE": rng.permutation(n) + 100_000,
+        "TYPE EMPLACEMENT": "Arbre",
+        "DOMANIALITE": np.array([o[0] for o in OWNERSHIP], dtype=object)[_pick(rng, OWNERSHIP, [o[1] for o in OWNERSHIP], n)],
+        "ARRONDISSEMENT": np.array([x[0] for x in DISTRICTS], dtype=object)[d],
+        "COMPLEMENT ADRESSE": np.where(rng.random(n) < 0.1, pd.Series(rng.integers(1, 200, n)).astype(str), None),
+        "NUMERO": None,
+        "LIEU / ADRESSE": street,
+        "IDEMPLACEMENT": pd.Series(rng.integers(0, 10**7, n)).map("A{:07d}".format).to_numpy(),
+        "LIBELLE FRANCAIS": np.where(libelle == "", None, libelle),
+        "GENRE": np.where(genre == "", None, genre),
+        "ESPECE": np.where(espece == "", None, espece),
+        "VARIETE OU CULTIVAR": np.where(rng.random(n) < 0.08, rng.choice(VARIETIES, n), None),
+        "CIRCONFERENCE (cm)": circ,
+        "HAUTEUR (m)": height,
+        "STADE DE DEVELOPPEMENT": np.array([x[0] for x in STAGES], dtype=object)[s],
+        "REMARQUABLE": rng.choice(np.array(["NON", "OUI", None], dtype=object), n, p=[0.985, 0.001, 0.014]),
+        "geo_point_2d": _geo_strings(rng, lat, lon),
+    }, columns=RAW_COLUMNS)
+
+    if years > 1:
+        df = _stack_years(df, years, rng)
+    return df
+
+
+def _geo_strings(rng, lat, lon) -> np.ndarray:
+    """'lat, lon' strings, with the malformed variants seen in the export."""
+    geo = pd.Series(np.round(lat, 7)).astype(str).str.cat(pd.Series(np.round(lon, 7)).astype(str), sep=", ")
+    geo = geo.to_numpy(dtype=object)
+    bad = np.flatnonzero(rng.random(len(geo)) < 0.0005)
+    kinds = rng.integers(0, 3, len(bad))
+    geo[bad[kinds == 0]] = None                                              # blank
+    geo[bad[kinds == 1]] = [g.replace(",", "") for g in geo[bad[kinds == 1]]]  # no separator
+    geo[bad[kinds == 2]] = [g.replace(".", ",") for g in geo[bad[kinds == 2]]]  # decimal commas
+    return geo
+
+
+def _stack_years(df: pd.DataFrame, years: int, rng) -> pd.DataFrame:
+    snapshots = [df]
+    for _ in range(1, years):
+        nxt = snapshots[-1].copy()
+        circ = nxt["CIRCONFERENCE (cm)"]
+        nxt["CIRCONFERENCE (cm)"] = np.where(circ.between(1, 2000), circ + rng.integers(0, 4, len(nxt)), circ)
+        # ~2% of trees felled and replanted: new ID, young stage, small measurements
+        new = rng.random(len(nxt)) < 0.02
+        nxt.loc[new, "IDBASE"] = nxt["IDBASE"].max() + 1 + np.arange(new.sum())
+        nxt.loc[new, "STADE DE DEVELOPPEMENT"] = "Jeune (arbre)"
+        nxt.loc[new, "CIRCONFERENCE (cm)"] = rng.integers(15, 35, new.sum())
+        nxt.loc[new, "HAUTEUR (m)"] = rng.integers(3, 6, new.sum())
+        snapshots.append(nxt)
+    return pd.concat(snapshots, ignore_index=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic Paris tree inventory (raw export schema).")
+    ap.add_argument("-o", "--out", default="data/synthetic.csv")
+    ap.add_argument("--scale", type=float, default=1.0, help="rows = scale x 214 837")
+    ap.add_argument("--rows", type=int, default=None, help="exact row count (overrides --scale)")
+    ap.add_argument("--years", type=int, default=1, help="stack this many yearly snapshots")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    df = generate_trees(n_rows=args.rows, scale=args.scale, seed=args.seed, years=args.years)
+    df.to_csv(args.out, sep=";", index=False)
+    print(f"Wrote {len(df):,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
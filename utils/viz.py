@@ -1,20 +1,20 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 
+from utils import perf
 
-def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height: int = 600):
-    """
-    Interactive Plotly map:
-    - Green = regular trees, Gold = remarkable trees
-    - Custom tooltip: English name, scientific name, French name, district, stage, height, circumference
-    """
 
-    # --- Safety checks ---
-    if df_geo is None or df_geo.empty or not {"lat", "lon"}.issubset(df_geo.columns):
-        st.info("No geolocated trees available after applying filters.")
-        return
+def show_chart(fig, label: str):
+    """st.plotly_chart + payload size for the performance overlay."""
+    perf.record_chart(label, fig)
+    st.plotly_chart(fig, use_container_width=True)
+
 
+def map_frame(df_geo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Data preparation for map_points: color category and tooltip columns
+    (missing tooltip columns are added empty, height/circumference pre-formatted).
+    """
     g = df_geo.copy()
 
     # --- Color mapping ---
@@ -22,21 +22,11 @@ def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height
         g["color_cat"] = g["is_remarkable"].map({True: "Remarkable", False: "Ordinary"})
     else:
         g["color_cat"] = "Ordinary"
+    if "same_species_share" in g.columns:
+        from utils.spatial import CLUSTER_SHARE
 
-    cmap = {"Ordinary": "#509C6F", "Remarkable": "#F2B705"}  # green / gold
-
-    # --- Base map ---
-    fig = px.scatter_mapbox(
-        g,
-        lat="lat",
-        lon="lon",
-        color="color_cat",
-        color_discrete_map=cmap,
-        hover_name="en_name" if "en_name" in g.columns else None,
-        hover_data=None,
-        zoom=zoom,
-        height=height,
-    )
+        clustered = g["same_species_share"].ge(CLUSTER_SHARE) & g["color_cat"].eq("Ordinary")
+        g.loc[clustered, "color_cat"] = "Same-species cluster"
 
     # --- Tooltip order & formatting ---
     ordered_cols = [
@@ -54,8 +44,49 @@ def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height
 
     g["_height"] = g["height_m"].apply(lambda x: "" if pd.isna(x) else f"{float(x):g}")
     g["_circ"] = g["circumference_cm"].apply(lambda x: "" if pd.isna(x) else f"{float(x):g}")
+    share = g["same_species_share"] if "same_species_share" in g.columns else pd.Series(float("nan"), index=g.index)
+    other = g["nearest_other_m"] if "nearest_other_m" in g.columns else pd.Series(float("nan"), index=g.index)
+    g["_neigh"] = [
+        "" if pd.isna(s) else f"{s:.0%} same species, other species at {'?' if pd.isna(o) else f'{o:g}'} m"
+        for s, o in zip(share, other)
+    ]
+    return g
 
-    custom_cols = ["genus_species", "french_name", "_height", "_circ", "growth_stage", "arr_num"]
+
+def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height: int = 600, prepared: bool = False):
+    """
+    Interactive Plotly map:
+    - Green = regular trees, Gold = remarkable trees, Orange = same-species clusters
+    - Custom tooltip: English name, scientific name, French name, district, stage, height, circumference, neighbours
+    prepared=True: df_geo already went through map_frame()
+    """
+
+    # --- Safety checks ---
+    if df_geo is None or df_geo.empty or not {"lat", "lon"}.issubset(df_geo.columns):
+        st.info("No geolocated trees available after applying filters.")
+        return
+
+    g = df_geo if prepared else map_frame(df_geo)
+
+    cmap = {"Ordinary": "#509C6F", "Remarkable": "#F2B705", "Same-species cluster": "#E4572E"}  # green / gold / orange
+
+    # --- Base map ---
+    import plotly.express as px  # deferred: keeps Plotly off the startup path
+
+    fig = px.scatter_mapbox(
+        g,
+        lat="lat",
+        lon="lon",
+        color="color_cat",
+        color_discrete_map=cmap,
+        hover_name="en_name" if "en_name" in g.columns else None,
+        hover_data=None,
+        zoom=zoom,
+        height=height,
+    )
+
+    # --- Tooltip order & formatting ---
+    custom_cols = ["genus_species", "french_name", "_height", "_circ", "growth_stage", "arr_num", "_neigh"]
 
     fig.update_traces(
         marker=dict(size=7, opacity=0.9, symbol="circle", allowoverlap=True),
@@ -67,7 +98,8 @@ def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height
             "District: %{customdata[5]}<br>"
             "Stage: %{customdata[4]}<br>"
             "Height: %{customdata[2]} m<br>"
-            "Circumference: %{customdata[3]} cm<extra></extra>"  # remove gray box
+            "Circumference: %{customdata[3]} cm<br>"
+            "Nearest 8: %{customdata[6]}<extra></extra>"  # remove gray box
         ),
     )
 
@@ -78,11 +110,12 @@ def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height
         showlegend=False,  # 👈 disable built-in Plotly legend
         )
 
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "map_points")
 
     # --- Legend counts ---
     n_gold = int((g["color_cat"] == "Remarkable").sum())
     n_green = int((g["color_cat"] == "Ordinary").sum())
+    n_cluster = int((g["color_cat"] == "Same-species cluster").sum())
 
     st.markdown(
         f"""
@@ -95,6 +128,10 @@ def map_points(df_geo, style: str = "carto-darkmatter", zoom: int = 11.5, height
                 <span style="width:14px; height:14px; background:#F2B705; display:inline-block; border-radius:3px; border:1px solid rgba(255,255,255,0.5);"></span>
                 <span>Remarkable trees <small>({n_gold})</small></span>
             </div>
+            <div style="display:flex; align-items:center; gap:8px;">
+                <span style="width:14px; height:14px; background:#E4572E; display:inline-block; border-radius:3px; border:1px solid rgba(255,255,255,0.5);"></span>
+                <span>Same-species clusters <small>({n_cluster})</small></span>
+            </div>
         </div>
         """,
         unsafe_allow_html=True,